@@ -0,0 +1,87 @@
+from collections import deque
+from typing import Dict, Iterable, List, Set, Union
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton matching a keyword dictionary in one pass per text.
+
+    Matching is case-insensitive and only counts whole words: a keyword
+    must not be preceded or followed by a letter or digit, so "SPD" matches
+    "#SPD" and "SPD-Fraktion" but not "SPDler". Several aliases can map to
+    one topic, e.g. ``{"Bundestagswahl": ["Bundestagswahl", "#btw25"]}``.
+
+    The automaton is compiled into a full transition table (a DFA), so the
+    scan is a single dict lookup per character regardless of the number of
+    keywords.
+    """
+
+    def __init__(self, keywords: Union[Iterable[str], Dict[str, Iterable[str]]]):
+        """
+        Args:
+            keywords: List of keywords, or dict mapping a topic to its aliases
+        """
+        if isinstance(keywords, dict):
+            aliases = {alias: topic for topic, names in keywords.items() for alias in names}
+        else:
+            aliases = {keyword: keyword for keyword in keywords}
+
+        self.topics = sorted(set(aliases.values()))
+        topic_ids = {topic: i for i, topic in enumerate(self.topics)}
+
+        # Trie: transitions per state and (topic id, pattern length) outputs
+        self._delta: List[Dict[str, int]] = [{}]
+        self._outputs: List[List] = [[]]
+        for alias, topic in aliases.items():
+            pattern = alias.lower()
+            if not pattern:
+                continue
+            state = 0
+            for ch in pattern:
+                nxt = self._delta[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._delta)
+                    self._delta[state][ch] = nxt
+                    self._delta.append({})
+                    self._outputs.append([])
+                state = nxt
+            self._outputs[state].append((topic_ids[topic], len(pattern)))
+
+        self._compile()
+
+    def _compile(self) -> None:
+        """Compute failure links breadth first and fold them into the transitions."""
+        trie = [dict(edges) for edges in self._delta]
+        fail = [0] * len(trie)
+        queue = deque(trie[0].values())
+        while queue:
+            state = queue.popleft()
+            # Shallower states are complete already, failure states are shallower
+            self._outputs[state] = self._outputs[state] + self._outputs[fail[state]]
+            for ch, child in trie[state].items():
+                fail[child] = self._delta[fail[state]].get(ch, 0)
+                queue.append(child)
+            for ch, target in self._delta[fail[state]].items():
+                self._delta[state].setdefault(ch, target)
+
+    def match(self, text: str) -> Set[int]:
+        """Return the ids of all topics occurring in the text."""
+        text = text.lower()
+        delta = self._delta
+        outputs = self._outputs
+        found = set()
+        state = 0
+        last = len(text) - 1
+        for i, ch in enumerate(text):
+            state = delta[state].get(ch, 0)
+            if outputs[state]:
+                for topic_id, length in outputs[state]:
+                    start = i - length + 1
+                    if (start == 0 or not text[start - 1].isalnum()) and \
+                            (i == last or not text[i + 1].isalnum()):
+                        found.add(topic_id)
+        return found
+
+    def match_topics(self, text: str) -> List[str]:
+        """Return the names of all topics occurring in the text, sorted."""
+        return sorted(self.topics[i] for i in self.match(text))
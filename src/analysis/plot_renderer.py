@@ -0,0 +1,190 @@
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+
+def log2_histogram(values) -> Dict[int, int]:
+    """
+    Count values per power-of-two bin, matching DatabaseHandler.get_metric_histograms.
+
+    Bin 0 holds zeros and bin ``k`` values in ``[2**(k-1), 2**k)``.
+    """
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    # frexp yields the exponent e with v = m * 2**e and m in [0.5, 1), exactly
+    bins = np.where(values > 0, np.frexp(np.maximum(values, 1))[1], 0)
+    counts = np.bincount(bins.astype(np.int64))
+    return {int(b): int(c) for b, c in enumerate(counts) if c}
+
+
+def log2_bin_edges(histogram: Dict[int, int]) -> Tuple[np.ndarray, np.ndarray]:
+    """Return (left edges, counts) of a power-of-two histogram for bar plotting."""
+    if not histogram:
+        return np.array([]), np.array([])
+    bins = np.arange(max(histogram) + 1)
+    counts = np.array([histogram.get(b, 0) for b in bins])
+    return np.where(bins == 0, 0, 2.0 ** (bins - 1)), counts
+
+
+def _pyplot():
+    """Import pyplot with the headless Agg backend."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def _save(fig, paths: Sequence[str], dpi: int) -> List[str]:
+    for path in paths:
+        fig.savefig(path, dpi=dpi, bbox_inches='tight')
+    return list(paths)
+
+
+def render_tweet_frequency(data: Dict, paths: Sequence[str], dpi: int) -> List[str]:
+    """Line chart of daily tweet counts, ``data`` holds ``dates`` and ``counts``."""
+    plt = _pyplot()
+    from matplotlib.dates import DateFormatter
+    from matplotlib.ticker import MaxNLocator
+
+    fig, ax = plt.subplots(figsize=(12, 6))
+    dates, counts = data['dates'], data['counts']
+    if len(dates):
+        ax.plot(dates, counts, color='blue', marker='o', linestyle='-',
+                linewidth=2, markersize=8, alpha=0.7)
+        ax.xaxis.set_major_formatter(DateFormatter('%Y-%m-%d'))
+        ax.xaxis.set_major_locator(MaxNLocator(10))
+        ax.grid(True, linestyle='--', alpha=0.7)
+        ax.set_title('Daily Tweet Volume in German Politics', pad=20)
+        ax.set_xlabel('Date (YYYY-MM-DD)', labelpad=10)
+        ax.set_ylabel('Number of Tweets per Day', labelpad=10)
+        plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+        ax.margins(x=0.05)
+        fig.text(0.99, 0.01, f"Date Range: {min(dates)} to {max(dates)}",
+                 ha='right', va='bottom', fontsize=8)
+    else:
+        ax.text(0.5, 0.5, 'No tweet data available', horizontalalignment='center',
+                verticalalignment='center', transform=ax.transAxes)
+    fig.tight_layout()
+    try:
+        return _save(fig, paths, dpi)
+    finally:
+        plt.close(fig)
+
+
+def render_engagement_metrics(data: Dict, paths: Sequence[str], dpi: int) -> List[str]:
+    """Log-binned bar charts, ``data`` maps each metric to a power-of-two histogram."""
+    plt = _pyplot()
+    fig, axes = plt.subplots(2, 2, figsize=(15, 10))
+    for ax, (metric, histogram) in zip(axes.flat, data.items()):
+        edges, counts = log2_bin_edges(histogram)
+        if len(counts):
+            # Zeros are drawn at 0.5 so they stay visible on the log axis
+            lefts = np.where(edges == 0, 0.5, edges)
+            ax.bar(lefts, counts, width=lefts, align='edge', edgecolor='white')
+            ax.set_xscale('log', base=2)
+        ax.set_title(f'Distribution of {metric.replace("_", " ").title()}')
+        ax.set_xlabel(metric)
+        ax.set_ylabel('Count')
+    fig.tight_layout()
+    try:
+        return _save(fig, paths, dpi)
+    finally:
+        plt.close(fig)
+
+
+def render_sentiment_distribution(data: Dict, paths: Sequence[str], dpi: int) -> List[str]:
+    """Histogram of sentiment scores, ``data`` holds equal-width ``counts`` over [-1, 1]."""
+    plt = _pyplot()
+    counts = np.asarray(data['counts'])
+    edges = np.linspace(-1, 1, len(counts) + 1)
+    fig, ax = plt.subplots(figsize=(10, 6))
+    colors = ['tab:red' if e < 0 else 'tab:green' if e > 0 else 'tab:gray'
+              for e in (edges[:-1] + edges[1:]) / 2]
+    ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge', color=colors,
+           edgecolor='white')
+    ax.set_title('Sentiment Distribution of German Political Tweets')
+    ax.set_xlabel('Sentiment score')
+    ax.set_ylabel('Number of Tweets')
+    fig.tight_layout()
+    try:
+        return _save(fig, paths, dpi)
+    finally:
+        plt.close(fig)
+
+
+RENDERERS = {
+    'tweet_frequency': render_tweet_frequency,
+    'engagement_metrics': render_engagement_metrics,
+    'sentiment_distribution': render_sentiment_distribution,
+}
+
+
+def _render_job(name: str, data: Dict, paths: Sequence[str], dpi: int) -> List[str]:
+    return RENDERERS[name](data, paths, dpi)
+
+
+class PlotRenderer:
+    """
+    Renders pre-aggregated figures to files, in parallel where it pays off.
+
+    Every figure is drawn from already reduced data (counts per bucket or
+    bin), never from raw tweets. Independent figures are rendered in a
+    process pool with the headless Agg backend, so pyplot state is never
+    shared and matplotlib is only imported where drawing happens.
+    """
+
+    DEFAULT_OUTPUT_DIR = '.'
+    DEFAULT_FORMATS = ('png',)
+    DEFAULT_DPI = 150
+
+    def __init__(self, output_dir: str = None, formats: Sequence[str] = None,
+                 dpi: int = None, workers: int = None):
+        """
+        Args:
+            output_dir: Directory receiving the figures
+            formats: File extensions to save every figure in, e.g. png, svg, pdf
+            dpi: Resolution of raster formats
+            workers: Rendering processes, defaults to one per figure up to the CPU count
+        """
+        self.logger = logging.getLogger(__name__)
+        self.output_dir = output_dir or self.DEFAULT_OUTPUT_DIR
+        self.formats = list(formats or self.DEFAULT_FORMATS)
+        self.dpi = dpi or self.DEFAULT_DPI
+        self.workers = workers
+
+    def paths(self, name: str) -> List[str]:
+        """Output files of a figure, one per format."""
+        return [os.path.join(self.output_dir, f"{name}.{fmt}") for fmt in self.formats]
+
+    def render(self, figures: Dict[str, Dict]) -> Dict[str, List[str]]:
+        """
+        Render figures and save them in every configured format.
+
+        Args:
+            figures: Maps a figure name from RENDERERS to its reduced data
+
+        Returns:
+            Dict mapping each figure name to the written files
+        """
+        unknown = set(figures) - set(RENDERERS)
+        if unknown:
+            raise ValueError(f"Unknown figures: {sorted(unknown)}")
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        workers = min(self.workers or os.cpu_count() or 1, len(figures))
+        if workers <= 1:
+            results = {name: _render_job(name, data, self.paths(name), self.dpi)
+                       for name, data in figures.items()}
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    name: executor.submit(_render_job, name, data, self.paths(name), self.dpi)
+                    for name, data in figures.items()
+                }
+                results = {name: future.result() for name, future in futures.items()}
+
+        self.logger.info(f"Rendered {len(results)} figures to {self.output_dir}")
+        return results
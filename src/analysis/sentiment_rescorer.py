@@ -0,0 +1,100 @@
+import threading
+import logging
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from src.config.config_loader import get_analysis_config
+from src.database.db_handler import DatabaseHandler
+from src.data_processing.data_transformer import DataTransformer
+
+
+class SentimentRescorer:
+    """
+    Re-scores stored tweets in the background after a scorer version change.
+
+    Scores of other versions are kept, since other processes may still use
+    them, unless listed in ``superseded_versions`` or unused for more than
+    ``unused_version_days``.
+    """
+
+    DEFAULT_UNUSED_VERSION_DAYS = 30
+
+    def __init__(self, transformer: DataTransformer = None, batch_size: int = 1000,
+                 pause_seconds: float = 0.5, pool=None):
+        self.logger = logging.getLogger(__name__)
+        self.pool = pool
+        self.transformer = transformer or DataTransformer()
+        self.batch_size = batch_size
+        self.pause_seconds = pause_seconds
+        config = get_analysis_config()
+        self.superseded_versions = config.get('superseded_sentiment_versions', [])
+        self.unused_version_days = config.get(
+            'unused_sentiment_version_days', self.DEFAULT_UNUSED_VERSION_DAYS
+        )
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start re-scoring in a daemon thread unless already running."""
+        if self.running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self.run, name='sentiment-rescorer', daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = None) -> None:
+        """Ask the worker to stop after the current batch and wait for it."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def run(self) -> int:
+        """
+        Score tweets lacking a current-version score, one batch at a time.
+
+        Tweets are paged by id, so the table is scanned once per run. Each
+        batch is committed on its own, so an interrupted run resumes where
+        it stopped. Once every tweet has a current score, scores of
+        superseded or long unused versions are removed.
+
+        Returns:
+            Number of tweets scored
+        """
+        version = self.transformer.model_version
+        scored = 0
+        last_id = None
+        try:
+            with DatabaseHandler(pool=self.pool) as db:
+                while not self._stop_event.is_set():
+                    rows = db.get_unscored_tweets(version, limit=self.batch_size,
+                                                  after_id=last_id)
+                    if not rows:
+                        unused_since = (datetime.now() - timedelta(days=self.unused_version_days)
+                                        if self.unused_version_days is not None else None)
+                        deleted = db.delete_stale_sentiment(
+                            version, superseded=self.superseded_versions,
+                            unused_since=unused_since
+                        )
+                        self.logger.info(
+                            f"Re-scoring to {version} finished, removed {deleted} stale scores"
+                        )
+                        break
+
+                    batch = pd.DataFrame(rows, columns=['id', 'text'])
+                    batch['sentiment'] = self.transformer.score_sentiment(batch['text'])
+                    db.store_sentiment_scores(zip(batch['id'], batch['sentiment']), version)
+                    last_id = rows[-1][0]
+                    scored += len(batch)
+                    self.logger.info(f"Re-scored {scored} tweets with {version}")
+
+                    self._stop_event.wait(self.pause_seconds)
+        except Exception as e:
+            self.logger.error(f"Error re-scoring sentiment: {str(e)}")
+        return scored
@@ -0,0 +1,510 @@
+import math
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.analysis.plot_renderer import log2_histogram
+from src.database.db_handler import DatabaseHandler
+
+
+def _finite(values) -> np.ndarray:
+    values = np.asarray(values, dtype=float)
+    return values[np.isfinite(values)]
+
+
+def _bound(value: float):
+    """JSON-safe min/max, infinities of empty summaries become None."""
+    return None if math.isinf(value) else value
+
+
+class Moments:
+    """
+    Count, mean, variance, min and max of a stream.
+
+    Chunks are summarized with numpy and merged with Chan's parallel
+    formula, so merging per-day moments gives the same result as one pass
+    over all values, up to floating point rounding.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        # Sum of squared deviations from the mean
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values) -> 'Moments':
+        values = _finite(values)
+        if len(values):
+            chunk = Moments()
+            chunk.count = len(values)
+            chunk.mean = float(values.mean())
+            chunk.m2 = float(((values - chunk.mean) ** 2).sum())
+            chunk.min = float(values.min())
+            chunk.max = float(values.max())
+            self.merge(chunk)
+        return self
+
+    def merge(self, other: 'Moments') -> 'Moments':
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self):
+        """Sample variance (ddof=1) like pandas, None below two values."""
+        return self.m2 / (self.count - 1) if self.count > 1 else None
+
+    @property
+    def std(self):
+        variance = self.variance
+        return None if variance is None else math.sqrt(variance)
+
+    def to_dict(self) -> Dict:
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2,
+                'min': _bound(self.min), 'max': _bound(self.max)}
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> 'Moments':
+        moments = cls()
+        moments.count, moments.mean, moments.m2 = state['count'], state['mean'], state['m2']
+        moments.min = math.inf if state['min'] is None else state['min']
+        moments.max = -math.inf if state['max'] is None else state['max']
+        return moments
+
+
+class TDigest:
+    """
+    Merging t-digest for approximate quantiles.
+
+    Values are kept as (mean, weight) centroids, small near the tails and
+    large around the median, as bounded by the k1 scale function
+    ``k(q) = compression / (2 pi) * asin(2q - 1)``: every centroid covers
+    at most about one unit of k. The rank error of a quantile is therefore
+    around ``1 / compression`` near the median and much smaller towards
+    the tails; minimum and maximum are exact. Merging two digests
+    compresses their centroids together and keeps the same bound, so
+    merging per-day digests is about as accurate as one digest of all days.
+    """
+
+    DEFAULT_COMPRESSION = 200
+    # Raw values buffered per unit of compression before compressing
+    BUFFER_FACTOR = 5
+
+    def __init__(self, compression: float = DEFAULT_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = math.inf
+        self.max = -math.inf
+        self._buffer: List[np.ndarray] = []
+        self._buffered = 0
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum()) + self._buffered
+
+    def update(self, values) -> 'TDigest':
+        values = _finite(values)
+        if len(values):
+            self._buffer.append(values)
+            self._buffered += len(values)
+            self.min = min(self.min, float(values.min()))
+            self.max = max(self.max, float(values.max()))
+            if self._buffered >= self.BUFFER_FACTOR * self.compression:
+                self._compress()
+        return self
+
+    def merge(self, other: 'TDigest') -> 'TDigest':
+        other._compress()
+        if len(other.weights):
+            self._compress(other.means, other.weights)
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+        return self
+
+    def _compress(self, extra_means: np.ndarray = None, extra_weights: np.ndarray = None) -> None:
+        """Merge buffered values and extra centroids into the centroid list."""
+        means = [self.means] + self._buffer
+        weights = [self.weights] + [np.ones(len(values)) for values in self._buffer]
+        if extra_means is not None:
+            means.append(extra_means)
+            weights.append(extra_weights)
+        self._buffer, self._buffered = [], 0
+        means, weights = np.concatenate(means), np.concatenate(weights)
+        if len(means) <= 1:
+            self.means, self.weights = means, weights
+            return
+
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        # Items whose left edge falls into the same unit of k form one centroid
+        left = (np.cumsum(weights) - weights) / total
+        k = self.compression / (2 * math.pi) * np.arcsin(2 * left - 1)
+        groups = np.floor(k + self.compression / 4).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+        merged_weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / merged_weights
+        self.weights = merged_weights
+
+    def quantile(self, q):
+        """Approximate value at quantile ``q`` (scalar or array), None if empty."""
+        self._compress()
+        if not len(self.weights):
+            return None
+        total = self.weights.sum()
+        # Interpolate between centroid centers, anchored at the exact extremes
+        centers = np.cumsum(self.weights) - self.weights / 2
+        ranks = np.concatenate([[0.0], centers, [total]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        result = np.interp(np.asarray(q, dtype=float) * total, ranks, values)
+        return float(result) if np.ndim(result) == 0 else result
+
+    def cdf(self, value: float):
+        """Approximate share of values at or below ``value``, None if empty."""
+        self._compress()
+        if not len(self.weights):
+            return None
+        total = self.weights.sum()
+        centers = np.cumsum(self.weights) - self.weights / 2
+        ranks = np.concatenate([[0.0], centers, [total]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        return float(np.interp(value, values, ranks) / total)
+
+    def to_dict(self) -> Dict:
+        self._compress()
+        return {'compression': self.compression, 'means': self.means.tolist(),
+                'weights': self.weights.tolist(), 'min': _bound(self.min),
+                'max': _bound(self.max)}
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> 'TDigest':
+        digest = cls(state['compression'])
+        digest.means = np.asarray(state['means'], dtype=float)
+        digest.weights = np.asarray(state['weights'], dtype=float)
+        digest.min = math.inf if state['min'] is None else state['min']
+        digest.max = -math.inf if state['max'] is None else state['max']
+        return digest
+
+
+class FixedHistogram:
+    """Equal-width histogram over ``[lo, hi]`` with under- and overflow counts, merged exactly."""
+
+    def __init__(self, lo: float, hi: float, bins: int):
+        self.lo, self.hi, self.bins = lo, hi, bins
+        # Underflow, the bins, overflow
+        self._counts = np.zeros(bins + 2, dtype=np.int64)
+
+    @property
+    def counts(self) -> np.ndarray:
+        return self._counts[1:-1]
+
+    @property
+    def underflow(self) -> int:
+        return int(self._counts[0])
+
+    @property
+    def overflow(self) -> int:
+        return int(self._counts[-1])
+
+    @property
+    def edges(self) -> np.ndarray:
+        return np.linspace(self.lo, self.hi, self.bins + 1)
+
+    def update(self, values) -> 'FixedHistogram':
+        values = _finite(values)
+        if len(values):
+            # ``hi`` itself falls into the last bin, like width_bucket with LEAST in SQL
+            self._counts[1:-1] += np.histogram(values, bins=self.bins, range=(self.lo, self.hi))[0]
+            self._counts[0] += int((values < self.lo).sum())
+            self._counts[-1] += int((values > self.hi).sum())
+        return self
+
+    def merge(self, other: 'FixedHistogram') -> 'FixedHistogram':
+        if (self.lo, self.hi, self.bins) != (other.lo, other.hi, other.bins):
+            raise ValueError("Cannot merge histograms with different bins")
+        self._counts += other._counts
+        return self
+
+    def to_dict(self) -> Dict:
+        return {'lo': self.lo, 'hi': self.hi, 'bins': self.bins,
+                'counts': self._counts.tolist()}
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> 'FixedHistogram':
+        histogram = cls(state['lo'], state['hi'], state['bins'])
+        histogram._counts = np.asarray(state['counts'], dtype=np.int64)
+        return histogram
+
+
+class Log2Histogram:
+    """Power-of-two histogram of non-negative counts, the bins of plot_renderer.log2_histogram."""
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+
+    def update(self, values) -> 'Log2Histogram':
+        for bin_index, count in log2_histogram(values).items():
+            self.counts[bin_index] = self.counts.get(bin_index, 0) + count
+        return self
+
+    def merge(self, other: 'Log2Histogram') -> 'Log2Histogram':
+        for bin_index, count in other.counts.items():
+            self.counts[bin_index] = self.counts.get(bin_index, 0) + count
+        return self
+
+    def to_dict(self) -> Dict:
+        return {'counts': {str(b): c for b, c in sorted(self.counts.items())}}
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> 'Log2Histogram':
+        histogram = cls()
+        histogram.counts = {int(b): c for b, c in state['counts'].items()}
+        return histogram
+
+
+class TopK:
+    """The ``k`` largest (or smallest) values with their tweet id and text, merged exactly."""
+
+    def __init__(self, k: int, largest: bool = True):
+        self.k = k
+        self.largest = largest
+        self.values = np.empty(0)
+        self.ids = np.empty(0, dtype=np.int64)
+        self.texts: List[str] = []
+
+    def update(self, values, ids, texts=None) -> 'TopK':
+        values = np.asarray(values, dtype=float)
+        ids = np.asarray(ids, dtype=np.int64)
+        valid = np.flatnonzero(np.isfinite(values))
+        if len(valid) > self.k:
+            # Preselect the chunk's candidates with the same stable (value, id)
+            # order as _keep, so ties at the k-th value never depend on chunking
+            valid = valid[self._order(values[valid], ids[valid])]
+            _, first = np.unique(ids[valid], return_index=True)
+            valid = valid[np.sort(first)][:self.k]
+        texts = [None] * len(valid) if texts is None else [texts[i] for i in valid]
+        return self._keep(values[valid], ids[valid], texts)
+
+    def merge(self, other: 'TopK') -> 'TopK':
+        return self._keep(other.values, other.ids, other.texts)
+
+    def _keep(self, values: np.ndarray, ids: np.ndarray, texts: List[str]) -> 'TopK':
+        values = np.concatenate([self.values, values])
+        ids = np.concatenate([self.ids, ids])
+        texts = self.texts + list(texts)
+        order = self._order(values, ids)
+        _, first = np.unique(ids[order], return_index=True)
+        order = order[np.sort(first)][:self.k]
+        self.values, self.ids = values[order], ids[order]
+        self.texts = [texts[i] for i in order]
+        return self
+
+    def _order(self, values: np.ndarray, ids: np.ndarray) -> np.ndarray:
+        # Best values first, ties broken by the lower id so merges are order independent
+        return np.lexsort((ids, -values if self.largest else values))
+
+    def items(self) -> List[Dict]:
+        return [{'id': int(tweet_id), 'value': float(value), 'text': text}
+                for value, tweet_id, text in zip(self.values, self.ids, self.texts)]
+
+    def to_dict(self) -> Dict:
+        return {'k': self.k, 'largest': self.largest, 'items': self.items()}
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> 'TopK':
+        top = cls(state['k'], state['largest'])
+        items = state['items']
+        top.values = np.asarray([item['value'] for item in items], dtype=float)
+        top.ids = np.asarray([item['id'] for item in items], dtype=np.int64)
+        top.texts = [item['text'] for item in items]
+        return top
+
+
+class ColumnSummary:
+    """Moments, quantile digest, histogram and extreme tweets of one numeric column."""
+
+    def __init__(self, histogram, k: int = 10,
+                 compression: float = TDigest.DEFAULT_COMPRESSION):
+        self.moments = Moments()
+        self.digest = TDigest(compression)
+        self.histogram = histogram
+        self.top = TopK(k, largest=True)
+        self.bottom = TopK(k, largest=False)
+
+    def update(self, values, ids, texts=None) -> 'ColumnSummary':
+        values = np.asarray(values, dtype=float)
+        self.moments.update(values)
+        self.digest.update(values)
+        self.histogram.update(values)
+        self.top.update(values, ids, texts)
+        self.bottom.update(values, ids, texts)
+        return self
+
+    def merge(self, other: 'ColumnSummary') -> 'ColumnSummary':
+        self.moments.merge(other.moments)
+        self.digest.merge(other.digest)
+        self.histogram.merge(other.histogram)
+        self.top.merge(other.top)
+        self.bottom.merge(other.bottom)
+        return self
+
+    def describe(self, quantiles: Sequence[float] = (0.05, 0.25, 0.5, 0.75, 0.95)) -> Dict:
+        """Count, mean, std, exact extremes and approximate quantiles."""
+        moments = self.moments
+        result = {
+            'count': moments.count,
+            'mean': moments.mean if moments.count else None,
+            'std': moments.std,
+            'min': _bound(moments.min),
+            'max': _bound(moments.max),
+        }
+        for q in quantiles:
+            result[f"q{round(q * 100):02d}"] = self.digest.quantile(q)
+        return result
+
+    def to_dict(self) -> Dict:
+        return {
+            'moments': self.moments.to_dict(),
+            'digest': self.digest.to_dict(),
+            'histogram': self.histogram.to_dict(),
+            'top': self.top.to_dict(),
+            'bottom': self.bottom.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict, histogram_type) -> 'ColumnSummary':
+        summary = cls(histogram_type.from_dict(state['histogram']))
+        summary.moments = Moments.from_dict(state['moments'])
+        summary.digest = TDigest.from_dict(state['digest'])
+        summary.top = TopK.from_dict(state['top'])
+        summary.bottom = TopK.from_dict(state['bottom'])
+        return summary
+
+
+class TweetSummary:
+    """
+    Mergeable one-pass summary of tweet sentiment and engagement.
+
+    Memory is fixed by ``k``, the digest compression and the histogram
+    bins, whatever the number of tweets. Counts, sign counts, histograms
+    and top/bottom-k tweets merge exactly; means and variances merge
+    exactly up to floating point rounding; quantiles keep the t-digest
+    error bound. Summaries of days or partitions can therefore be stored
+    and combined instead of rescanning their tweets.
+    """
+
+    SENTIMENT_BINS = 40
+    COLUMNS = ['id', 'text', 'sentiment', *DatabaseHandler.METRIC_COLUMNS]
+
+    def __init__(self, k: int = 10, compression: float = TDigest.DEFAULT_COMPRESSION):
+        self.k = k
+        self.compression = compression
+        self.tweets = 0
+        self.positive = 0
+        self.negative = 0
+        self.neutral = 0
+        self.sentiment = ColumnSummary(FixedHistogram(-1.0, 1.0, self.SENTIMENT_BINS),
+                                       k, compression)
+        self.engagement = {metric: ColumnSummary(Log2Histogram(), k, compression)
+                           for metric in DatabaseHandler.METRIC_COLUMNS}
+
+    def update(self, chunk: pd.DataFrame) -> 'TweetSummary':
+        """Add a frame with an ``id`` column and any of text, sentiment and the metric columns."""
+        if chunk.empty:
+            return self
+        self.tweets += len(chunk)
+        ids = chunk['id'].to_numpy(dtype=np.int64)
+        texts = chunk['text'].tolist() if 'text' in chunk.columns else None
+        if 'sentiment' in chunk.columns:
+            # Aggregate in float64 whatever the stored precision
+            sentiment = chunk['sentiment'].to_numpy(dtype=float, na_value=np.nan)
+            self.positive += int((sentiment > 0).sum())
+            self.negative += int((sentiment < 0).sum())
+            self.neutral += int((sentiment == 0).sum())
+            self.sentiment.update(sentiment, ids, texts)
+        for metric, summary in self.engagement.items():
+            if metric in chunk.columns:
+                summary.update(chunk[metric].to_numpy(dtype=float, na_value=np.nan), ids, texts)
+        return self
+
+    def merge(self, other: 'TweetSummary') -> 'TweetSummary':
+        self.tweets += other.tweets
+        self.positive += other.positive
+        self.negative += other.negative
+        self.neutral += other.neutral
+        self.sentiment.merge(other.sentiment)
+        for metric, summary in self.engagement.items():
+            summary.merge(other.engagement[metric])
+        return self
+
+    @classmethod
+    def combine(cls, summaries: Iterable['TweetSummary'], k: int = 10,
+                compression: float = TDigest.DEFAULT_COMPRESSION) -> 'TweetSummary':
+        """Merge summaries, e.g. of single days, into a new one."""
+        combined = cls(k, compression)
+        for summary in summaries:
+            combined.merge(summary)
+        return combined
+
+    def sentiment_summary(self) -> Dict:
+        """The keys of TweetAnalyzer.get_sentiment_summary."""
+        if self.sentiment.moments.count == 0:
+            raise ValueError("No tweets match the given filters")
+        return {
+            'Average Sentiment': self.sentiment.moments.mean,
+            'Positive Tweets': self.positive,
+            'Negative Tweets': self.negative,
+            'Neutral Tweets': self.neutral,
+            'Most Positive Tweet': self.sentiment.top.texts[0],
+            'Most Negative Tweet': self.sentiment.bottom.texts[0]
+        }
+
+    def describe(self) -> Dict:
+        """Statistics of sentiment and every engagement metric."""
+        return {
+            'tweets': self.tweets,
+            'sentiment': {**self.sentiment.describe(), 'positive': self.positive,
+                          'negative': self.negative, 'neutral': self.neutral},
+            **{metric: summary.describe() for metric, summary in self.engagement.items()},
+        }
+
+    def to_dict(self) -> Dict:
+        return {
+            'k': self.k,
+            'compression': self.compression,
+            'tweets': self.tweets,
+            'positive': self.positive,
+            'negative': self.negative,
+            'neutral': self.neutral,
+            'sentiment': self.sentiment.to_dict(),
+            'engagement': {metric: s.to_dict() for metric, s in self.engagement.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> 'TweetSummary':
+        summary = cls(state['k'], state['compression'])
+        summary.tweets = state['tweets']
+        summary.positive = state['positive']
+        summary.negative = state['negative']
+        summary.neutral = state['neutral']
+        summary.sentiment = ColumnSummary.from_dict(state['sentiment'], FixedHistogram)
+        summary.engagement = {
+            metric: ColumnSummary.from_dict(s, Log2Histogram)
+            for metric, s in state['engagement'].items()
+        }
+        return summary
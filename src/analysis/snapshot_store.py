@@ -0,0 +1,321 @@
+import os
+import json
+import uuid
+import shutil
+import logging
+from datetime import date, datetime, timedelta
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from src.database.db_handler import DatabaseHandler
+from src.config.config_loader import get_analysis_config
+from src.data_processing.sentiment_backends import TextBlobBackend, get_sentiment_backend
+
+
+class ParquetSnapshotStore:
+    """
+    Local Parquet copy of the tweets table for offline analysis.
+
+    Tweets are written to one directory per creation date
+    (``<root>/date=YYYY-MM-DD/part-*.parquet``) with metrics flattened into
+    typed columns and the sentiment score stored alongside. A sync only
+    exports tweets collected after the last synced ``collected_at`` or
+    scored after the last synced ``scored_at``, so re-collected and
+    (re-)scored tweets are appended again and the loader keeps the most
+    recently written copy of every tweet.
+    """
+
+    DEFAULT_ROOT = 'snapshots'
+    STATE_FILE = '_state.json'
+    # Re-read a small window before the watermark to catch late commits
+    DEFAULT_OVERLAP = timedelta(minutes=5)
+
+    SCHEMA = pa.schema([
+        ('id', pa.int64()),
+        ('text', pa.string()),
+        ('created_at', pa.timestamp('us')),
+        ('collected_at', pa.timestamp('us')),
+        ('account_name', pa.string()),
+        ('lang', pa.string()),
+        ('is_political_account', pa.bool_()),
+        ('retweet_count', pa.int64()),
+        ('reply_count', pa.int64()),
+        ('like_count', pa.int64()),
+        ('quote_count', pa.int64()),
+        ('sentiment', pa.float64()),
+    ])
+    COLUMNS = SCHEMA.names
+
+    def __init__(self, root: str = None, db: DatabaseHandler = None,
+                 sentiment_version: str = None, overlap: timedelta = DEFAULT_OVERLAP):
+        """
+        Args:
+            root: Snapshot directory, defaults to the ``snapshot_dir`` setting
+            db: Handler used by sync, a pooled one is opened when needed
+            sentiment_version: Scorer version of the sentiment column, defaults
+                to the configured backend's
+            overlap: Window before the watermark that is exported again
+        """
+        self.logger = logging.getLogger(__name__)
+        self.root = root or get_analysis_config().get('snapshot_dir', self.DEFAULT_ROOT)
+        self.db = db
+        self.sentiment_version = sentiment_version or configured_sentiment_version()
+        self.overlap = overlap
+
+    @property
+    def state_path(self) -> str:
+        return os.path.join(self.root, self.STATE_FILE)
+
+    def read_state(self) -> Dict:
+        """Return the sync state, empty if the snapshot was never synced."""
+        if not os.path.exists(self.state_path):
+            return {}
+        with open(self.state_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write_state(self, state: Dict) -> None:
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def _partition_dir(self, day: date) -> str:
+        return os.path.join(self.root, f"date={day.isoformat()}")
+
+    def partitions(self) -> List[date]:
+        """Creation dates present in the snapshot, oldest first."""
+        if not os.path.isdir(self.root):
+            return []
+        days = []
+        for name in os.listdir(self.root):
+            if name.startswith('date='):
+                try:
+                    days.append(date.fromisoformat(name[len('date='):]))
+                except ValueError:
+                    continue
+        return sorted(days)
+
+    def sync(self, full: bool = False) -> Dict:
+        """
+        Export tweets collected or scored since the last sync.
+
+        New part files only become visible once the export finished, and
+        the watermark is advanced last, so an interrupted sync is simply
+        repeated on the next run.
+
+        Args:
+            full: Discard the snapshot and export the whole table
+
+        Returns:
+            Dictionary with the number of exported rows, written files and
+            the new watermarks
+        """
+        if full and os.path.isdir(self.root):
+            shutil.rmtree(self.root)
+        os.makedirs(self.root, exist_ok=True)
+
+        state = self.read_state()
+        watermark = collected_after = None
+        if state.get('watermark'):
+            watermark = datetime.fromisoformat(state['watermark'])
+            collected_after = watermark - self.overlap
+        # Scores are timestamped by the database clock, so they get their own watermark.
+        # Snapshots synced before it existed start from the collection watermark.
+        sentiment_watermark = scored_after = None
+        if state.get('sentiment_watermark'):
+            sentiment_watermark = datetime.fromisoformat(state['sentiment_watermark'])
+            scored_after = sentiment_watermark - self.overlap
+        elif collected_after is not None:
+            scored_after = collected_after
+
+        own_db = self.db is None
+        db = self.db or DatabaseHandler()
+        part_name = f"part-{datetime.now():%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}.parquet"
+        writers = {}
+        rows = 0
+        try:
+            for chunk in db.stream_tweets(self.COLUMNS + ['scored_at'],
+                                          sentiment_version=self.sentiment_version,
+                                          collected_after=collected_after,
+                                          scored_after=scored_after):
+                df = pd.DataFrame(chunk, columns=self.COLUMNS + ['scored_at'])
+                df['created_at'] = pd.to_datetime(df['created_at'])
+                df['collected_at'] = pd.to_datetime(df['collected_at'])
+                chunk_max = df['collected_at'].max()
+                watermark = chunk_max if watermark is None else max(watermark, chunk_max)
+                scored_max = pd.to_datetime(df.pop('scored_at')).max()
+                if pd.notna(scored_max):
+                    sentiment_watermark = (scored_max if sentiment_watermark is None
+                                           else max(sentiment_watermark, scored_max))
+                rows += len(df)
+
+                for day, group in df.groupby(df['created_at'].dt.date):
+                    if day not in writers:
+                        os.makedirs(self._partition_dir(day), exist_ok=True)
+                        tmp_path = os.path.join(self._partition_dir(day), f"{part_name}.tmp")
+                        writers[day] = pq.ParquetWriter(tmp_path, self.SCHEMA)
+                    writers[day].write_table(
+                        pa.Table.from_pandas(group, schema=self.SCHEMA, preserve_index=False)
+                    )
+
+            for writer in writers.values():
+                writer.close()
+            for day in writers:
+                tmp_path = os.path.join(self._partition_dir(day), f"{part_name}.tmp")
+                os.replace(tmp_path, tmp_path[:-len('.tmp')])
+
+        except Exception as e:
+            for day, writer in writers.items():
+                writer.close()
+                tmp_path = os.path.join(self._partition_dir(day), f"{part_name}.tmp")
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            self.logger.error(f"Error syncing Parquet snapshot: {str(e)}")
+            raise
+        finally:
+            if own_db:
+                db.close()
+
+        if watermark is not None:
+            state['watermark'] = pd.Timestamp(watermark).isoformat()
+        if sentiment_watermark is not None:
+            state['sentiment_watermark'] = pd.Timestamp(sentiment_watermark).isoformat()
+        state['synced_at'] = datetime.now().isoformat()
+        self._write_state(state)
+
+        self.logger.info(f"Synced {rows} tweets into {len(writers)} snapshot partitions")
+        return {'rows': rows, 'files': len(writers), 'watermark': state.get('watermark'),
+                'sentiment_watermark': state.get('sentiment_watermark')}
+
+    def _files(self, start: datetime = None, end: datetime = None) -> List[str]:
+        """Part files whose creation date can overlap [start, end)."""
+        files = []
+        for day in self.partitions():
+            if start is not None and day < start.date():
+                continue
+            if end is not None and datetime.combine(day, datetime.min.time()) >= end:
+                continue
+            directory = self._partition_dir(day)
+            files.extend(
+                os.path.join(directory, name) for name in sorted(os.listdir(directory))
+                if name.endswith('.parquet')
+            )
+        return files
+
+    def load_table(self, columns: List[str] = None, start: datetime = None,
+                   end: datetime = None, accounts: List[str] = None) -> pa.Table:
+        """
+        Read a slice of the snapshot as an Arrow table.
+
+        Only the date directories overlapping the range are opened, and only
+        the requested columns are read from the memory-mapped files.
+
+        Args:
+            columns: Columns to return, defaults to all
+            start: Only tweets created at or after this time
+            end: Only tweets created before this time
+            accounts: Only tweets from these account names
+
+        Returns:
+            Arrow table with one row per tweet, the latest collected copy,
+            and among copies collected at the same time the last written one
+        """
+        columns = list(columns or self.COLUMNS)
+        unknown = set(columns) - set(self.COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown snapshot columns: {sorted(unknown)}")
+        # Deduplication and filtering need these even if not requested
+        read_columns = columns + [c for c in ('id', 'collected_at') if c not in columns]
+        if start is not None or end is not None:
+            read_columns += ['created_at'] if 'created_at' not in read_columns else []
+        if accounts is not None and 'account_name' not in read_columns:
+            read_columns.append('account_name')
+
+        tables = [pq.read_table(path, columns=read_columns, memory_map=True)
+                  for path in self._files(start, end)]
+        if not tables:
+            return self.SCHEMA.empty_table().select(columns)
+        table = pa.concat_tables(tables)
+        # Files are in write order, a later copy carries a newer sentiment score
+        table = table.append_column('_row', pa.array(np.arange(len(table))))
+
+        mask = None
+        if start is not None:
+            mask = pc.greater_equal(table['created_at'], pa.scalar(start, pa.timestamp('us')))
+        if end is not None:
+            before = pc.less(table['created_at'], pa.scalar(end, pa.timestamp('us')))
+            mask = before if mask is None else pc.and_(mask, before)
+        if accounts is not None:
+            in_accounts = pc.is_in(table['account_name'], value_set=pa.array(list(accounts)))
+            mask = in_accounts if mask is None else pc.and_(mask, in_accounts)
+        if mask is not None:
+            table = table.filter(mask)
+
+        # Keep the most recently collected copy of every tweet
+        order = pc.sort_indices(table, sort_keys=[('id', 'ascending'),
+                                                  ('collected_at', 'descending'),
+                                                  ('_row', 'descending')])
+        table = table.take(order)
+        ids = table['id'].to_numpy()
+        first = np.ones(len(ids), dtype=bool)
+        first[1:] = ids[1:] != ids[:-1]
+        table = table.filter(pa.array(first))
+        return table.select(columns)
+
+    def load(self, columns: List[str] = None, start: datetime = None,
+             end: datetime = None, accounts: List[str] = None) -> pd.DataFrame:
+        """Read a slice of the snapshot as a DataFrame, see load_table."""
+        return self.load_table(columns, start=start, end=end, accounts=accounts).to_pandas()
+
+    def compact(self) -> int:
+        """
+        Rewrite every date directory with several part files as a single file.
+
+        Returns:
+            Number of compacted date directories
+        """
+        compacted = 0
+        for day in self.partitions():
+            directory = self._partition_dir(day)
+            parts = sorted(name for name in os.listdir(directory) if name.endswith('.parquet'))
+            if len(parts) < 2:
+                continue
+            start = datetime.combine(day, datetime.min.time())
+            table = self.load_table(start=start, end=start + timedelta(days=1))
+            name = f"part-{datetime.now():%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}.parquet"
+            tmp_path = os.path.join(directory, f"{name}.tmp")
+            pq.write_table(table.sort_by([('created_at', 'descending')]), tmp_path)
+            # The merged file is complete before the parts it replaces go away
+            os.replace(tmp_path, os.path.join(directory, name))
+            for part in parts:
+                os.remove(os.path.join(directory, part))
+            compacted += 1
+        return compacted
+
+
+def configured_sentiment_version() -> str:
+    """Version of the sentiment backend selected in the analysis config."""
+    analysis_config = get_analysis_config()
+    return get_sentiment_backend(
+        analysis_config.get('sentiment_backend', TextBlobBackend.name),
+        **analysis_config.get('sentiment_backend_options', {})
+    ).version
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    store = ParquetSnapshotStore()
+    try:
+        result = store.sync()
+        print(f"Exported {result['rows']} tweets, watermark {result['watermark']}")
+    except Exception as e:
+        print(f"Error syncing snapshot: {str(e)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,531 @@
+import os
+import json
+import math
+import time
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, Sequence
+
+from src.config.config_loader import get_analysis_config
+from src.database.db_handler import DatabaseHandler
+from src.data_processing.sentiment_backends import TextBlobBackend, get_sentiment_backend
+
+# Series key aggregating all accounts
+OVERALL = '__all__'
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _epoch_seconds(ts) -> float:
+    """Seconds since the epoch of a naive (UTC) or aware timestamp."""
+    if isinstance(ts, str):
+        ts = datetime.fromisoformat(ts)
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return (ts - _EPOCH).total_seconds()
+
+
+def _anscombe(count: float) -> float:
+    """Variance-stabilize a Poisson count, the result has a variance of about 1."""
+    return 2 * math.sqrt(count + 3 / 8)
+
+
+def _inverse_anscombe(value: float) -> float:
+    return max(0.0, (value / 2) ** 2 - 3 / 8)
+
+
+class EwmaBaseline:
+    """Exponentially weighted mean and variance of a series of bucket values."""
+
+    def __init__(self, alpha: float, min_variance: float):
+        self.alpha = alpha
+        self.min_variance = min_variance
+        self.mean = None
+        self.variance = 0.0
+        self.count = 0
+
+    def zscore(self, value: float) -> float:
+        """Distance of a value from the baseline in standard deviations."""
+        if self.mean is None:
+            return 0.0
+        return (value - self.mean) / math.sqrt(max(self.variance, self.min_variance))
+
+    def update(self, value: float) -> None:
+        self.count += 1
+        if self.mean is None:
+            self.mean = value
+            return
+        diff = value - self.mean
+        increment = self.alpha * diff
+        self.mean += increment
+        self.variance = (1 - self.alpha) * (self.variance + diff * increment)
+
+    def to_dict(self) -> Dict:
+        return {'mean': self.mean, 'variance': self.variance, 'count': self.count}
+
+    def load(self, state: Dict) -> None:
+        self.mean = state['mean']
+        self.variance = state['variance']
+        self.count = state['count']
+
+
+class WindowSeries:
+    """
+    One rolling window of one account, kept as a ring of time buckets.
+
+    Adding a tweet touches one bucket and the running totals; moving the
+    window forward clears the buckets that fell out of it, which is at most
+    one bucket per elapsed bucket.
+
+    Tweets may arrive out of order, e.g. when the collector pages newest
+    first. A bucket therefore stays open for ``lateness_buckets`` buckets
+    after the newest one seen (the watermark) and late tweets still count
+    in it. Only then is it compared with the EWMA baselines of earlier
+    buckets and joins them. Tweets arriving after their bucket closed still
+    count in the window statistics, but not in the baselines.
+    """
+
+    FIELDS = ('tweets', 'scored', 'sentiment', 'engagement')
+
+    def __init__(self, buckets: int, bucket_seconds: int, lateness_buckets: int = 0):
+        self.buckets = buckets
+        self.bucket_seconds = bucket_seconds
+        # Open buckets must still be inside the ring when they close
+        self.lateness_buckets = max(0, min(lateness_buckets, buckets - 1))
+        # Index of the newest bucket, counted in bucket_seconds since the epoch
+        self.head = None
+        # Newest bucket already compared with the baselines
+        self.closed = None
+        self.late = 0
+        self.rings = {field: [0] * buckets for field in self.FIELDS}
+        self.totals = dict.fromkeys(self.FIELDS, 0)
+        alpha = 2 / (buckets + 1)
+        # Tracks Anscombe-transformed counts, whose variance is at least about 1
+        # for Poisson traffic, so quiet series don't flag every small burst
+        self.volume = EwmaBaseline(alpha, min_variance=1.0)
+        self.sentiment = EwmaBaseline(alpha, min_variance=0.01)
+
+    def add(self, bucket: int, scored: bool, sentiment: float, engagement: float) -> List[tuple]:
+        """
+        Count a tweet in the given bucket.
+
+        Returns:
+            (bucket, tweets, scored, sentiment sum) of the buckets closed by moving forward
+        """
+        completed = self.advance(bucket)
+        if bucket <= self.head - self.buckets:
+            # Older than the window
+            return completed
+        if bucket <= self.closed:
+            self.late += 1
+        slot = bucket % self.buckets
+        values = (1, int(scored), sentiment if scored else 0, engagement)
+        for field, value in zip(self.FIELDS, values):
+            self.rings[field][slot] += value
+            self.totals[field] += value
+        return completed
+
+    def advance(self, bucket: int) -> List[tuple]:
+        """Move the newest bucket forward, returning the buckets closed on the way."""
+        if self.head is None:
+            self.head = bucket
+            self.closed = bucket - self.lateness_buckets - 1
+            return []
+        if bucket <= self.head:
+            return []
+        # Close before evicting, closing buckets are never older than the ring
+        completed = self._close(bucket - self.lateness_buckets - 1)
+
+        if bucket - self.head >= self.buckets:
+            for field in self.FIELDS:
+                self.rings[field] = [0] * self.buckets
+            self.totals = dict.fromkeys(self.FIELDS, 0)
+        else:
+            for evicted in range(self.head + 1, bucket + 1):
+                slot = evicted % self.buckets
+                for field in self.FIELDS:
+                    self.totals[field] -= self.rings[field][slot]
+                    self.rings[field][slot] = 0
+        self.head = bucket
+        return completed
+
+    def _close(self, upto: int) -> List[tuple]:
+        """Close every open bucket up to ``upto`` and return their values."""
+        completed = []
+        bucket = self.closed + 1
+        while bucket <= min(upto, self.head):
+            slot = bucket % self.buckets
+            completed.append((bucket, self.rings['tweets'][slot], self.rings['scored'][slot],
+                              self.rings['sentiment'][slot]))
+            bucket += 1
+        if upto >= bucket:
+            # Quiet buckets after the newest tweet, more than a window of them changes nothing
+            first = max(bucket, upto - self.buckets + 1)
+            completed.extend((b, 0, 0, 0) for b in range(first, upto + 1))
+        self.closed = max(self.closed, upto)
+        return completed
+
+    def stats(self, as_of: int = None) -> Dict:
+        """
+        Statistics of the window ending with bucket ``as_of``, the newest bucket if omitted.
+
+        Reading a later bucket leaves the series untouched and only sums the
+        buckets still inside that window.
+        """
+        if self.head is None:
+            return {'start': None, 'end': None, 'tweets': 0, 'mean_sentiment': None,
+                    'engagement': 0, 'mean_engagement': None, 'late': 0}
+        as_of = self.head if as_of is None else max(as_of, self.head)
+        if as_of == self.head:
+            totals = self.totals
+        else:
+            totals = dict.fromkeys(self.FIELDS, 0)
+            for bucket in range(max(as_of - self.buckets + 1, self.head - self.buckets + 1),
+                                self.head + 1):
+                for field in self.FIELDS:
+                    totals[field] += self.rings[field][bucket % self.buckets]
+        tweets = totals['tweets']
+        scored = totals['scored']
+        end = _EPOCH + timedelta(seconds=(as_of + 1) * self.bucket_seconds)
+        return {
+            'start': (end - timedelta(seconds=self.buckets * self.bucket_seconds)).isoformat(),
+            'end': end.isoformat(),
+            'tweets': tweets,
+            'mean_sentiment': totals['sentiment'] / scored if scored else None,
+            'engagement': totals['engagement'],
+            'mean_engagement': totals['engagement'] / tweets if tweets else None,
+            'late': self.late,
+        }
+
+    def to_dict(self) -> Dict:
+        return {
+            'head': self.head,
+            'closed': self.closed,
+            'late': self.late,
+            'rings': self.rings,
+            'volume_scale': 'anscombe',
+            'volume': self.volume.to_dict(),
+            'sentiment': self.sentiment.to_dict(),
+        }
+
+    def load(self, state: Dict) -> None:
+        self.head = state['head']
+        self.closed = state.get('closed')
+        if self.closed is None and self.head is not None:
+            self.closed = self.head - 1
+        self.late = state.get('late', 0)
+        self.rings = state['rings']
+        # Recomputing avoids carrying float drift of the running sums across restarts
+        self.totals = {field: sum(values) for field, values in self.rings.items()}
+        # Baselines of raw counts from older checkpoints are relearned
+        if state.get('volume_scale') == 'anscombe':
+            self.volume.load(state['volume'])
+        self.sentiment.load(state['sentiment'])
+
+
+class StreamingAnalytics:
+    """
+    Rolling 1h, 24h and 7d statistics of tweets as they are stored.
+
+    Registered as a commit hook, it receives every newly inserted tweet once
+    it is committed and updates tweet volume, mean sentiment and engagement
+    per account and overall in constant time per tweet and window. Windows
+    follow the tweets' creation time, memory is bounded by the bucket rings.
+
+    A bucket closes once the newest tweet seen is ``allowed_lateness``
+    seconds past its end, so tweets delivered out of order still count in
+    it. Its volume and mean sentiment are then compared with an EWMA
+    baseline of the preceding buckets; a z-score beyond the threshold
+    raises a ``volume_spike``, ``volume_drop`` or ``sentiment_shift``
+    event. The state is checkpointed to a JSON file, so a restarted
+    collector continues where it stopped.
+    """
+
+    # name -> (window seconds, bucket seconds)
+    DEFAULT_WINDOWS = {
+        '1h': (3600, 60),
+        '24h': (24 * 3600, 15 * 60),
+        '7d': (7 * 24 * 3600, 3600),
+    }
+    DEFAULT_CHECKPOINT_PATH = 'streaming_state.json'
+    DEFAULT_CHECKPOINT_INTERVAL = 60
+    DEFAULT_Z_THRESHOLD = 4.0
+    DEFAULT_MIN_COUNT = 5
+    DEFAULT_ALLOWED_LATENESS = 15 * 60
+    # Completed buckets a baseline needs before it raises events
+    DEFAULT_WARMUP_BUCKETS = 12
+    DEFAULT_MAX_ACCOUNTS = 1000
+    MAX_EVENTS = 200
+
+    def __init__(self, windows: Dict[str, Sequence[int]] = None, checkpoint_path: str = None,
+                 scorer=None, z_threshold: float = None, min_count: int = None,
+                 max_accounts: int = None, checkpoint_interval: float = None,
+                 allowed_lateness: float = None):
+        """
+        Args:
+            windows: name -> (window seconds, bucket seconds), defaults to 1h, 24h and 7d
+            checkpoint_path: State file, defaults to the ``streaming`` config
+            scorer: Sentiment backend for incoming tweets, the configured one if
+                omitted, False to track no sentiment
+            z_threshold: Deviation from the baseline that raises an event
+            min_count: Minimum bucket volume for spikes and sentiment shifts
+            max_accounts: Accounts tracked individually, later ones only count overall
+            checkpoint_interval: Seconds between automatic checkpoints
+            allowed_lateness: Seconds a bucket stays open for tweets arriving
+                out of order, capped at the window length minus one bucket
+        """
+        self.logger = logging.getLogger(__name__)
+        analysis_config = get_analysis_config()
+        config = analysis_config.get('streaming', {})
+        self.windows = {name: tuple(spec) for name, spec in
+                        (windows or config.get('windows') or self.DEFAULT_WINDOWS).items()}
+        self.checkpoint_path = (checkpoint_path
+                                or config.get('checkpoint_path', self.DEFAULT_CHECKPOINT_PATH))
+        self.checkpoint_interval = (checkpoint_interval or config.get(
+            'checkpoint_interval', self.DEFAULT_CHECKPOINT_INTERVAL))
+        self.z_threshold = z_threshold or config.get('z_threshold', self.DEFAULT_Z_THRESHOLD)
+        self.min_count = min_count or config.get('min_count', self.DEFAULT_MIN_COUNT)
+        self.max_accounts = max_accounts or config.get('max_accounts', self.DEFAULT_MAX_ACCOUNTS)
+        self.allowed_lateness = (allowed_lateness if allowed_lateness is not None else config.get(
+            'allowed_lateness', self.DEFAULT_ALLOWED_LATENESS))
+        if scorer is None and config.get('score_sentiment', True):
+            scorer = get_sentiment_backend(
+                analysis_config.get('sentiment_backend', TextBlobBackend.name),
+                **analysis_config.get('sentiment_backend_options', {})
+            )
+        self.scorer = scorer or None
+
+        # window name -> account (or OVERALL) -> series
+        self.series = {name: {} for name in self.windows}
+        self.events = deque(maxlen=self.MAX_EVENTS)
+        self.listeners: List[Callable[[Dict], None]] = []
+        self._lock = threading.Lock()
+        self._last_checkpoint = time.monotonic()
+
+    def _get_series(self, window: str, key: str) -> WindowSeries:
+        series = self.series[window].get(key)
+        if series is None:
+            length, bucket_seconds = self.windows[window]
+            series = self.series[window][key] = WindowSeries(
+                length // bucket_seconds, bucket_seconds,
+                math.ceil(self.allowed_lateness / bucket_seconds)
+            )
+        return series
+
+    def add_listener(self, listener: Callable[[Dict], None]) -> None:
+        """Call ``listener(event)`` for every spike or anomaly event."""
+        self.listeners.append(listener)
+
+    def add_tweets(self, tweets: Iterable[Dict], sentiments: Sequence[float] = None) -> List[Dict]:
+        """
+        Add tweets to all windows.
+
+        Args:
+            tweets: Dicts with created_at, text, account_name and metric columns
+            sentiments: Scores of the tweets, computed with the scorer if omitted
+
+        Returns:
+            Events raised while adding
+        """
+        tweets = list(tweets)
+        if not tweets:
+            return []
+        if sentiments is None and self.scorer is not None:
+            sentiments = self.scorer.score_batch([tweet['text'] for tweet in tweets])
+
+        # Oldest first, so a batch never closes buckets its own older tweets belong to
+        seconds = [_epoch_seconds(tweet['created_at']) for tweet in tweets]
+        order = sorted(range(len(tweets)), key=seconds.__getitem__)
+
+        events = []
+        with self._lock:
+            for i in order:
+                tweet = tweets[i]
+                sentiment = float(sentiments[i]) if sentiments is not None else 0.0
+                engagement = sum(tweet.get(metric) or 0
+                                 for metric in DatabaseHandler.METRIC_COLUMNS)
+                account = tweet.get('account_name')
+                for window, (_, bucket_seconds) in self.windows.items():
+                    bucket = int(seconds[i] // bucket_seconds)
+                    keys = [OVERALL]
+                    if account and (account in self.series[window]
+                                    or len(self.series[window]) <= self.max_accounts):
+                        keys.append(account)
+                    for key in keys:
+                        series = self._get_series(window, key)
+                        completed = series.add(bucket, sentiments is not None,
+                                               sentiment, engagement)
+                        events.extend(self._check(window, key, series, completed))
+        self._emit(events)
+        if time.monotonic() - self._last_checkpoint >= self.checkpoint_interval:
+            self.save_checkpoint()
+        return events
+
+    def advance(self, now: datetime = None) -> List[Dict]:
+        """Move all windows forward to ``now`` (UTC), completing quiet buckets."""
+        seconds = _epoch_seconds(now or datetime.now(timezone.utc))
+        events = []
+        with self._lock:
+            for window, (_, bucket_seconds) in self.windows.items():
+                bucket = int(seconds // bucket_seconds)
+                for key, series in self.series[window].items():
+                    events.extend(self._check(window, key, series, series.advance(bucket)))
+        self._emit(events)
+        return events
+
+    def _check(self, window: str, key: str, series: WindowSeries,
+               completed: List[tuple]) -> List[Dict]:
+        """Compare completed buckets with the baselines, then fold them in."""
+        events = []
+        for bucket, tweets, scored, sentiment_sum in completed:
+            volume = series.volume
+            stabilized = _anscombe(tweets)
+            if volume.count >= self.DEFAULT_WARMUP_BUCKETS:
+                z = volume.zscore(stabilized)
+                expected = _inverse_anscombe(volume.mean)
+                if z >= self.z_threshold and tweets >= self.min_count:
+                    events.append(self._event('volume_spike', window, key, series,
+                                              bucket, tweets, expected, z))
+                elif z <= -self.z_threshold and expected >= self.min_count:
+                    events.append(self._event('volume_drop', window, key, series,
+                                              bucket, tweets, expected, z))
+            volume.update(stabilized)
+
+            if scored >= self.min_count:
+                mean_sentiment = sentiment_sum / scored
+                baseline = series.sentiment
+                if baseline.count >= self.DEFAULT_WARMUP_BUCKETS:
+                    z = baseline.zscore(mean_sentiment)
+                    if abs(z) >= self.z_threshold:
+                        events.append(self._event('sentiment_shift', window, key, series,
+                                                  bucket, mean_sentiment, baseline.mean, z))
+                baseline.update(mean_sentiment)
+        return events
+
+    @staticmethod
+    def _event(kind: str, window: str, key: str, series: WindowSeries, bucket: int,
+               value: float, baseline: float, z: float) -> Dict:
+        return {
+            'type': kind,
+            'window': window,
+            'account': None if key == OVERALL else key,
+            'bucket_start': (_EPOCH + timedelta(seconds=bucket * series.bucket_seconds)).isoformat(),
+            'value': round(value, 4),
+            'baseline': round(baseline, 4),
+            'zscore': round(z, 2),
+        }
+
+    def _emit(self, events: List[Dict]) -> None:
+        for event in events:
+            self.events.append(event)
+            self.logger.warning(
+                f"{event['type']} in {event['window']} window for "
+                f"{event['account'] or 'all accounts'} at {event['bucket_start']}: "
+                f"{event['value']} vs baseline {event['baseline']} (z={event['zscore']})"
+            )
+            for listener in self.listeners:
+                try:
+                    listener(event)
+                except Exception as e:
+                    self.logger.error(f"Error in streaming event listener: {str(e)}")
+
+    def on_tweets_committed(self, tweets: List[Dict]) -> None:
+        """Commit hook, see ``DatabaseHandler.add_commit_hook``."""
+        self.add_tweets(tweets)
+
+    def register(self, db: DatabaseHandler) -> None:
+        """Feed every tweet the handler commits from now on into the windows."""
+        db.add_commit_hook(self.on_tweets_committed)
+
+    def snapshot(self, now: datetime = None, window: str = None, accounts: bool = True) -> Dict:
+        """
+        Current statistics of the windows.
+
+        Args:
+            now: End of the windows (UTC), the newest tweet of each series if omitted
+            window: Only this window, all if omitted
+            accounts: Include the per-account statistics
+
+        Returns:
+            Dict mapping window name to ``overall`` stats and, optionally,
+            ``accounts`` mapping account name to stats
+        """
+        seconds = None if now is None else _epoch_seconds(now)
+        names = [window] if window else list(self.windows)
+        result = {}
+        with self._lock:
+            for name in names:
+                bucket_seconds = self.windows[name][1]
+                as_of = None if seconds is None else int(seconds // bucket_seconds)
+                series = self.series[name]
+                result[name] = {
+                    'overall': series[OVERALL].stats(as_of) if OVERALL in series else None,
+                }
+                if accounts:
+                    result[name]['accounts'] = {
+                        key: s.stats(as_of) for key, s in sorted(series.items()) if key != OVERALL
+                    }
+        return result
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                'saved_at': datetime.now().isoformat(),
+                'windows': {name: list(spec) for name, spec in self.windows.items()},
+                'series': {
+                    window: {key: series.to_dict() for key, series in by_key.items()}
+                    for window, by_key in self.series.items()
+                },
+                'events': list(self.events),
+            }
+
+    def load_dict(self, state: Dict) -> None:
+        """Restore a saved state, skipping windows whose layout changed since."""
+        with self._lock:
+            for window, by_key in state.get('series', {}).items():
+                if tuple(state['windows'].get(window, ())) != self.windows.get(window):
+                    self.logger.warning(f"Window {window} changed, not restoring its state")
+                    continue
+                for key, series_state in by_key.items():
+                    self._get_series(window, key).load(series_state)
+            self.events.extend(state.get('events', []))
+
+    def save_checkpoint(self, path: str = None) -> None:
+        """Write the state to the checkpoint file, replacing it atomically."""
+        path = path or self.checkpoint_path
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.to_dict(), f)
+            os.replace(tmp_path, path)
+            self._last_checkpoint = time.monotonic()
+        except OSError as e:
+            self.logger.error(f"Error saving streaming checkpoint: {str(e)}")
+
+    def load_checkpoint(self, path: str = None) -> bool:
+        """
+        Restore the state from the checkpoint file.
+
+        Returns:
+            Whether a checkpoint was found
+        """
+        path = path or self.checkpoint_path
+        if not os.path.exists(path):
+            return False
+        with open(path, encoding='utf-8') as f:
+            self.load_dict(json.load(f))
+        self.logger.info(f"Restored streaming windows from {path}")
+        return True
+
+    @classmethod
+    def from_checkpoint(cls, path: str = None, **kwargs) -> 'StreamingAnalytics':
+        """Create an instance and restore the checkpoint if one exists."""
+        analytics = cls(checkpoint_path=path, **kwargs)
+        analytics.load_checkpoint()
+        return analytics
+
+    def close(self) -> None:
+        """Write a final checkpoint."""
+        self.save_checkpoint()
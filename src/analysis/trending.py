@@ -0,0 +1,166 @@
+import math
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Union
+
+from src.config.config_loader import get_analysis_config
+from src.database.db_handler import DatabaseHandler
+from src.analysis.keyword_matcher import KeywordMatcher
+
+# Used when the trending config names no keywords
+DEFAULT_KEYWORDS = {
+    'Bundestag': ['Bundestag', '#Bundestag'],
+    'Bundesregierung': ['Bundesregierung', 'Ampel', 'Ampelkoalition', '#Ampel'],
+    'CDU': ['CDU', 'CSU', 'Union', '#CDU', '#CSU'],
+    'SPD': ['SPD', '#SPD'],
+    'Grüne': ['Grüne', 'Grünen', 'Die Grünen', '#Grüne'],
+    'FDP': ['FDP', '#FDP'],
+    'AfD': ['AfD', '#AfD'],
+    'Linke': ['Linke', 'Die Linke', '#Linke'],
+    'BSW': ['BSW', 'Wagenknecht'],
+    'Scholz': ['Scholz', 'Olaf Scholz', '@OlafScholz'],
+    'Merz': ['Merz', 'Friedrich Merz', '@_FriedrichMerz'],
+    'Baerbock': ['Baerbock', 'Annalena Baerbock', '@ABaerbock'],
+    'Lindner': ['Lindner', 'Christian Lindner', '@c_lindner'],
+    'Habeck': ['Habeck', 'Robert Habeck'],
+    'Bundestagswahl': ['Bundestagswahl', '#btw25', '#btw2025', 'Wahlkampf'],
+    'Haushalt': ['Haushalt', 'Haushaltskrise', 'Schuldenbremse'],
+    'Migration': ['Migration', 'Asyl', 'Asylpolitik', 'Grenzkontrollen'],
+    'Klimaschutz': ['Klimaschutz', 'Klimapolitik', 'Heizungsgesetz', '#Klima'],
+    'Rente': ['Rente', 'Rentenpaket', 'Rentenreform'],
+    'Bürgergeld': ['Bürgergeld'],
+    'Ukraine': ['Ukraine', 'Taurus', 'Waffenlieferungen'],
+    'Wirtschaft': ['Wirtschaft', 'Rezession', 'Inflation', 'Energiepreise'],
+}
+
+
+class TrendingEngine:
+    """
+    Keeps hourly keyword counters and ranks keywords by how much they trend.
+
+    Registered as a store hook, the engine matches every newly inserted
+    tweet against the keyword dictionary in a single Aho-Corasick pass and
+    adds one count per matched keyword to ``keyword_hourly_counts`` in the
+    same transaction. Trend scores then only read those counters.
+
+    A keyword trends when its count in the recent window exceeds what its
+    baseline rate predicts. The score is ``(current - expected) /
+    sqrt(expected + 1)``, a Poisson-style z-score that favours sustained
+    surges over small keywords jumping from one to three mentions.
+    """
+
+    DEFAULT_WINDOW_HOURS = 3
+    DEFAULT_BASELINE_HOURS = 7 * 24
+    DEFAULT_MIN_COUNT = 3
+
+    def __init__(self, keywords: Union[Iterable[str], Dict[str, Iterable[str]]] = None,
+                 window_hours: int = None, baseline_hours: int = None, min_count: int = None):
+        """
+        Args:
+            keywords: Keyword list or topic -> aliases dict, defaults to the
+                ``trending`` config or DEFAULT_KEYWORDS
+            window_hours: Length of the recent window
+            baseline_hours: Length of the baseline before the window
+            min_count: Minimum window count of a reported keyword
+        """
+        self.logger = logging.getLogger(__name__)
+        config = get_analysis_config().get('trending', {})
+        if keywords is None:
+            keywords = config.get('keywords') or self._load_keywords(config.get('keywords_path'))
+        self.matcher = KeywordMatcher(keywords or DEFAULT_KEYWORDS)
+        self.window_hours = window_hours or config.get('window_hours', self.DEFAULT_WINDOW_HOURS)
+        self.baseline_hours = (baseline_hours
+                               or config.get('baseline_hours', self.DEFAULT_BASELINE_HOURS))
+        self.min_count = min_count or config.get('min_count', self.DEFAULT_MIN_COUNT)
+
+    @staticmethod
+    def _load_keywords(path: str = None):
+        """
+        Read a keyword file with one topic per line.
+
+        Aliases follow the topic separated by ``|``, e.g. ``SPD|#SPD|Sozis``.
+        """
+        if not path:
+            return None
+        keywords = {}
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                names = [name.strip() for name in line.split('|') if name.strip()]
+                if names:
+                    keywords[names[0]] = names
+        return keywords
+
+    def match(self, tweets: Iterable[Dict]) -> List[tuple]:
+        """Return (created_at, keyword) pairs for every keyword found in each tweet."""
+        topics = self.matcher.topics
+        return [
+            (tweet['created_at'], topics[topic_id])
+            for tweet in tweets
+            for topic_id in self.matcher.match(tweet['text'])
+        ]
+
+    def register(self, db: DatabaseHandler) -> None:
+        """Count the keywords of every tweet the handler inserts from now on."""
+        def count_keywords(cur, tweets):
+            db.add_keyword_counts(cur, self.match(tweets))
+        db.add_store_hook(count_keywords)
+
+    def rebuild(self, db: DatabaseHandler) -> int:
+        """
+        Recount all stored tweets, e.g. after the keyword dictionary changed.
+
+        Runs in one transaction, so readers keep seeing the old counters
+        until the rebuild is committed.
+
+        Returns:
+            Number of keyword matches counted
+        """
+        db.ensure_connection()
+        matched = 0
+        try:
+            with db.conn.cursor() as cur:
+                db.clear_keyword_counts(cur)
+                for rows in db.stream_tweets(['id', 'text', 'created_at']):
+                    matches = self.match(
+                        {'text': text, 'created_at': created_at} for _, text, created_at in rows
+                    )
+                    db.add_keyword_counts(cur, matches)
+                    matched += len(matches)
+            db.conn.commit()
+        except Exception as e:
+            db.conn.rollback()
+            self.logger.error(f"Error rebuilding keyword counts: {str(e)}")
+            raise
+        self.logger.info(f"Rebuilt keyword counts from {matched} matches")
+        return matched
+
+    def trending(self, db: DatabaseHandler, now: datetime = None, limit: int = 20) -> List[Dict]:
+        """
+        Rank keywords by how far their recent count exceeds their baseline rate.
+
+        Args:
+            db: Handler to read the counters from
+            now: End of the recent window, defaults to the database's current hour
+            limit: Maximum number of keywords returned
+
+        Returns:
+            List of dicts with keyword, current and baseline counts, the
+            expected window count, lift and score, highest score first
+        """
+        scale = self.window_hours / self.baseline_hours
+        results = []
+        for keyword, current, baseline in db.get_keyword_window_counts(
+                self.window_hours, self.baseline_hours, now):
+            if current < self.min_count:
+                continue
+            expected = baseline * scale
+            results.append({
+                'keyword': keyword,
+                'current': int(current),
+                'baseline': int(baseline),
+                'expected': round(expected, 2),
+                'lift': round((current + 1) / (expected + 1), 2),
+                'score': round((current - expected) / math.sqrt(expected + 1), 2),
+            })
+        results.sort(key=lambda r: r['score'], reverse=True)
+        return results[:limit]
@@ -1,158 +1,564 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from datetime import datetime
+from datetime import datetime, timedelta
+import hashlib
+import json
 import logging
-from typing import Dict, List
+import os
+from typing import Any, Callable, Dict, Iterator, List, Tuple
 
 from src.database.db_handler import DatabaseHandler
+from src.config.config_loader import get_analysis_config
 from src.data_processing.data_transformer import DataTransformer
+from src.data_processing.sentiment_backends import TextBlobBackend, get_sentiment_backend
+from src.data_processing.near_duplicates import NearDuplicateDetector
+from src.data_processing.frame_schema import apply_compact_schema, memory_report
+from src.analysis.sentiment_rescorer import SentimentRescorer
+from src.analysis.plot_renderer import PlotRenderer
+from src.analysis.trending import TrendingEngine
+from src.analysis.sketches import TweetSummary
+from src.monitoring import instrumentation
 
 class TweetAnalyzer:
     """Analyzes and visualizes German political tweet data."""
 
-    def __init__(self):
-        self.db = DatabaseHandler()
-        self.transformer = DataTransformer()
+    DEFAULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+    ANALYSIS_COLUMNS = ['id', 'text', 'created_at', 'account_name',
+                        'is_political_account', *DatabaseHandler.METRIC_COLUMNS, 'sentiment']
+
+    def __init__(self, cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+                 db: DatabaseHandler = None):
+        """
+        Args:
+            cache_max_bytes: Largest processed frame kept in memory
+            db: Handler to read from, a pooled one is opened if omitted
+        """
+        self.db = db or DatabaseHandler()
         self.logger = logging.getLogger(__name__)
+        analysis_config = get_analysis_config()
+        self.near_duplicate_index_path = None
+        self.transformer = DataTransformer(
+            backend=get_sentiment_backend(
+                analysis_config.get('sentiment_backend', TextBlobBackend.name),
+                **analysis_config.get('sentiment_backend_options', {})
+            ),
+            workers=analysis_config.get('sentiment_workers'),
+            near_duplicates=self._load_near_duplicate_detector(
+                analysis_config.get('near_duplicates')
+            )
+        )
+        self.compact_schema = analysis_config.get('compact_schema', True)
+        self.arrow_strings = analysis_config.get('arrow_strings', False)
+        self.report_memory = analysis_config.get('memory_report', False)
+        self.last_memory_report = None
+        plot_config = analysis_config.get('plots', {})
+        self.renderer = PlotRenderer(
+            output_dir=plot_config.get('output_dir'),
+            formats=plot_config.get('formats'),
+            dpi=plot_config.get('dpi'),
+            workers=plot_config.get('workers')
+        )
+        self.cache_max_bytes = cache_max_bytes
+        self._cached_df = None
+        self._cached_fingerprint = None
+        self._rescorer = None
+        self._trending = None
+        summary_config = analysis_config.get('summaries', {})
+        self.summary_cache_dir = summary_config.get('cache_dir')
+        self.summary_settle_days = summary_config.get('settle_days', 7)
+        self.summary_k = summary_config.get('k', 10)
+        self.summary_compression = summary_config.get('compression', 200)
+
+    def _load_near_duplicate_detector(self, config: Dict = None):
+        """Build the near-duplicate detector, resuming a saved index if configured."""
+        if not config:
+            return None
+        params = {k: v for k, v in config.items() if k != 'index_path'}
+        self.near_duplicate_index_path = config.get('index_path')
+        if self.near_duplicate_index_path and os.path.exists(self.near_duplicate_index_path):
+            try:
+                return NearDuplicateDetector.load(self.near_duplicate_index_path, **params)
+            except ValueError as e:
+                self.logger.warning(f"Rebuilding near-duplicate index: {str(e)}")
+        return NearDuplicateDetector(**params)
+
+    def close(self) -> None:
+        """Stop background work, save the near-duplicate index and release the connection."""
+        if self._rescorer is not None:
+            self._rescorer.stop()
+        if self.near_duplicate_index_path and self.transformer.near_duplicates is not None:
+            self.transformer.near_duplicates.save(self.near_duplicate_index_path)
+        self.db.close()
 
-    def get_tweets_dataframe(self) -> pd.DataFrame:
+    def invalidate_cache(self) -> None:
+        """Drop the memoized tweet DataFrame."""
+        self._cached_df = None
+        self._cached_fingerprint = None
+
+    def _table_fingerprint(self) -> Tuple:
+        """
+        Cheap change marker for the stored tweets.
+
+        Every write to tweets, engagement snapshots or sentiment scores
+        bumps the database's change counter, so reading it needs no scan.
+        """
+        return self.db.get_data_version(), self.transformer.model_version
+
+    def get_tweets_dataframe(self, use_cache: bool = True) -> pd.DataFrame:
         """
         Fetch tweets from database and process them into analysis-ready DataFrame.
-        
+
+        The processed frame is memoized and reused until a write to the
+        tweets, engagement or sentiment tables bumps the change counter.
+
+        Args:
+            use_cache: Reuse the memoized frame if the table is unchanged
+
         Returns:
             DataFrame with processed tweet data and sentiment scores
         """
+        fingerprint = self._table_fingerprint()
+        if use_cache and self._cached_df is not None and fingerprint == self._cached_fingerprint:
+            # Shallow copy so callers adding columns don't touch the cache
+            return self._cached_df.copy(deep=False)
+
+        df = self._load_tweets_dataframe()
+
+        if use_cache:
+            size = df.memory_usage(deep=True).sum()
+            if size <= self.cache_max_bytes:
+                self._cached_df = df
+                # Loading may have stored new sentiment scores, take a fresh marker
+                self._cached_fingerprint = self._table_fingerprint()
+                return df.copy(deep=False)
+            self.logger.info(
+                f"Tweet DataFrame ({size} bytes) exceeds cache limit, not caching"
+            )
+            self.invalidate_cache()
+
+        return df
+
+    @instrumentation.timed('analyzer.load_tweets_dataframe', rows=len)
+    def _load_tweets_dataframe(self) -> pd.DataFrame:
+        """Fetch and transform the tweets table without caching."""
         try:
-            with self.db.conn.cursor() as cur:
-                cur.execute("""
-                    SELECT id, text, created_at, account_name, 
-                           metrics, is_political_account
-                    FROM tweets
-                    ORDER BY created_at DESC
-                """)
-                columns = ['id', 'text', 'created_at', 'account_name', 
-                          'metrics', 'is_political_account']
-                data = cur.fetchall()
-
-            df = pd.DataFrame(data, columns=columns)
-            metrics_df = pd.json_normalize(df['metrics'])
-            df = pd.concat([df.drop('metrics', axis=1), metrics_df], axis=1)
-            
-            # Apply transformations
-            df = self.transformer.clean_tweets(df)
-            df = self.transformer.add_sentiment_analysis(df)
-            
+            chunks = [
+                pd.DataFrame(rows, columns=self.ANALYSIS_COLUMNS)
+                for rows in self.db.stream_tweets(
+                    self.ANALYSIS_COLUMNS, sentiment_version=self.transformer.model_version
+                )
+            ]
+            df = (pd.concat(chunks, ignore_index=True) if chunks
+                  else pd.DataFrame(columns=self.ANALYSIS_COLUMNS))
+            df = self._prepare_frame(df)
+
+            if self.db.has_stale_sentiment(self.transformer.model_version):
+                self.start_background_rescore()
+
             return df
 
         except Exception as e:
             self.logger.error(f"Error preparing DataFrame: {str(e)}")
             raise
 
+    def _prepare_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Clean a raw tweet frame, fill sentiment and flatten JSONB metrics if selected.
+
+        Unless disabled in the analysis config, the result is converted to
+        the compact schema of frame_schema.
+        """
+        if 'metrics' in df.columns:
+            with instrumentation.span('analyzer.normalize_metrics', rows=len(df)):
+                metrics_df = pd.json_normalize(df['metrics'])
+                df = pd.concat([df.drop('metrics', axis=1), metrics_df], axis=1)
+
+        if 'text' in df.columns:
+            df = self.transformer.clean_tweets(df)
+
+        if 'sentiment' in df.columns:
+            df = self._fill_sentiment(df)
+
+        if self.compact_schema:
+            compact = apply_compact_schema(df, arrow_strings=self.arrow_strings)
+            if self.report_memory:
+                self.last_memory_report = memory_report(df, compact)
+                total = self.last_memory_report.loc['total']
+                self.logger.info(
+                    f"Compact schema: {total['bytes_before']} -> {total['bytes_after']} bytes"
+                )
+            df = compact
+
+        return df
+
+    def _fill_sentiment(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Score only tweets without a stored score and persist the new ones."""
+        missing = df['sentiment'].isna()
+        with instrumentation.span('analyzer.fill_sentiment', rows=int(missing.sum())):
+            df = self.transformer.add_sentiment_analysis(df, only_missing=True)
+        if missing.any():
+            new_scores = df.loc[missing, ['id', 'sentiment']]
+            self.db.store_sentiment_scores(
+                new_scores.itertuples(index=False), self.transformer.model_version
+            )
+            self.logger.info(f"Scored and stored sentiment for {len(new_scores)} new tweets")
+        return df
+
+    def iter_tweet_frames(self, start: datetime = None, end: datetime = None,
+                          accounts: List[str] = None, is_political_account: bool = None,
+                          columns: List[str] = None,
+                          chunk_size: int = DatabaseHandler.DEFAULT_STREAM_CHUNK_SIZE
+                          ) -> Iterator[pd.DataFrame]:
+        """
+        Stream analysis-ready DataFrame chunks for a filtered slice of tweets.
+
+        Only the requested columns are read. Duplicate texts are removed
+        within each chunk, not across chunks.
+
+        Args:
+            start: Only tweets created at or after this time
+            end: Only tweets created before this time
+            accounts: Only tweets from these account names
+            is_political_account: Only tweets with this political-account flag
+            columns: Columns to read, defaults to ANALYSIS_COLUMNS
+            chunk_size: Rows per chunk
+
+        Yields:
+            Processed DataFrames with at most ``chunk_size`` rows
+        """
+        columns = list(columns or self.ANALYSIS_COLUMNS)
+        if 'sentiment' in columns:
+            # Scoring needs the text, persisting needs the id
+            columns += [c for c in ('id', 'text') if c not in columns]
+
+        for rows in self.db.stream_tweets(
+            columns, start=start, end=end, accounts=accounts,
+            is_political_account=is_political_account,
+            sentiment_version=self.transformer.model_version,
+            chunk_size=chunk_size
+        ):
+            yield self._prepare_frame(pd.DataFrame(rows, columns=columns))
+
+    def fold_tweet_frames(self, func: Callable[[Any, pd.DataFrame], Any],
+                          initial: Any, **filters) -> Any:
+        """
+        Reduce streamed tweet chunks into a single result.
+
+        Args:
+            func: Called as ``func(accumulator, chunk)``, returns the new accumulator
+            initial: Starting accumulator
+            **filters: Passed through to iter_tweet_frames
+
+        Returns:
+            The final accumulator
+        """
+        result = initial
+        for chunk in self.iter_tweet_frames(**filters):
+            result = func(result, chunk)
+        return result
+
+    def get_daily_tweet_counts(self, **filters) -> pd.Series:
+        """Count tweets per day over a filtered slice without loading it at once."""
+        def add_chunk(counts: pd.Series, chunk: pd.DataFrame) -> pd.Series:
+            daily = chunk.groupby(pd.to_datetime(chunk['created_at']).dt.date).size()
+            return counts.add(daily, fill_value=0)
+
+        counts = self.fold_tweet_frames(
+            add_chunk, pd.Series(dtype='int64'), columns=['created_at'], **filters
+        )
+        return counts.astype('int64').sort_index()
+
+    def get_streaming_sentiment_summary(self, **filters) -> Dict:
+        """
+        Sentiment summary over a filtered slice, computed from mergeable summaries.
+
+        Returns the same keys as get_sentiment_summary. Duplicate texts are
+        removed within each chunk, not across chunks, and only days present
+        in the hourly rollups are read, so counts can differ from
+        get_sentiment_summary.
+        """
+        return self.summarize(**filters).sentiment_summary()
+
+    def _summary_cache_path(self, day: datetime, accounts: List[str] = None,
+                            is_political_account: bool = None) -> str:
+        """
+        File of the cached summary of one day.
+
+        Keyed by the database identity, model version, summary parameters
+        and filters, so another database never reads these files.
+        """
+        key = json.dumps([self.db.get_database_id(), self.transformer.model_version,
+                          self.summary_k, self.summary_compression,
+                          sorted(accounts) if accounts else None, is_political_account])
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.summary_cache_dir, digest, f"{day:%Y-%m-%d}.json")
+
+    def _summarize_day(self, day: datetime, start: datetime = None, end: datetime = None,
+                       accounts: List[str] = None, is_political_account: bool = None,
+                       marker: List = None) -> TweetSummary:
+        """
+        Summary of one day, read from the cache once the day has settled.
+
+        Engagement counts keep growing for a while after a tweet is posted,
+        so only days older than ``settle_days`` and not cut by start or end
+        are cached. A cached day is only reused while its ``marker``, the
+        day's rollup counts and sums, is unchanged, so tweets stored later
+        for a settled day are picked up.
+        """
+        day_end = day + timedelta(days=1)
+        slice_start = max(day, start) if start is not None else day
+        slice_end = min(day_end, end) if end is not None else day_end
+        cacheable = (self.summary_cache_dir is not None
+                     and slice_start == day and slice_end == day_end
+                     and day_end <= datetime.now() - timedelta(days=self.summary_settle_days))
+
+        path = self._summary_cache_path(day, accounts, is_political_account) if cacheable else None
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get('marker') == marker:
+                return TweetSummary.from_dict(cached['summary'])
+
+        summary = self.fold_tweet_frames(
+            lambda acc, chunk: acc.update(chunk),
+            TweetSummary(self.summary_k, self.summary_compression),
+            start=slice_start, end=slice_end, accounts=accounts,
+            is_political_account=is_political_account, columns=TweetSummary.COLUMNS
+        )
+        if path:
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump({'marker': marker, 'summary': summary.to_dict()}, f)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                self.logger.error(f"Error saving daily summary: {str(e)}")
+        return summary
+
+    @instrumentation.timed('analyzer.summarize')
+    def summarize(self, start: datetime = None, end: datetime = None,
+                  accounts: List[str] = None,
+                  is_political_account: bool = None) -> TweetSummary:
+        """
+        Mergeable sentiment and engagement summary of a filtered slice.
+
+        The slice is summarized day by day in a single streaming pass and
+        the days are merged. Settled days are cached in ``summaries.cache_dir``,
+        so a summary over years mostly merges stored days and only scans the
+        recent ones and days whose rollups changed since. Days are taken
+        from the hourly rollups, tweets loaded around store_tweets need a
+        rebuild_rollups first. Counts, histograms and top-k merge exactly, means and
+        variances up to rounding and quantiles within the t-digest bound.
+
+        Args:
+            start: Only tweets created at or after this time
+            end: Only tweets created before this time
+            accounts: Only tweets from these account names
+            is_political_account: Only tweets with this political-account flag
+
+        Returns:
+            TweetSummary of the slice
+        """
+        try:
+            volume = self.get_tweet_volume('day', start=start, end=end, accounts=accounts,
+                                           is_political_account=is_political_account)
+            volume = volume[volume['tweet_count'] > 0].sort_index()
+            markers = {day: [int(value) for value in row]
+                       for day, row in zip(volume.index.to_pydatetime(), volume.to_numpy())}
+            return TweetSummary.combine(
+                (self._summarize_day(day, start, end, accounts, is_political_account, marker)
+                 for day, marker in markers.items()),
+                self.summary_k, self.summary_compression
+            )
+        except Exception as e:
+            self.logger.error(f"Error summarizing tweets: {str(e)}")
+            raise
+
+    def start_background_rescore(self) -> None:
+        """Re-score tweets carrying an outdated sentiment version in the background."""
+        if self._rescorer is None:
+            self._rescorer = SentimentRescorer(self.transformer, pool=self.db.pool)
+        if not self._rescorer.running:
+            self.logger.info(
+                f"Outdated sentiment scores found, re-scoring with {self.transformer.model_version}"
+            )
+            self._rescorer.start()
+
+    def get_tweet_volume(self, granularity: str = 'day', by_account: bool = False,
+                         **filters) -> pd.DataFrame:
+        """
+        Tweet counts and engagement sums per time bucket, aggregated in SQL.
+
+        Args:
+            granularity: 'hour' or 'day'
+            by_account: Add an account_name column and split rows per account
+            **filters: start, end, accounts, is_political_account
+
+        Returns:
+            DataFrame indexed by bucket with tweet_count and metric sum columns
+        """
+        rows = self.db.get_rollup(granularity, by_account=by_account, **filters)
+        columns = (['bucket'] + (['account_name'] if by_account else [])
+                   + ['tweet_count', 'retweet_sum', 'reply_sum', 'like_sum', 'quote_sum'])
+        df = pd.DataFrame(rows, columns=columns)
+        df['bucket'] = pd.to_datetime(df['bucket'])
+        return df.set_index('bucket')
+
+    def get_account_volume(self, **filters) -> pd.DataFrame:
+        """Total tweets and engagement per account, aggregated in SQL."""
+        df = self.get_tweet_volume('day', by_account=True, **filters)
+        return df.groupby('account_name').sum(numeric_only=True).sort_values(
+            'tweet_count', ascending=False
+        )
+
+    @instrumentation.timed('analyzer.get_trending_topics', rows=len)
+    def get_trending_topics(self, limit: int = 20, rebuild: bool = False) -> List[Dict]:
+        """
+        Keywords mentioned more often in the recent window than their baseline predicts.
+
+        Args:
+            limit: Maximum number of keywords returned
+            rebuild: Recount all stored tweets first, e.g. after editing the keywords
+
+        Returns:
+            List of dicts with keyword, counts, lift and score, highest score first
+        """
+        if self._trending is None:
+            self._trending = TrendingEngine()
+        if rebuild:
+            self._trending.rebuild(self.db)
+        return self._trending.trending(self.db, limit=limit)
+
+    def _tweet_frequency_data(self) -> Dict:
+        """Daily tweet counts from the rollup table."""
+        daily_tweets = self.get_tweet_volume('day')['tweet_count']
+        return {'dates': list(daily_tweets.index.date), 'counts': daily_tweets.tolist()}
+
+    def _engagement_metrics_data(self) -> Dict:
+        """Power-of-two histograms of every engagement metric, binned in SQL."""
+        return self.db.get_metric_histograms()
+
+    def _score_missing_sentiment(self, batch_size: int = 1000) -> int:
+        """Score and store every tweet lacking a current-version score, paged by id."""
+        version = self.transformer.model_version
+        scored, last_id = 0, None
+        while True:
+            rows = self.db.get_unscored_tweets(version, limit=batch_size, after_id=last_id)
+            if not rows:
+                break
+            batch = pd.DataFrame(rows, columns=['id', 'text'])
+            batch['sentiment'] = self.transformer.score_sentiment(batch['text'])
+            self.db.store_sentiment_scores(zip(batch['id'], batch['sentiment']), version)
+            last_id = rows[-1][0]
+            scored += len(rows)
+        if scored:
+            self.logger.info(f"Scored and stored sentiment for {scored} tweets")
+        return scored
+
+    def _sentiment_distribution_data(self) -> Dict:
+        """Sentiment score histogram of the current scorer, binned in SQL."""
+        # Scores of other versions are not mixed in, so fill the gaps first
+        self._score_missing_sentiment()
+        return {'counts': self.db.get_sentiment_histogram(self.transformer.model_version)}
+
+    @instrumentation.timed('analyzer.plot_tweets_over_time')
     def plot_tweets_over_time(self) -> None:
-        """Visualize tweet frequency over time with sentiment coloring."""
+        """Visualize tweet frequency over time."""
         try:
-            df = self.get_tweets_dataframe()
-            
-            # Convert created_at to datetime if it isn't already
-            df['date'] = pd.to_datetime(df['created_at'])
-            
-            # Create daily frequency
-            daily_tweets = df.groupby(df['date'].dt.date).size()
-            
-            # Create the plot
-            plt.figure(figsize=(12, 6))
-            
-            if not daily_tweets.empty:
-                # Plot with proper date formatting
-                ax = daily_tweets.plot(
-                    kind='line',
-                    color='blue',
-                    marker='o',  # Add markers for each data point
-                    linestyle='-',
-                    linewidth=2,
-                    markersize=8,
-                    alpha=0.7
-                )
-                
-                # Improve x-axis formatting with date formatter
-                from matplotlib.dates import DateFormatter
-                ax.xaxis.set_major_formatter(DateFormatter('%Y-%m-%d'))
-                plt.gca().xaxis.set_major_locator(plt.MaxNLocator(10))  # Limit number of x ticks
-                
-                # Add grid for better readability
-                plt.grid(True, linestyle='--', alpha=0.7)
-                
-                # Add labels and title with more context
-                plt.title('Daily Tweet Volume in German Politics', pad=20)
-                plt.xlabel('Date (YYYY-MM-DD)', labelpad=10)
-                plt.ylabel('Number of Tweets per Day', labelpad=10)
-                
-                # Rotate x-axis labels for better readability
-                plt.xticks(rotation=45, ha='right')
-                
-                # Add some padding to prevent label cutoff
-                plt.margins(x=0.05)
-                
-                # Add annotation showing date range
-                date_range = f"Date Range: {daily_tweets.index.min()} to {daily_tweets.index.max()}"
-                plt.figtext(0.99, 0.01, date_range, ha='right', va='bottom', fontsize=8)
-                
-            else:
-                plt.text(0.5, 0.5, 'No tweet data available', 
-                        horizontalalignment='center',
-                        verticalalignment='center',
-                        transform=plt.gca().transAxes)
-            
-            plt.tight_layout()
-            plt.savefig('tweet_frequency.png', dpi=300, bbox_inches='tight')
-            plt.close()
-            
+            self.renderer.render({'tweet_frequency': self._tweet_frequency_data()})
             self.logger.info("Successfully generated time series plot")
-            
         except Exception as e:
             self.logger.error(f"Error plotting time series: {str(e)}")
             raise
 
+    @instrumentation.timed('analyzer.plot_engagement_metrics')
     def plot_engagement_metrics(self) -> None:
-        """Visualize engagement metrics distribution."""
+        """Visualize engagement metrics distribution on log-scaled bins."""
         try:
-            df = self.get_tweets_dataframe()
-            
-            fig, axes = plt.subplots(2, 2, figsize=(15, 10))
-            metrics = ['retweet_count', 'reply_count', 'like_count', 'quote_count']
-            
-            for ax, metric in zip(axes.flat, metrics):
-                sns.histplot(data=df, x=metric, ax=ax)
-                ax.set_title(f'Distribution of {metric.replace("_", " ").title()}')
-            
-            plt.tight_layout()
-            plt.savefig('engagement_metrics.png')
-            plt.close()
-            
+            self.renderer.render({'engagement_metrics': self._engagement_metrics_data()})
             self.logger.info("Successfully generated engagement metrics plots")
-            
         except Exception as e:
             self.logger.error(f"Error plotting engagement metrics: {str(e)}")
             raise
 
+    @instrumentation.timed('analyzer.plot_sentiment_distribution')
+    def plot_sentiment_distribution(self) -> None:
+        """Visualize the distribution of sentiment scores."""
+        try:
+            self.renderer.render({'sentiment_distribution': self._sentiment_distribution_data()})
+            self.logger.info("Successfully generated sentiment distribution plot")
+        except Exception as e:
+            self.logger.error(f"Error plotting sentiment distribution: {str(e)}")
+            raise
+
+    @instrumentation.timed('analyzer.render_report')
+    def render_report(self) -> Dict[str, List[str]]:
+        """
+        Render all report figures, drawing them in parallel.
+
+        The data of every figure is reduced in SQL first, so rendering
+        never touches individual tweets.
+
+        Returns:
+            Dict mapping each figure name to the written files
+        """
+        try:
+            figures = {
+                'tweet_frequency': self._tweet_frequency_data(),
+                'engagement_metrics': self._engagement_metrics_data(),
+                'sentiment_distribution': self._sentiment_distribution_data(),
+            }
+            return self.renderer.render(figures)
+        except Exception as e:
+            self.logger.error(f"Error rendering report: {str(e)}")
+            raise
+
+    @instrumentation.timed('analyzer.get_sentiment_summary')
     def get_sentiment_summary(self) -> Dict:
         """
         Generate summary statistics of tweet sentiments.
+
+        Tweets are streamed newest first with exact duplicate texts removed
+        over the whole table in SQL, so the result equals summarizing the
+        deduplicated frame without loading it. Missing scores are filled
+        and stored; near-duplicate detection is not applied.
         
         Returns:
             Dictionary containing sentiment statistics
         """
         try:
-            df = self.get_tweets_dataframe()
-            
+            columns = ['id', 'text', 'sentiment']
+            count, total = 0, 0.0
+            positive = negative = neutral = 0
+            # (score, text) of the first most extreme tweet in stream order
+            most_positive = most_negative = None
+            for rows in self.db.stream_tweets(
+                columns, sentiment_version=self.transformer.model_version, distinct_text=True
+            ):
+                chunk = self._fill_sentiment(pd.DataFrame(rows, columns=columns))
+                sentiment = chunk['sentiment'].astype(float).dropna()
+                if sentiment.empty:
+                    continue
+                count += len(sentiment)
+                total += sentiment.sum()
+                positive += int((sentiment > 0).sum())
+                negative += int((sentiment < 0).sum())
+                neutral += int((sentiment == 0).sum())
+                high, low = sentiment.idxmax(), sentiment.idxmin()
+                if most_positive is None or sentiment[high] > most_positive[0]:
+                    most_positive = (sentiment[high], chunk.at[high, 'text'])
+                if most_negative is None or sentiment[low] < most_negative[0]:
+                    most_negative = (sentiment[low], chunk.at[low, 'text'])
+
+            if not count:
+                raise ValueError("No scored tweets to summarize")
             return {
-                'Average Sentiment': df['sentiment'].mean(),
-                'Positive Tweets': (df['sentiment'] > 0).sum(),
-                'Negative Tweets': (df['sentiment'] < 0).sum(),
-                'Neutral Tweets': (df['sentiment'] == 0).sum(),
-                'Most Positive Tweet': df.loc[df['sentiment'].idxmax()]['text'],
-                'Most Negative Tweet': df.loc[df['sentiment'].idxmin()]['text']
+                'Average Sentiment': total / count,
+                'Positive Tweets': positive,
+                'Negative Tweets': negative,
+                'Neutral Tweets': neutral,
+                'Most Positive Tweet': most_positive[1],
+                'Most Negative Tweet': most_negative[1]
             }
             
         except Exception as e:
@@ -166,11 +572,11 @@ def main():
         format='%(asctime)s - %(levelname)s - %(message)s'
     )
     
+    instrumentation.enable_from_config()
     analyzer = TweetAnalyzer()
     
     try:
-        analyzer.plot_tweets_over_time()
-        analyzer.plot_engagement_metrics()
+        analyzer.render_report()
         
         sentiment_summary = analyzer.get_sentiment_summary()
         for key, value in sentiment_summary.items():
@@ -181,6 +587,9 @@ def main():
                 
     except Exception as e:
         logging.error(f"Analysis failed: {str(e)}")
+    finally:
+        analyzer.close()
+        instrumentation.finish()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
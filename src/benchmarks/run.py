@@ -0,0 +1,295 @@
+import os
+import sys
+import json
+import time
+import uuid
+import shutil
+import logging
+import argparse
+import platform
+import resource
+import tempfile
+from datetime import datetime
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+import psycopg2
+
+from src.config.config_loader import get_analysis_config, get_database_config
+from src.database.connection_pool import ConnectionPool
+from src.database.db_handler import DatabaseHandler
+from src.data_processing.data_transformer import DataTransformer
+from src.data_processing.sentiment_backends import TextBlobBackend, get_sentiment_backend
+from src.analysis.plot_renderer import PlotRenderer, log2_histogram
+from src.analysis.tweet_analyzer import TweetAnalyzer
+from src.benchmarks.synthetic import SyntheticTweetGenerator
+
+
+class BenchmarkRunner:
+    """
+    Times the storage and analysis stages on seeded synthetic tweets.
+
+    Frame stages (cleaning, sentiment, plotting) always run in memory.
+    Database stages run against a throwaway schema that is created for
+    every size and dropped afterwards; they are reported as skipped when
+    no database is reachable.
+    """
+
+    DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+    DEFAULT_OUTPUT = 'benchmark_results.json'
+
+    def __init__(self, sizes: List[int] = None, seed: int = 0, backend: str = None,
+                 use_database: bool = True, output: str = DEFAULT_OUTPUT):
+        """
+        Args:
+            sizes: Row counts to benchmark
+            seed: Seed of the synthetic tweet generator
+            backend: Sentiment backend name, defaults to the configured one
+            use_database: Also run the database stages
+            output: Path of the JSON results file
+        """
+        self.logger = logging.getLogger(__name__)
+        self.sizes = sizes or self.DEFAULT_SIZES
+        self.seed = seed
+        analysis_config = get_analysis_config()
+        self.backend_name = backend or analysis_config.get('sentiment_backend', TextBlobBackend.name)
+        self.backend_options = analysis_config.get('sentiment_backend_options', {})
+        self.use_database = use_database
+        self.output = output
+        self.results = []
+        self._plot_dir = None
+
+    def _transformer(self) -> DataTransformer:
+        return DataTransformer(backend=get_sentiment_backend(self.backend_name,
+                                                             **self.backend_options))
+
+    def _measure(self, stage: str, rows: int, func: Callable, source: str = 'frame'):
+        """Run one stage, record its timing and return its result."""
+        started = time.perf_counter()
+        value = func()
+        seconds = time.perf_counter() - started
+        # ru_maxrss is reported in kilobytes on Linux
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        self.results.append({
+            'stage': stage,
+            'source': source,
+            'rows': rows,
+            'seconds': round(seconds, 4),
+            'rows_per_second': round(rows / seconds, 1) if seconds else None,
+            'max_rss_bytes': max_rss,
+        })
+        self.logger.info(f"{stage} ({source}, {rows} rows): {seconds:.3f}s")
+        return value
+
+    def _skip(self, stage: str, rows: int, reason: str) -> None:
+        self.results.append({'stage': stage, 'source': 'database', 'rows': rows,
+                             'skipped': reason})
+
+    @staticmethod
+    def _frame(tweets: List[Dict]) -> pd.DataFrame:
+        """Analysis frame equivalent to what the analyzer loads from the database."""
+        df = pd.DataFrame(tweets)
+        metrics = pd.json_normalize(df.pop('metrics'))
+        df = pd.concat([df, metrics], axis=1)
+        df['account_name'] = df.pop('account') if 'account' in df.columns else None
+        df['is_political_account'] = df['account_name'].notna()
+        return df
+
+    def run_frame_stages(self, tweets: List[Dict]) -> None:
+        """Time cleaning, sentiment and plotting on an in-memory frame."""
+        rows = len(tweets)
+        transformer = self._transformer()
+        df = self._frame(tweets)
+        cleaned = self._measure('clean_tweets', rows, lambda: transformer.clean_tweets(df))
+        scored = self._measure('add_sentiment_analysis', len(cleaned),
+                               lambda: transformer.add_sentiment_analysis(cleaned.copy()))
+
+        renderer = PlotRenderer(output_dir=self._plot_dir, workers=1)
+
+        def daily_counts():
+            daily = scored.groupby(pd.to_datetime(scored['created_at']).dt.date).size()
+            return {'dates': list(daily.index), 'counts': daily.tolist()}
+
+        self._measure('plot_tweets_over_time', rows, lambda: renderer.render({
+            'tweet_frequency': daily_counts()
+        }))
+        self._measure('plot_engagement_metrics', rows, lambda: renderer.render({
+            'engagement_metrics': {m: log2_histogram(scored[m])
+                                   for m in DatabaseHandler.METRIC_COLUMNS}
+        }))
+        self._measure('plot_sentiment_distribution', rows, lambda: renderer.render({
+            'sentiment_distribution': {
+                'counts': np.histogram(scored['sentiment'].clip(-1, 1), bins=40,
+                                       range=(-1, 1))[0].tolist()
+            }
+        }))
+
+    def _open_database(self):
+        """Create a throwaway schema and a pool whose connections use it."""
+        config = get_database_config()
+        schema = f"benchmark_{uuid.uuid4().hex[:12]}"
+        conn = psycopg2.connect(host=config['host'], port=config['port'], dbname=config['name'],
+                                user=config['user'], password=config['password'])
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(f"CREATE SCHEMA {schema}")
+        finally:
+            conn.close()
+        pool = ConnectionPool(config, options=f"-c search_path={schema}")
+        return schema, pool
+
+    def _drop_database(self, schema: str, pool: ConnectionPool) -> None:
+        try:
+            with pool.connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(f"DROP SCHEMA {schema} CASCADE")
+                conn.commit()
+        finally:
+            pool.close()
+
+    def run_database_stages(self, tweets: List[Dict]) -> None:
+        """Time storage and the analyzer's database-backed methods."""
+        rows = len(tweets)
+        schema, pool = self._open_database()
+        analyzer = None
+        try:
+            db = DatabaseHandler(pool=pool)
+            db.init_tables()
+            political = [t for t in tweets if 'account' in t]
+            other = [t for t in tweets if 'account' not in t]
+            self._measure('store_tweets', rows, lambda: (
+                db.store_tweets(other), db.store_tweets(political, is_political_account=True)
+            ), source='database')
+
+            analyzer = TweetAnalyzer(db=db)
+            analyzer.transformer = self._transformer()
+            analyzer.renderer = PlotRenderer(output_dir=self._plot_dir, workers=1)
+            # Time the full summary pass, never read or write the configured summary cache
+            analyzer.summary_cache_dir = None
+            # The first load scores and stores sentiment, the second reads it back
+            self._measure('get_tweets_dataframe_cold', rows,
+                          lambda: analyzer.get_tweets_dataframe(use_cache=False),
+                          source='database')
+            self._measure('get_tweets_dataframe', rows,
+                          lambda: analyzer.get_tweets_dataframe(use_cache=False),
+                          source='database')
+            self._measure('plot_tweets_over_time', rows, analyzer.plot_tweets_over_time,
+                          source='database')
+            self._measure('plot_engagement_metrics', rows, analyzer.plot_engagement_metrics,
+                          source='database')
+            self._measure('plot_sentiment_distribution', rows,
+                          analyzer.plot_sentiment_distribution, source='database')
+            self._measure('get_sentiment_summary', rows, analyzer.get_sentiment_summary,
+                          source='database')
+        finally:
+            if analyzer is not None:
+                analyzer.close()
+            self._drop_database(schema, pool)
+
+    def run(self) -> Dict:
+        """
+        Benchmark every size and write the results file.
+
+        Returns:
+            The written report
+        """
+        started_at = datetime.now()
+        self._plot_dir = tempfile.mkdtemp(prefix='benchmark_plots_')
+        try:
+            for size in self.sizes:
+                tweets = self._measure(
+                    'generate', size, lambda: SyntheticTweetGenerator(seed=self.seed).generate(size)
+                )
+                self.run_frame_stages(tweets)
+                if not self.use_database:
+                    continue
+                try:
+                    self.run_database_stages(tweets)
+                except psycopg2.OperationalError as e:
+                    self.logger.warning(f"Database unavailable, skipping database stages: {e}")
+                    self._skip('database', size, str(e).strip())
+        finally:
+            shutil.rmtree(self._plot_dir, ignore_errors=True)
+
+        report = {
+            'meta': {
+                'started_at': started_at.isoformat(),
+                'seed': self.seed,
+                'sizes': self.sizes,
+                'sentiment_backend': self.backend_name,
+                'python': sys.version.split()[0],
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+                'pandas': pd.__version__,
+                'numpy': np.__version__,
+            },
+            'results': self.results,
+        }
+        with open(self.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        self.logger.info(f"Wrote benchmark results to {self.output}")
+        return report
+
+
+def compare_results(baseline: Dict, current: Dict, threshold: float = 0.2) -> List[Dict]:
+    """
+    Find stages that got slower than a baseline run.
+
+    Args:
+        baseline: Report of an earlier run
+        current: Report of this run
+        threshold: Relative slowdown above which a stage is reported
+
+    Returns:
+        One dict per regressed stage with both timings and the ratio
+    """
+    def timings(report):
+        return {(r['stage'], r['source'], r['rows']): r['seconds']
+                for r in report['results'] if 'seconds' in r}
+
+    before = timings(baseline)
+    regressions = []
+    for key, seconds in timings(current).items():
+        if key in before and before[key] > 0 and seconds / before[key] > 1 + threshold:
+            stage, source, rows = key
+            regressions.append({'stage': stage, 'source': source, 'rows': rows,
+                                'baseline_seconds': before[key], 'seconds': seconds,
+                                'ratio': round(seconds / before[key], 2)})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark storage and analysis stages")
+    parser.add_argument('--sizes', type=int, nargs='+', default=None,
+                        help="Row counts to benchmark (default: 10000 100000 1000000)")
+    parser.add_argument('--seed', type=int, default=0, help="Synthetic data seed")
+    parser.add_argument('--backend', default=None, help="Sentiment backend name")
+    parser.add_argument('--no-database', action='store_true',
+                        help="Only run the in-memory frame stages")
+    parser.add_argument('--output', default=BenchmarkRunner.DEFAULT_OUTPUT,
+                        help="Path of the JSON results file")
+    parser.add_argument('--baseline', default=None,
+                        help="Earlier results file to report regressions against")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Relative slowdown reported as a regression")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    runner = BenchmarkRunner(sizes=args.sizes, seed=args.seed, backend=args.backend,
+                             use_database=not args.no_database, output=args.output)
+    report = runner.run()
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare_results(json.load(f), report, args.threshold)
+        for r in regressions:
+            print(f"REGRESSION {r['stage']} ({r['source']}, {r['rows']} rows): "
+                  f"{r['baseline_seconds']:.3f}s -> {r['seconds']:.3f}s ({r['ratio']}x)")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
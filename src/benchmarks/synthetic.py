@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+import numpy as np
+
+from src.data_collection.german_politics_collector import GermanPoliticsCollector
+
+POSITIVE_WORDS = ['gut', 'erfolg', 'stark', 'fortschritt', 'gemeinsam', 'hoffnung',
+                  'einigung', 'vertrauen', 'lösung', 'danke']
+NEGATIVE_WORDS = ['schlecht', 'skandal', 'krise', 'chaos', 'versagt', 'gefahr',
+                  'problem', 'fehler', 'katastrophe', 'angst']
+TOPICS = ['Haushalt', 'Rente', 'Klimaschutz', 'Migration', 'Bürgergeld', 'Wehretat',
+          'Energiepreise', 'Schuldenbremse', 'Digitalisierung', 'Wohnungsbau',
+          'Ukraine', 'Heizungsgesetz', 'Mindestlohn', 'Bahn', 'Steuerreform']
+TEMPLATES = [
+    '{keyword}: Die Debatte zum {topic} ist {word}.',
+    'Heute im Bundestag: {topic}. {keyword} sagt, das ist {word}.',
+    'Was für ein {word} Ergebnis beim {topic}! #{keyword}',
+    '{keyword} und der {topic} – nicht {word}, sondern Politik von gestern.',
+    'Beim {topic} zeigt {keyword} wieder: {word}. Mehr dazu: https://example.de/{n}',
+    'Wir bleiben dran am {topic}. {word} für Deutschland. #{keyword} #{topic}',
+]
+FILLERS = ['', 'Das muss sich ändern.', 'Wir bleiben dran.', 'Was meint ihr?',
+           'Dazu gleich mehr im Plenum.', 'Die Zahlen sprechen für sich.',
+           'Danke an alle Beteiligten.', 'So geht es nicht weiter.', 'Jetzt handeln!',
+           'Morgen geht es weiter.', 'Thread 👇', 'Wer zahlt das am Ende?']
+RETWEET_ACCOUNTS = ['tagesschau', 'spiegelonline', 'zeitonline', 'welt', 'faznet']
+
+
+class SyntheticTweetGenerator:
+    """
+    Seeded generator of German political tweets in the collector's dict shape.
+
+    Texts mix the collector's keywords and accounts with political topics
+    and lexicon words, including retweets, link variants and exact copies,
+    so cleaning and sentiment stages see realistic duplicates. Engagement
+    counts are heavy tailed. The same seed always yields the same tweets.
+    """
+
+    FIRST_ID = 1_700_000_000_000_000_000
+
+    def __init__(self, seed: int = 0, start: datetime = None, days: int = 60,
+                 duplicate_share: float = 0.1, political_share: float = 0.2):
+        """
+        Args:
+            seed: Random seed
+            start: Earliest creation time, defaults to 2024-01-01 UTC
+            days: Length of the creation time window
+            duplicate_share: Fraction of tweets that copy or retweet an earlier one
+            political_share: Fraction of tweets attributed to tracked accounts
+        """
+        self.seed = seed
+        self.start = start or datetime(2024, 1, 1, tzinfo=timezone.utc)
+        self.days = days
+        self.duplicate_share = duplicate_share
+        self.political_share = political_share
+
+    def generate(self, n: int) -> List[Dict]:
+        """Generate ``n`` tweets, ordered by id."""
+        rng = np.random.default_rng(self.seed)
+        keywords = GermanPoliticsCollector.POLITICAL_KEYWORDS
+        accounts = GermanPoliticsCollector.POLITICAL_ACCOUNTS
+        words = POSITIVE_WORDS + NEGATIVE_WORDS
+
+        template_ids = rng.integers(0, len(TEMPLATES), n)
+        keyword_ids = rng.integers(0, len(keywords), n)
+        topic_ids = rng.integers(0, len(TOPICS), n)
+        word_ids = rng.integers(0, len(words), n)
+        filler_ids = rng.integers(0, len(FILLERS), (n, 2))
+        offsets = np.sort(rng.integers(0, self.days * 86400, n))
+        duplicate = rng.random(n) < self.duplicate_share
+        retweet = rng.random(n) < 0.5
+        political = rng.random(n) < self.political_share
+        account_ids = rng.integers(0, len(accounts), n)
+        source_ids = rng.integers(0, len(RETWEET_ACCOUNTS), n)
+        # Pareto tails: most tweets get little engagement, a few go viral
+        metrics = {
+            'retweet_count': (rng.pareto(1.3, n) * 2).astype(np.int64),
+            'reply_count': (rng.pareto(1.5, n) * 1).astype(np.int64),
+            'like_count': (rng.pareto(1.1, n) * 8).astype(np.int64),
+            'quote_count': (rng.pareto(1.8, n) * 0.5).astype(np.int64),
+        }
+        collected_at = self.start + timedelta(days=self.days)
+
+        tweets = []
+        for i in range(n):
+            if duplicate[i] and i > 0:
+                original = tweets[int(rng.integers(0, i))]['text']
+                text = (f"RT @{RETWEET_ACCOUNTS[source_ids[i]]}: {original}"
+                        if retweet[i] else original)
+            else:
+                text = TEMPLATES[template_ids[i]].format(
+                    keyword=keywords[keyword_ids[i]], topic=TOPICS[topic_ids[i]],
+                    word=words[word_ids[i]], n=i
+                )
+                fillers = ' '.join(FILLERS[j] for j in filler_ids[i] if FILLERS[j])
+                if fillers:
+                    text = f"{text} {fillers}"
+            tweet = {
+                'id': self.FIRST_ID + i,
+                'text': text,
+                'created_at': self.start + timedelta(seconds=int(offsets[i])),
+                'metrics': {name: int(values[i]) for name, values in metrics.items()},
+                'collected_at': collected_at,
+            }
+            if political[i]:
+                tweet['account'] = accounts[account_ids[i]]
+            tweets.append(tweet)
+        return tweets
+
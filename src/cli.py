@@ -0,0 +1,250 @@
+"""
+Command line entry point: ``python -m src <command>``.
+
+Only argparse is imported up front. Every command imports the modules it
+needs when it runs, so ``collect`` never loads pandas and ``summary``
+never loads matplotlib.
+"""
+import os
+import sys
+import logging
+import argparse
+
+
+def _setup(args) -> int:
+    from src.database.setup_db import setup_database
+    setup_database()
+    return 0
+
+
+def _collect(args) -> int:
+    from src.data_collection.german_politics_collector import GermanPoliticsCollector
+    collector = GermanPoliticsCollector(max_workers=args.max_workers, max_pages=args.max_pages)
+    stats = collector.collect_and_store(queue_size=args.queue_size)
+    print(f"Stored {stats['writer']['items']} tweets")
+    return 0
+
+
+def _print_summary(summary) -> None:
+    for key, value in summary.items():
+        if isinstance(value, float):
+            print(f"{key}: {value:.2f}")
+        else:
+            print(f"{key}: {value}")
+
+
+def _analyzer(args):
+    from src.analysis.tweet_analyzer import TweetAnalyzer
+    from src.analysis.plot_renderer import PlotRenderer
+    analyzer = TweetAnalyzer()
+    if getattr(args, 'output_dir', None) or getattr(args, 'formats', None) or getattr(args, 'dpi', None):
+        renderer = analyzer.renderer
+        analyzer.renderer = PlotRenderer(
+            output_dir=args.output_dir or renderer.output_dir,
+            formats=args.formats or renderer.formats,
+            dpi=args.dpi or renderer.dpi,
+            workers=renderer.workers
+        )
+    return analyzer
+
+
+def _summary(args) -> int:
+    analyzer = _analyzer(args)
+    try:
+        if args.stats:
+            import json
+            print(json.dumps(analyzer.summarize().describe(), ensure_ascii=False, indent=2))
+            return 0
+        summary = analyzer.get_sentiment_summary()
+    finally:
+        analyzer.close()
+    if args.json:
+        import json
+        print(json.dumps({k: v.item() if hasattr(v, 'item') else v for k, v in summary.items()},
+                         ensure_ascii=False, indent=2))
+    else:
+        _print_summary(summary)
+    return 0
+
+
+def _plots(args) -> int:
+    analyzer = _analyzer(args)
+    try:
+        written = analyzer.render_report()
+    finally:
+        analyzer.close()
+    for paths in written.values():
+        for path in paths:
+            print(path)
+    return 0
+
+
+def _analyze(args) -> int:
+    analyzer = _analyzer(args)
+    try:
+        analyzer.render_report()
+        _print_summary(analyzer.get_sentiment_summary())
+    finally:
+        analyzer.close()
+    return 0
+
+
+def _trending(args) -> int:
+    from src.database.db_handler import DatabaseHandler
+    from src.analysis.trending import TrendingEngine
+    engine = TrendingEngine()
+    with DatabaseHandler() as db:
+        if args.rebuild:
+            engine.rebuild(db)
+        topics = engine.trending(db, limit=args.limit)
+    if args.json:
+        import json
+        print(json.dumps(topics, ensure_ascii=False, indent=2))
+    else:
+        for topic in topics:
+            print(f"{topic['keyword']}: {topic['current']} tweets, "
+                  f"expected {topic['expected']:.1f}, score {topic['score']:.2f}")
+    return 0
+
+
+def _search(args) -> int:
+    from src.database.db_handler import DatabaseHandler
+    with DatabaseHandler() as db:
+        tweets = db.search_tweets(args.query, start=args.start, end=args.end,
+                                  accounts=args.accounts, limit=args.limit)
+    if args.json:
+        import json
+        print(json.dumps(tweets, ensure_ascii=False, indent=2, default=str))
+    else:
+        for tweet in tweets:
+            print(f"{tweet['created_at']:%Y-%m-%d %H:%M} @{tweet['account_name']} "
+                  f"[{tweet['rank']:.3f}] {' '.join(tweet['text'].split())}")
+    return 0
+
+
+def _windows(args) -> int:
+    from datetime import datetime, timezone
+    from src.analysis.streaming_windows import StreamingAnalytics
+    analytics = StreamingAnalytics(checkpoint_path=args.checkpoint, scorer=False)
+    if not analytics.load_checkpoint():
+        print(f"No streaming checkpoint at {analytics.checkpoint_path}")
+        return 1
+    snapshot = analytics.snapshot(now=datetime.now(timezone.utc), accounts=args.accounts)
+    events = list(analytics.events)[-args.events:] if args.events else []
+    if args.json:
+        import json
+        print(json.dumps({'windows': snapshot, 'events': events}, ensure_ascii=False, indent=2))
+        return 0
+    for name, stats in snapshot.items():
+        rows = [('all accounts', stats['overall'])] + list(stats.get('accounts', {}).items())
+        print(f"{name}:")
+        for label, row in rows:
+            if not row or not row['tweets']:
+                continue
+            sentiment = ('-' if row['mean_sentiment'] is None
+                         else f"{row['mean_sentiment']:+.3f}")
+            print(f"  {label}: {row['tweets']} tweets, sentiment {sentiment}, "
+                  f"engagement {row['engagement']}")
+    for event in events:
+        print(f"{event['bucket_start']} {event['type']} ({event['window']}, "
+              f"{event['account'] or 'all accounts'}): {event['value']} "
+              f"vs {event['baseline']}, z={event['zscore']}")
+    return 0
+
+
+def _add_plot_options(parser) -> None:
+    parser.add_argument('--output-dir', default=None, help="Directory receiving the figures")
+    parser.add_argument('--format', dest='formats', action='append', default=None,
+                        help="Figure format, repeat for several (png, svg, pdf)")
+    parser.add_argument('--dpi', type=int, default=None, help="Resolution of raster figures")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='python -m src', description="Collect and analyze German political tweets"
+    )
+    parser.add_argument('--config', default=None,
+                        help="Path of the config file (default: config/config.json)")
+    parser.add_argument('--log-level', default='INFO',
+                        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    setup = commands.add_parser('setup', help="Create database tables and rollups")
+    setup.set_defaults(handler=_setup)
+
+    collect = commands.add_parser('collect', help="Collect new tweets into the database")
+    collect.add_argument('--max-workers', type=int, default=None,
+                         help="Accounts fetched concurrently")
+    collect.add_argument('--max-pages', type=int, default=None,
+                         help="Pages fetched per source and run")
+    collect.add_argument('--queue-size', type=int, default=20,
+                         help="Pages buffered between API and database")
+    collect.set_defaults(handler=_collect)
+
+    analyze = commands.add_parser('analyze', help="Render all plots and print the summary")
+    _add_plot_options(analyze)
+    analyze.set_defaults(handler=_analyze)
+
+    summary = commands.add_parser('summary', help="Print the sentiment summary")
+    summary.add_argument('--json', action='store_true', help="Print the summary as JSON")
+    summary.add_argument('--stats', action='store_true',
+                         help="Print quantiles, histograms and top tweets of sentiment "
+                              "and engagement from the mergeable daily summaries")
+    summary.set_defaults(handler=_summary)
+
+    plots = commands.add_parser('plots', help="Render the report figures")
+    _add_plot_options(plots)
+    plots.set_defaults(handler=_plots)
+
+    trending = commands.add_parser('trending', help="List currently trending keywords")
+    trending.add_argument('--limit', type=int, default=20, help="Number of keywords shown")
+    trending.add_argument('--rebuild', action='store_true',
+                          help="Recount all stored tweets before ranking")
+    trending.add_argument('--json', action='store_true', help="Print the keywords as JSON")
+    trending.set_defaults(handler=_trending)
+
+    search = commands.add_parser('search', help="Full-text search over stored tweets")
+    search.add_argument('query', help='German search query, e.g. \'Schuldenbremse -FDP\'')
+    search.add_argument('--start', default=None, help="Only tweets created at or after (ISO date)")
+    search.add_argument('--end', default=None, help="Only tweets created before (ISO date)")
+    search.add_argument('--account', dest='accounts', action='append', default=None,
+                        help="Only tweets of this account, repeat for several")
+    search.add_argument('--limit', type=int, default=20, help="Number of tweets shown")
+    search.add_argument('--json', action='store_true', help="Print the tweets as JSON")
+    search.set_defaults(handler=_search)
+
+    windows = commands.add_parser('windows',
+                                  help="Show the rolling 1h/24h/7d windows and recent spikes")
+    windows.add_argument('--checkpoint', default=None, help="Streaming state file")
+    windows.add_argument('--accounts', action='store_true', help="Also list every account")
+    windows.add_argument('--events', type=int, default=10, help="Number of recent events shown")
+    windows.add_argument('--json', action='store_true', help="Print the windows as JSON")
+    windows.set_defaults(handler=_windows)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=getattr(logging, args.log_level),
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+    if args.config:
+        from src.config.config_loader import CONFIG_PATH_ENV, reload_config
+        os.environ[CONFIG_PATH_ENV] = args.config
+        reload_config()
+
+    from src.monitoring import instrumentation
+    instrumentation.enable_from_config()
+    try:
+        return args.handler(args)
+    except KeyboardInterrupt:
+        return 130
+    except Exception as e:
+        logging.error(f"{args.command} failed: {str(e)}")
+        return 1
+    finally:
+        instrumentation.finish()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
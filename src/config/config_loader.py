@@ -1,19 +1,88 @@
+import copy
 import json
 import os
+from functools import lru_cache
 
-def load_config():
+# Environment variables starting with this prefix override config values,
+# e.g. SMA_DATABASE_HOST or SMA_TWITTER_API_BEARER_TOKEN
+ENV_PREFIX = 'SMA_'
+# Alternative config file location
+CONFIG_PATH_ENV = 'SMA_CONFIG'
+
+def _config_path():
+    if os.environ.get(CONFIG_PATH_ENV):
+        return os.environ[CONFIG_PATH_ENV]
     # Get the absolute path to the config file
     current_dir = os.path.dirname(os.path.abspath(__file__))
-    config_path = os.path.join(current_dir, '..', '..', 'config', 'config.json')
-    
+    return os.path.join(current_dir, '..', '..', 'config', 'config.json')
+
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+FALSE_VALUES = ('0', 'false', 'no', 'off')
+
+def _parse_env_value(value, default):
+    """
+    Convert an override to the type of the value it replaces.
+
+    Only booleans and numbers are converted, and lists, dicts or unset
+    (null) defaults are read as JSON. Everything else, e.g. a password
+    like "null" or "123", stays a string.
+    """
+    if isinstance(default, bool):
+        if value.lower() in TRUE_VALUES:
+            return True
+        if value.lower() in FALSE_VALUES:
+            return False
+        raise ValueError(f"Expected a boolean, got {value!r}")
+    if isinstance(default, (int, float)):
+        try:
+            return int(value)
+        except ValueError:
+            return float(value)
+    if default is None or isinstance(default, (list, dict)):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+    return value
+
+def _apply_env_overrides(config):
+    for section, values in config.items():
+        if not isinstance(values, dict):
+            continue
+        prefix = f"{ENV_PREFIX}{section.upper()}_"
+        for name, value in os.environ.items():
+            if name.startswith(prefix):
+                key = name[len(prefix):].lower()
+                try:
+                    values[key] = _parse_env_value(value, values.get(key, ''))
+                except ValueError as e:
+                    raise ValueError(f"Invalid value for {name}: {str(e)}")
+    return config
+
+@lru_cache(maxsize=None)
+def _load_config_cached():
+    config_path = _config_path()
     try:
         with open(config_path, 'r') as f:
             config = json.load(f)
-        return config
     except FileNotFoundError:
         raise FileNotFoundError(f"Config file not found at: {config_path}")
     except json.JSONDecodeError:
         raise ValueError("Config file is not valid JSON")
+    return _apply_env_overrides(config)
+
+def load_config():
+    """
+    Return the configuration, read once per process.
+
+    Values from ``SMA_<SECTION>_<KEY>`` environment variables override the
+    file. Callers get their own copy and may modify it freely.
+    """
+    return copy.deepcopy(_load_config_cached())
+
+def reload_config():
+    """Forget the cached configuration, the next access reads it again."""
+    _load_config_cached.cache_clear()
 
 def get_twitter_config():
     config = load_config()
@@ -27,10 +96,14 @@ def get_database_config():
         raise KeyError("Database configuration not found in config file")
     return config['database']
 
+def get_analysis_config():
+    config = load_config()
+    return config.get('analysis', {})
+
 if __name__ == "__main__":
     # Test the config loading
     try:
         twitter_config = get_twitter_config()
         print("Successfully loaded Twitter configuration")
     except Exception as e:
-        print(f"Error loading configuration: {str(e)}") 
\ No newline at end of file
+        print(f"Error loading configuration: {str(e)}")
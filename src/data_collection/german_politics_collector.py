@@ -1,9 +1,17 @@
-from typing import List, Dict
+from typing import Iterator, List, Dict
 import tweepy
 from datetime import datetime
+import hashlib
 import logging
-from src.config.config_loader import get_twitter_config
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from src.config.config_loader import get_twitter_config, get_analysis_config
 from src.database.db_handler import DatabaseHandler
+from src.data_collection.rate_limiter import RateLimitScheduler
+from src.data_collection.ingestion_pipeline import IngestionPipeline
+from src.analysis.trending import TrendingEngine
+from src.analysis.streaming_windows import StreamingAnalytics
+from src.monitoring import instrumentation
 
 class GermanPoliticsCollector:
     """Collects tweets from German political discourse using Twitter's API."""
@@ -24,8 +32,19 @@ class GermanPoliticsCollector:
         'fdp',
     ]
 
-    def __init__(self) -> None:
-        """Initialize collector with Twitter API credentials."""
+    DEFAULT_MAX_WORKERS = 8
+    DEFAULT_MAX_PAGES = 5
+    # Retries of a request rejected with 429 before giving up on it
+    MAX_RATE_LIMIT_RETRIES = 3
+
+    def __init__(self, max_workers: int = None, max_pages: int = None) -> None:
+        """
+        Initialize collector with Twitter API credentials.
+
+        Args:
+            max_workers: Accounts fetched concurrently, 1 disables concurrency
+            max_pages: Pages fetched per source and run before pausing
+        """
         try:
             config = get_twitter_config()
             self.client = tweepy.Client(
@@ -34,88 +53,356 @@ class GermanPoliticsCollector:
                 consumer_secret=config['api_secret'],
                 access_token=config['access_token'],
                 access_token_secret=config['access_token_secret'],
-                wait_on_rate_limit=True
+                # Rate limits are handled by the shared scheduler, see _request
+                wait_on_rate_limit=False
             )
             self.logger = logging.getLogger(__name__)
+            self.max_workers = max_workers or config.get('max_workers', self.DEFAULT_MAX_WORKERS)
+            self.rate_limiter = RateLimitScheduler(config.get('rate_limits'))
+            self.max_pages = max_pages or config.get('max_pages', self.DEFAULT_MAX_PAGES)
+            self._user_ids = {}
+            self._checkpoints = {}
+            self._pending_checkpoints = {}
         except KeyError as e:
             raise ValueError(f"Missing required configuration: {e}")
 
-    def search_political_tweets(self, max_results: int = 100) -> List[Dict]:
-        """Search for recent German political tweets."""
-        query = ' OR '.join(self.POLITICAL_KEYWORDS) + ' lang:de'
-        
+    @property
+    def search_query(self) -> str:
+        return ' OR '.join(self.POLITICAL_KEYWORDS) + ' lang:de'
+
+    def _search_checkpoint_key(self) -> str:
+        digest = hashlib.sha1(self.search_query.encode('utf-8')).hexdigest()[:16]
+        return f"search:{digest}"
+
+    @staticmethod
+    def _account_checkpoint_key(account: str) -> str:
+        return f"account:{account.lower()}"
+
+    def load_checkpoints(self, keys: List[str]) -> None:
+        """Read stored checkpoints for the given sources into memory."""
+        keys = [k for k in keys if k not in self._checkpoints]
+        if not keys:
+            return
         try:
-            tweets = self.client.search_recent_tweets(
-                query=query,
-                max_results=max_results,
-                tweet_fields=['created_at', 'public_metrics', 'lang']
-            )
-            
-            if not tweets.data:
-                self.logger.warning("No tweets found for query")
-                return []
-
-            return [{
-                'id': tweet.id,
-                'text': tweet.text,
-                'created_at': tweet.created_at,
-                'metrics': tweet.public_metrics,
-                'collected_at': datetime.now()
-            } for tweet in tweets.data]
+            with DatabaseHandler() as db:
+                self._checkpoints.update(db.get_checkpoints(keys))
+        except Exception as e:
+            self.logger.warning(f"Could not read collection checkpoints: {str(e)}")
+
+    def commit_checkpoints(self, db: DatabaseHandler = None, keys: List[str] = None) -> None:
+        """
+        Persist checkpoints advanced since the last commit.
+
+        Call this only after the tweets returned by the collection methods
+        have been stored, so a failed write never skips tweets.
+
+        Args:
+            db: Handler to write with, a pooled one is opened if omitted
+            keys: Only commit these sources, defaults to all pending ones
+        """
+        pending = {key: cp for key, cp in list(self._pending_checkpoints.items())
+                   if keys is None or key in keys}
+        if not pending:
+            return
+        if db is not None:
+            db.save_checkpoints(pending)
+        else:
+            with DatabaseHandler() as handler:
+                handler.save_checkpoints(pending)
+        self._checkpoints.update(pending)
+        for key in pending:
+            self._pending_checkpoints.pop(key, None)
+
+    @staticmethod
+    def _reset_delay(error: tweepy.TooManyRequests):
+        """Seconds until the limit resets according to ``x-rate-limit-reset``, if sent."""
+        headers = getattr(error.response, 'headers', None) or {}
+        reset = headers.get('x-rate-limit-reset')
+        if reset is None:
+            return None
+        # One extra second absorbs clock skew between us and the API
+        return max(float(reset) - time.time(), 0.0) + 1.0
+
+    def _request(self, endpoint: str, method, **kwargs):
+        """
+        Call an API method under the shared rate limiter.
 
+        A 429 response pauses the endpoint for all workers until the reset
+        time sent by the API, then the request is retried.
+        """
+        for attempt in range(self.MAX_RATE_LIMIT_RETRIES + 1):
+            self.rate_limiter.acquire(endpoint)
+            try:
+                with instrumentation.span(f'collector.{endpoint}') as span:
+                    response = method(**kwargs)
+                    span.rows = len(response.data or [])
+                return response
+            except tweepy.TooManyRequests as e:
+                if attempt == self.MAX_RATE_LIMIT_RETRIES:
+                    raise
+                self.rate_limiter.defer(endpoint, self._reset_delay(e))
+
+    def _paginate(self, method, endpoint: str, checkpoint_key: str, token_param: str,
+                  max_pages: int, account: str = None, **kwargs) -> Iterator[List[Dict]]:
+        """
+        Page forward from the stored checkpoint of a source.
+
+        Requests start at the checkpoint's ``since_id``, or resume an
+        interrupted run from its pagination token. The advanced checkpoint
+        is kept pending until commit_checkpoints() is called.
+
+        Yields:
+            Lists of tweet dicts, one per page
+        """
+        checkpoint = (self._pending_checkpoints.get(checkpoint_key)
+                      or self._checkpoints.get(checkpoint_key) or {})
+        since_id = checkpoint.get('since_id')
+        newest_id = checkpoint.get('pending_newest_id')
+        token = checkpoint.get('next_token')
+
+        if since_id:
+            kwargs['since_id'] = since_id
+        if token:
+            kwargs[token_param] = token
+
+        pages = 0
+        try:
+            while pages < max_pages:
+                response = self._request(endpoint, method, **kwargs)
+                pages += 1
+                meta = response.meta or {}
+                # The first page of a pass carries the newest id of the whole pass
+                if newest_id is None and meta.get('newest_id'):
+                    newest_id = int(meta['newest_id'])
+
+                if response.data:
+                    collected_at = datetime.now()
+                    yield [self._tweet_dict(tweet, collected_at, account)
+                           for tweet in response.data]
+
+                token = meta.get('next_token')
+                if not token:
+                    break
+                kwargs[token_param] = token
+
+        except tweepy.BadRequest as e:
+            # Usually an expired pagination token or a since_id outside the
+            # search window, start from scratch next time
+            self.logger.error(f"Rejected request for {checkpoint_key}, resetting checkpoint: {e}")
+            self._pending_checkpoints[checkpoint_key] = {
+                'since_id': None, 'pending_newest_id': None, 'next_token': None
+            }
+            return
         except tweepy.TweepyException as e:
-            self.logger.error(f"Twitter API error: {str(e)}")
-            return []
+            self.logger.error(f"Twitter API error for {checkpoint_key}: {e}")
+            if pages == 0:
+                return
 
-    def get_political_accounts_tweets(self, max_results: int = 50) -> List[Dict]:
-        """Collect recent tweets from major German political accounts."""
-        all_tweets = []
-        
-        for account in self.POLITICAL_ACCOUNTS:
+        if token:
+            # Page limit or error reached, resume from this token next run
+            checkpoint = {'since_id': since_id, 'pending_newest_id': newest_id,
+                          'next_token': token}
+        else:
+            checkpoint = {'since_id': newest_id or since_id, 'pending_newest_id': None,
+                          'next_token': None}
+        self._pending_checkpoints[checkpoint_key] = checkpoint
+
+    @staticmethod
+    def _tweet_dict(tweet, collected_at: datetime, account: str = None) -> Dict:
+        """Convert a tweepy tweet into the dict shape used for storage."""
+        data = {
+            'id': tweet.id,
+            'text': tweet.text,
+            'created_at': tweet.created_at,
+            'metrics': tweet.public_metrics,
+            'collected_at': collected_at
+        }
+        if account is not None:
+            data['account'] = account
+        return data
+
+    def iter_political_tweets(self, max_results: int = 100,
+                              max_pages: int = None) -> Iterator[List[Dict]]:
+        """Yield pages of German political tweets newer than the last checkpoint."""
+        key = self._search_checkpoint_key()
+        self.load_checkpoints([key])
+        yield from self._paginate(
+            self.client.search_recent_tweets,
+            'search_recent_tweets',
+            key,
+            'next_token',
+            max_pages or self.max_pages,
+            query=self.search_query,
+            max_results=max_results,
+            tweet_fields=['created_at', 'public_metrics', 'lang']
+        )
+
+    def search_political_tweets(self, max_results: int = 100, max_pages: int = None) -> List[Dict]:
+        """Search for German political tweets newer than the last checkpoint."""
+        tweets = [tweet for page in self.iter_political_tweets(max_results, max_pages)
+                  for tweet in page]
+        if not tweets:
+            self.logger.warning("No new tweets found for query")
+        return tweets
+
+    def resolve_user_ids(self, accounts: List[str]) -> Dict[str, int]:
+        """
+        Map usernames to Twitter user ids.
+
+        Ids are looked up in memory, then in the persistent twitter_users
+        table, and only the remaining usernames are resolved through the
+        API, up to 100 per request.
+        """
+        missing = [a for a in accounts if a.lower() not in self._user_ids]
+
+        if missing:
             try:
-                user = self.client.get_user(username=account)
-                if not user.data:
-                    self.logger.warning(f"Could not find user: {account}")
-                    continue
-
-                tweets = self.client.get_users_tweets(
-                    id=user.data.id,
-                    max_results=max_results,
-                    tweet_fields=['created_at', 'public_metrics', 'lang']
-                )
-                
-                if tweets.data:
-                    all_tweets.extend([{
-                        'id': tweet.id,
-                        'text': tweet.text,
-                        'created_at': tweet.created_at,
-                        'metrics': tweet.public_metrics,
-                        'account': account,
-                        'collected_at': datetime.now()
-                    } for tweet in tweets.data])
+                with DatabaseHandler() as db:
+                    cached = db.get_user_ids(missing)
+                self._user_ids.update({u.lower(): i for u, i in cached.items()})
+            except Exception as e:
+                self.logger.warning(f"Could not read cached user ids: {str(e)}")
+            missing = [a for a in missing if a.lower() not in self._user_ids]
 
+        resolved = {}
+        for start in range(0, len(missing), 100):
+            try:
+                users = self._request('get_users', self.client.get_users,
+                                      usernames=missing[start:start + 100])
+                for user in users.data or []:
+                    resolved[user.username] = user.id
             except tweepy.TweepyException as e:
-                self.logger.error(f"Error collecting tweets for {account}: {e}")
-                continue
+                self.logger.error(f"Error resolving user ids: {e}")
+
+        if resolved:
+            self._user_ids.update({u.lower(): i for u, i in resolved.items()})
+            try:
+                with DatabaseHandler() as db:
+                    db.store_user_ids(resolved)
+            except Exception as e:
+                self.logger.warning(f"Could not cache user ids: {str(e)}")
+
+        return {a: self._user_ids[a.lower()] for a in accounts if a.lower() in self._user_ids}
+
+    def _get_account_tweets(self, account: str, user_id: int, max_results: int,
+                            max_pages: int = None) -> List[Dict]:
+        """Collect tweets newer than the checkpoint for one resolved account."""
+        return [tweet for page in self._paginate(
+            self.client.get_users_tweets,
+            'get_users_tweets',
+            self._account_checkpoint_key(account),
+            'pagination_token',
+            max_pages or self.max_pages,
+            account=account,
+            id=user_id,
+            max_results=max_results,
+            tweet_fields=['created_at', 'public_metrics', 'lang']
+        ) for tweet in page]
+
+    def _tracked_accounts(self, max_workers: int = None):
+        """Resolve tracked accounts and load their checkpoints."""
+        user_ids = self.resolve_user_ids(self.POLITICAL_ACCOUNTS)
+        for account in self.POLITICAL_ACCOUNTS:
+            if account not in user_ids:
+                self.logger.warning(f"Could not find user: {account}")
+
+        accounts = [a for a in self.POLITICAL_ACCOUNTS if a in user_ids]
+        self.load_checkpoints([self._account_checkpoint_key(a) for a in accounts])
+        workers = min(max_workers or self.max_workers, len(accounts)) or 1
+        return accounts, user_ids, workers
+
+    def get_political_accounts_tweets(self, max_results: int = 50,
+                                      max_workers: int = None) -> List[Dict]:
+        """
+        Collect recent tweets from major German political accounts.
 
-        return all_tweets
+        Accounts are fetched concurrently on a thread pool, with all workers
+        sharing the per-endpoint rate limiter.
+        """
+        accounts, user_ids, workers = self._tracked_accounts(max_workers)
 
-    def collect_and_store(self) -> None:
-        """Collect tweets and store them in the database."""
+        if workers == 1:
+            results = [self._get_account_tweets(a, user_ids[a], max_results) for a in accounts]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(
+                    lambda a: self._get_account_tweets(a, user_ids[a], max_results),
+                    accounts
+                ))
+
+        return [tweet for account_tweets in results for tweet in account_tweets]
+
+    def iter_political_accounts_tweets(self, max_results: int = 50, max_workers: int = None,
+                                       collected: List[str] = None) -> Iterator[List[Dict]]:
+        """
+        Yield each tracked account's new tweets as soon as its fetch finishes.
+
+        Args:
+            collected: If given, the checkpoint key of every account whose
+                tweets have been yielded is appended to it
+        """
+        accounts, user_ids, workers = self._tracked_accounts(max_workers)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self._get_account_tweets, a, user_ids[a], max_results): a
+                for a in accounts
+            }
+            try:
+                for future in as_completed(futures):
+                    tweets = future.result()
+                    if collected is not None:
+                        collected.append(self._account_checkpoint_key(futures[future]))
+                    yield tweets
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    @instrumentation.timed('collector.collect_and_store')
+    def collect_and_store(self, queue_size: int = IngestionPipeline.DEFAULT_QUEUE_SIZE) -> Dict:
+        """
+        Collect tweets and stream them into the database.
+
+        Search results and account tweets are fetched by separate producers
+        while a writer stores them in batches. Checkpoints are committed
+        only for sources whose tweets have been stored.
+
+        Returns:
+            Per-stage throughput counters
+        """
         try:
-            with DatabaseHandler() as db:
-                # Collect and store general political tweets
-                political_tweets = self.search_political_tweets()
-                if political_tweets:
-                    db.store_tweets(political_tweets, is_political_account=False)
-                    self.logger.info(f"Stored {len(political_tweets)} general political tweets")
-
-                # Collect and store tweets from political accounts
-                account_tweets = self.get_political_accounts_tweets()
-                if account_tweets:
-                    db.store_tweets(account_tweets, is_political_account=True)
-                    self.logger.info(f"Stored {len(account_tweets)} tweets from political accounts")
-        
+            collected_accounts = []
+            db = DatabaseHandler()
+            analysis_config = get_analysis_config()
+            if analysis_config.get('trending', {}).get('enabled', True):
+                # Counts keywords of new tweets in the same transaction
+                TrendingEngine().register(db)
+            streaming = None
+            if analysis_config.get('streaming', {}).get('enabled', True):
+                streaming = StreamingAnalytics.from_checkpoint()
+                streaming.register(db)
+            pipeline = IngestionPipeline(db=db, queue_size=queue_size)
+            pipeline.add_source(
+                'search',
+                self.iter_political_tweets(),
+                is_political_account=False,
+                on_flushed=lambda db: self.commit_checkpoints(db, [self._search_checkpoint_key()])
+            )
+            pipeline.add_source(
+                'accounts',
+                self.iter_political_accounts_tweets(collected=collected_accounts),
+                is_political_account=True,
+                on_flushed=lambda db: self.commit_checkpoints(db, collected_accounts)
+            )
+            try:
+                stats = pipeline.run()
+            finally:
+                db.close()
+                if streaming is not None:
+                    streaming.close()
+            self.logger.info(f"Stored {stats['writer']['items']} tweets")
+            return stats
+
         except Exception as e:
             self.logger.error(f"Error in collect_and_store: {str(e)}")
             raise
@@ -127,6 +414,9 @@ if __name__ == "__main__":
         format='%(asctime)s - %(levelname)s - %(message)s'
     )
     
-    # Test the collector
-    collector = GermanPoliticsCollector()
-    collector.collect_and_store()
\ No newline at end of file
+    instrumentation.enable_from_config()
+    try:
+        collector = GermanPoliticsCollector()
+        collector.collect_and_store()
+    finally:
+        instrumentation.finish()
\ No newline at end of file
@@ -0,0 +1,215 @@
+import time
+import queue
+import logging
+import threading
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from src.database.db_handler import DatabaseHandler
+
+
+class StageStats:
+    """Throughput counters for one pipeline stage."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.blocked_seconds = 0.0
+
+    def as_dict(self) -> Dict:
+        return {
+            'items': self.items,
+            'failed': self.failed,
+            'busy_seconds': round(self.busy_seconds, 3),
+            'blocked_seconds': round(self.blocked_seconds, 3),
+            'items_per_second': (round(self.items / self.busy_seconds, 1)
+                                 if self.busy_seconds else None),
+        }
+
+
+class IngestionPipeline:
+    """
+    Streams collected tweets through a bounded queue into the database.
+
+    Every source runs in its own producer thread and pushes pages of tweets
+    onto the queue, blocking while it is full. A single writer drains the
+    queue and stores the tweets in batches, so API and database time
+    overlap while memory stays bounded by the queue size.
+    """
+
+    DEFAULT_QUEUE_SIZE = 20
+    DEFAULT_FLUSH_INTERVAL = 5.0
+
+    def __init__(self, db: DatabaseHandler = None, queue_size: int = DEFAULT_QUEUE_SIZE,
+                 batch_size: int = None, flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        """
+        Args:
+            db: Handler used by the writer, a pooled one is opened if omitted
+            queue_size: Maximum number of pages waiting to be written
+            batch_size: Tweets per store_tweets call, defaults to the handler's
+            flush_interval: Seconds after which a partial batch is written
+        """
+        self.logger = logging.getLogger(__name__)
+        self.db = db
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.sources = []
+        self.stats = {}
+        self._stop_event = threading.Event()
+
+    def add_source(self, name: str, pages: Iterable[List[Dict]], is_political_account: bool,
+                   on_flushed: Callable[[DatabaseHandler], None] = None) -> None:
+        """
+        Register a producer.
+
+        Args:
+            name: Stage name used in logs and stats
+            pages: Iterable of tweet lists, consumed lazily by the producer thread
+            is_political_account: Flag stored with the source's tweets
+            on_flushed: Called with the writer's handler once every tweet the
+                source produced is stored, unless the source failed or any of
+                its tweets could not be stored. Also called after a stop, so
+                it must only commit what was produced.
+        """
+        self.sources.append((name, pages, is_political_account, on_flushed))
+        self.stats[name] = StageStats(name)
+
+    def stop(self) -> None:
+        """Ask producers to stop after their current page; queued tweets are still written."""
+        self._stop_event.set()
+
+    def _produce(self, name: str, pages: Iterable[List[Dict]], is_political_account: bool) -> None:
+        stats = self.stats[name]
+        succeeded = False
+        try:
+            iterator = iter(pages)
+            while not self._stop_event.is_set():
+                started = time.perf_counter()
+                try:
+                    page = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    stats.busy_seconds += time.perf_counter() - started
+
+                if not page:
+                    continue
+                started = time.perf_counter()
+                # A pulled page is always queued, the writer keeps draining on shutdown
+                self.queue.put(('tweets', name, is_political_account, page))
+                stats.blocked_seconds += time.perf_counter() - started
+                stats.items += len(page)
+            succeeded = True
+        except Exception as e:
+            self.logger.error(f"Producer {name} failed: {str(e)}")
+        finally:
+            self.queue.put(('done', name, succeeded))
+
+    def _flush(self, db: DatabaseHandler, buffers: Dict[bool, List[Tuple[str, Dict]]]) -> None:
+        """Store the buffered (source, tweet) pairs and charge failures to their sources."""
+        stats = self.stats['writer']
+        for is_political_account, entries in buffers.items():
+            if not entries:
+                continue
+            started = time.perf_counter()
+            result = db.store_tweets([tweet for _, tweet in entries],
+                                     is_political_account=is_political_account,
+                                     batch_size=self.batch_size)
+            stats.busy_seconds += time.perf_counter() - started
+            stats.items += result['stored']
+            if result['failed']:
+                stats.failed += len(result['failed'])
+                sources = {}
+                for name, tweet in entries:
+                    sources.setdefault(tweet.get('id'), set()).add(name)
+                for failure in result['failed']:
+                    for name in sources.get(failure['id'], ()):
+                        self.stats[name].failed += 1
+            buffers[is_political_account] = []
+
+    def _write(self, db: DatabaseHandler) -> None:
+        """Drain the queue until every active source has sent its end marker."""
+        batch_size = self.batch_size or db.batch_size
+        callbacks = {name: on_flushed for name, _, _, on_flushed in self.sources}
+        active = self._active
+        buffers = self._buffers
+        stats = self.stats['writer']
+
+        while active:
+            started = time.perf_counter()
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._flush(db, buffers)
+                continue
+            finally:
+                stats.blocked_seconds += time.perf_counter() - started
+
+            if item[0] == 'tweets':
+                _, name, is_political_account, page = item
+                buffers[is_political_account].extend((name, tweet) for tweet in page)
+                if len(buffers[is_political_account]) >= batch_size:
+                    self._flush(db, buffers)
+            else:
+                _, name, succeeded = item
+                # Everything the source produced is ahead of its marker
+                self._flush(db, buffers)
+                active.discard(name)
+                failed = self.stats[name].failed
+                if failed:
+                    # Keep the checkpoint so the next run fetches these tweets again
+                    self.logger.warning(
+                        f"{failed} tweets from {name} could not be stored, "
+                        f"not advancing its checkpoint"
+                    )
+                elif succeeded and callbacks[name] is not None:
+                    callbacks[name](db)
+
+    def run(self) -> Dict[str, Dict]:
+        """
+        Run all producers and the writer until every source is drained.
+
+        Returns:
+            Per-stage counters keyed by stage name
+        """
+        self.stats['writer'] = StageStats('writer')
+        self._active = {name for name, _, _, _ in self.sources}
+        self._buffers = {False: [], True: []}
+        producers = [
+            threading.Thread(target=self._produce, args=(name, pages, flag),
+                             name=f"producer-{name}", daemon=True)
+            for name, pages, flag, _ in self.sources
+        ]
+        for producer in producers:
+            producer.start()
+
+        own_db = self.db is None
+        db = self.db or DatabaseHandler()
+        try:
+            try:
+                self._write(db)
+            except KeyboardInterrupt:
+                self.logger.warning("Interrupted, flushing queued tweets before exit")
+                self.stop()
+                self._write(db)
+        except Exception:
+            # Unblock producers waiting on a full queue, their tweets are lost
+            self.stop()
+            while any(p.is_alive() for p in producers):
+                try:
+                    self.queue.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            raise
+        finally:
+            if own_db:
+                db.close()
+
+        for producer in producers:
+            producer.join()
+
+        report = {name: stats.as_dict() for name, stats in self.stats.items()}
+        self.logger.info(f"Ingestion finished: {report}")
+        return report
@@ -0,0 +1,115 @@
+import time
+import threading
+import logging
+from typing import Dict, Tuple
+
+from src.monitoring import instrumentation
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at a fixed rate."""
+
+    def __init__(self, capacity: int, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        # While paused no tokens are handed out, afterwards the bucket is full
+        self._paused_until = None
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if self._paused_until is not None:
+            if now < self._paused_until:
+                self._updated = now
+                return
+            self._paused_until = None
+            self._tokens = float(self.capacity)
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.refill_per_second
+        )
+        self._updated = now
+
+    def pause(self, seconds: float) -> None:
+        """Empty the bucket until ``seconds`` from now, when the quota is restored."""
+        with self._lock:
+            self._refill()
+            self._tokens = 0.0
+            resume_at = time.monotonic() + seconds
+            self._paused_until = max(self._paused_until or resume_at, resume_at)
+
+    def acquire(self, tokens: int = 1) -> float:
+        """
+        Take tokens, sleeping until enough are available.
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._paused_until is not None:
+                    delay = self._paused_until - time.monotonic()
+                elif self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                else:
+                    delay = (tokens - self._tokens) / self.refill_per_second
+            time.sleep(delay)
+            waited += delay
+
+
+class RateLimitScheduler:
+    """Shares per-endpoint token buckets between concurrent API workers."""
+
+    # (requests, window in seconds) per endpoint for app-only authentication
+    DEFAULT_LIMITS = {
+        'search_recent_tweets': (450, 900),
+        'get_users': (300, 900),
+        'get_users_tweets': (1500, 900),
+    }
+
+    def __init__(self, limits: Dict[str, Tuple[int, int]] = None):
+        self.logger = logging.getLogger(__name__)
+        limits = {**self.DEFAULT_LIMITS, **(limits or {})}
+        self.buckets = {
+            endpoint: TokenBucket(requests, requests / window)
+            for endpoint, (requests, window) in limits.items()
+        }
+        self.windows = {endpoint: window for endpoint, (_, window) in limits.items()}
+        self.wait_seconds = {endpoint: 0.0 for endpoint in self.buckets}
+        self._lock = threading.Lock()
+
+    def acquire(self, endpoint: str) -> float:
+        """Block until a request to the endpoint is allowed."""
+        bucket = self.buckets.get(endpoint)
+        if bucket is None:
+            return 0.0
+        waited = bucket.acquire()
+        instrumentation.increment('api_requests_total', endpoint=endpoint)
+        if waited:
+            instrumentation.increment('rate_limit_wait_seconds_total', waited, endpoint=endpoint)
+            with self._lock:
+                self.wait_seconds[endpoint] += waited
+            self.logger.debug(f"Waited {waited:.2f}s for {endpoint} rate limit")
+        return waited
+
+    def defer(self, endpoint: str, seconds: float = None) -> None:
+        """
+        Hold back every request to an endpoint after the API rejected one.
+
+        Args:
+            endpoint: Endpoint that answered 429 Too Many Requests
+            seconds: Time until the API resets the limit, defaults to the
+                endpoint's whole window
+        """
+        bucket = self.buckets.get(endpoint)
+        if bucket is None:
+            return
+        if seconds is None:
+            seconds = self.windows[endpoint]
+        bucket.pause(seconds)
+        instrumentation.increment('rate_limited_total', endpoint=endpoint)
+        self.logger.warning(f"Rate limited on {endpoint}, pausing it for {seconds:.0f}s")
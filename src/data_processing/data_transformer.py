@@ -1,29 +1,71 @@
 import pandas as pd
-from textblob import TextBlob
 import logging
 from typing import Dict
 
+from src.data_processing.sentiment_backends import SentimentBackend, TextBlobBackend
+from src.data_processing.sentiment_engine import ParallelSentimentScorer
+from src.data_processing.near_duplicates import NearDuplicateDetector
+from src.monitoring import instrumentation
+
 class DataTransformer:
     """Transforms and enriches tweet data with sentiment analysis."""
 
-    def __init__(self):
+    def __init__(self, backend: SentimentBackend = None, workers: int = None,
+                 chunk_size: int = ParallelSentimentScorer.DEFAULT_CHUNK_SIZE,
+                 near_duplicates: NearDuplicateDetector = None):
+        """
+        Args:
+            backend: Sentiment scorer, defaults to the TextBlob reference backend
+            workers: Worker processes for backends that score in parallel
+            chunk_size: Distinct texts per scoring chunk
+            near_duplicates: Detector used by clean_tweets to also drop near duplicates
+        """
         self.logger = logging.getLogger(__name__)
+        self.near_duplicates = near_duplicates
+        self.backend = backend or TextBlobBackend()
+        # Persisted scores are tagged with this, so a backend change triggers a re-score
+        self.model_version = self.backend.version
+        self.scorer = ParallelSentimentScorer(
+            self.backend.score_batch,
+            workers=workers if self.backend.parallel else 1,
+            chunk_size=chunk_size
+        )
 
+    @instrumentation.timed('transformer.clean_tweets', rows=len)
     def clean_tweets(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Remove duplicates and clean tweet data."""
+        """Remove exact and, if a detector is configured, near-duplicate tweets."""
         try:
             df = df.drop_duplicates(subset=['text'])
+            if self.near_duplicates is not None and not df.empty:
+                ids = df['id'].tolist() if 'id' in df.columns else None
+                duplicates = self.near_duplicates.find_duplicates(df['text'].tolist(), ids=ids)
+                df = df[~duplicates]
             return df.reset_index(drop=True)
         except Exception as e:
             self.logger.error(f"Error cleaning tweets: {str(e)}")
             raise
 
-    def add_sentiment_analysis(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Add sentiment scores to tweets."""
+    @instrumentation.timed('transformer.score_sentiment', rows=len)
+    def score_sentiment(self, texts: pd.Series) -> pd.Series:
+        """Compute polarity scores for a series of texts."""
+        return pd.Series(self.scorer.score(texts.tolist()), index=texts.index, dtype=float)
+
+    def add_sentiment_analysis(self, df: pd.DataFrame, only_missing: bool = False) -> pd.DataFrame:
+        """
+        Add sentiment scores to tweets.
+
+        Args:
+            df: DataFrame with a ``text`` column
+            only_missing: Keep existing scores and only fill empty ones
+        """
         try:
-            df['sentiment'] = df['text'].apply(
-                lambda x: TextBlob(x).sentiment.polarity
-            )
+            if only_missing and 'sentiment' in df.columns:
+                df['sentiment'] = df['sentiment'].astype(float)
+                missing = df['sentiment'].isna()
+                if missing.any():
+                    df.loc[missing, 'sentiment'] = self.score_sentiment(df.loc[missing, 'text'])
+            else:
+                df['sentiment'] = self.score_sentiment(df['text'])
             return df
         except Exception as e:
             self.logger.error(f"Error in sentiment analysis: {str(e)}")
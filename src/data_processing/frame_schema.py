@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+INTEGER_COLUMNS = ['retweet_count', 'reply_count', 'like_count', 'quote_count']
+CATEGORY_COLUMNS = ['account_name', 'lang']
+DATETIME_COLUMNS = ['created_at', 'collected_at']
+TEXT_COLUMNS = ['text']
+
+# Signed and at least 32 bits, so sums and differences of counts such as
+# retweet_count + like_count or day-over-day changes cannot wrap around
+INTEGER_TYPES = [np.int32, np.int64]
+NULLABLE_INTEGER_TYPES = {np.int32: 'Int32', np.int64: 'Int64'}
+
+
+def smallest_integer_type(values: pd.Series):
+    """Return the smallest numpy integer type that holds every non-null value."""
+    values = values.dropna()
+    if values.empty:
+        return INTEGER_TYPES[0]
+    low, high = values.min(), values.max()
+    for dtype in INTEGER_TYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return dtype
+    return np.int64
+
+
+def apply_compact_schema(df: pd.DataFrame, arrow_strings: bool = False) -> pd.DataFrame:
+    """
+    Convert an analysis frame to memory-compact dtypes.
+
+    Accounts and languages become categoricals, engagement counts
+    ``int32`` unless they need ``int64`` (nullable if values are missing)
+    and timestamps ``datetime64``. Sentiment stays ``float64`` so means and
+    summaries match the unconverted frame. Columns that are not present are
+    skipped.
+
+    Args:
+        df: Tweet frame as loaded from the database
+        arrow_strings: Store ``text`` as pyarrow-backed strings
+
+    Returns:
+        The frame with converted columns
+    """
+    df = df.copy(deep=False)
+    for column in INTEGER_COLUMNS:
+        if column in df.columns:
+            values = pd.to_numeric(df[column])
+            dtype = smallest_integer_type(values)
+            df[column] = (values.astype(NULLABLE_INTEGER_TYPES[dtype]) if values.isna().any()
+                          else values.astype(dtype))
+    for column in CATEGORY_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    for column in DATETIME_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column])
+    if arrow_strings:
+        for column in TEXT_COLUMNS:
+            if column in df.columns:
+                df[column] = df[column].astype('string[pyarrow]')
+    return df
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compare the memory footprint of a frame before and after compaction.
+
+    Returns:
+        DataFrame indexed by column, plus a ``total`` row, with the bytes
+        and dtype before and after and the saved fraction
+    """
+    before_bytes = before.memory_usage(deep=True, index=False)
+    after_bytes = after.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        'dtype_before': before.dtypes.astype(str),
+        'bytes_before': before_bytes,
+        'dtype_after': after.dtypes.astype(str).reindex(before.columns),
+        'bytes_after': after_bytes.reindex(before.columns),
+    })
+    report.loc['total'] = ['', before_bytes.sum(), '', after_bytes.sum()]
+    report['saved'] = 1 - report['bytes_after'] / report['bytes_before'].replace(0, np.nan)
+    return report
+
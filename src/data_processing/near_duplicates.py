@@ -0,0 +1,246 @@
+import re
+import zlib
+import string
+import logging
+from typing import Dict, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+class NearDuplicateDetector:
+    """
+    Finds near-duplicate tweets with MinHash signatures and LSH banding.
+
+    Texts are normalized (retweet prefixes, URLs and optionally mentions
+    removed), split into word shingles and summarized as MinHash signatures.
+    Signatures are cut into bands and each band is hashed into a bucket, so
+    a new text is only compared with indexed texts sharing a bucket. A text
+    is a near duplicate when the estimated Jaccard similarity with such a
+    candidate reaches ``threshold``.
+
+    The index keeps the signatures of every text it has accepted, can be
+    saved to disk and extended incrementally with new batches.
+    """
+
+    # Mersenne prime for the universal hash family h(x) = (a * x + b) mod p
+    PRIME = (1 << 31) - 1
+    SEPARATOR = '\x00'
+    SIGNATURE_CHUNK = 5000
+    PUNCTUATION_TABLE = str.maketrans(
+        {c: ' ' for c in string.punctuation.replace('@', '') + '„“”‚‘’«»…–—'}
+    )
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 64, bands: int = None,
+                 shingle_size: int = 2, strip_retweets: bool = True, strip_urls: bool = True,
+                 strip_mentions: bool = False, seed: int = 1):
+        """
+        Args:
+            threshold: Minimum estimated Jaccard similarity of a near duplicate
+            num_perm: Number of MinHash permutations per signature
+            bands: LSH bands, chosen from threshold and num_perm if omitted
+            shingle_size: Words per shingle
+            strip_retweets: Remove leading "RT @user:" prefixes
+            strip_urls: Remove links, which differ between copies of a tweet
+            strip_mentions: Remove @mentions
+            seed: Seed for the hash permutations, must match a loaded index
+        """
+        self.logger = logging.getLogger(__name__)
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands or self._choose_bands(threshold, num_perm)
+        if num_perm % self.bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.rows = num_perm // self.bands
+        self.shingle_size = shingle_size
+        self.strip_retweets = strip_retweets
+        self.strip_urls = strip_urls
+        self.strip_mentions = strip_mentions
+        self.seed = seed
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, self.PRIME, size=num_perm).astype(np.int64)
+        self._b = rng.randint(0, self.PRIME, size=num_perm).astype(np.int64)
+        self._band_weights = rng.randint(1, 1 << 62, size=self.rows).astype(np.uint64)
+
+        self._patterns = []
+        if strip_retweets:
+            self._patterns.append(re.compile(r'(?<=\x00)\s*rt @\w+:?'))
+        if strip_urls:
+            self._patterns.append(re.compile(r'https?://[^\s\x00]+|www\.[^\s\x00]+'))
+        if strip_mentions:
+            self._patterns.append(re.compile(r'@\w+'))
+
+        self.ids = []
+        self._id_set = set()
+        self._signatures = np.empty((0, num_perm), dtype=np.int64)
+        self._size = 0
+        self._buckets = [dict() for _ in range(self.bands)]
+
+    @staticmethod
+    def _choose_bands(threshold: float, num_perm: int) -> int:
+        """Pick the band count whose LSH threshold (1/b)^(1/r) is closest to threshold."""
+        candidates = [b for b in range(1, num_perm + 1) if num_perm % b == 0]
+        return min(candidates, key=lambda b: abs((1 / b) ** (b / num_perm) - threshold))
+
+    @property
+    def params(self) -> Dict:
+        return {
+            'threshold': self.threshold, 'num_perm': self.num_perm, 'bands': self.bands,
+            'shingle_size': self.shingle_size, 'strip_retweets': self.strip_retweets,
+            'strip_urls': self.strip_urls, 'strip_mentions': self.strip_mentions,
+            'seed': self.seed,
+        }
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _tokenize(self, texts: Sequence[str]):
+        """Normalize a batch and return flat token codes with document ids."""
+        corpus = self.SEPARATOR + self.SEPARATOR.join(texts).lower()
+        for pattern in self._patterns:
+            corpus = pattern.sub(' ', corpus)
+        corpus = corpus.replace(self.SEPARATOR, f' {self.SEPARATOR} ')
+        tokens = corpus.translate(self.PUNCTUATION_TABLE).split()
+
+        codes, uniques = pd.factorize(pd.Series(tokens, dtype=object))
+        token_hashes = np.array(
+            [zlib.crc32(t.encode('utf-8')) % self.PRIME for t in uniques], dtype=np.int64
+        )
+        separators = (uniques == self.SEPARATOR)
+        is_separator = separators[codes]
+        doc_ids = np.cumsum(is_separator)[~is_separator] - 1
+        return token_hashes[codes[~is_separator]], doc_ids
+
+    def _shingle_hashes(self, token_hashes: np.ndarray, doc_ids: np.ndarray, n_docs: int):
+        """Combine consecutive token hashes into shingle hashes per document."""
+        lengths = np.bincount(doc_ids, minlength=n_docs)
+        ends = np.cumsum(lengths)
+        doc_end = np.repeat(ends, lengths)
+        positions = np.arange(len(token_hashes))
+
+        # Shingles start wherever a full shingle fits, or at the first token
+        # of documents shorter than one shingle
+        doc_start = np.repeat(ends - lengths, lengths)
+        starts = (positions + self.shingle_size <= doc_end) | (positions == doc_start)
+
+        shingles = token_hashes.copy()
+        for offset in range(1, self.shingle_size):
+            shifted = np.zeros_like(token_hashes)
+            shifted[:-offset] = token_hashes[offset:]
+            valid = positions + offset < doc_end
+            shingles = np.where(valid, (shingles * 1000003 + shifted) % self.PRIME, shingles)
+
+        return shingles[starts], doc_ids[starts]
+
+    def signatures(self, texts: Sequence[str]) -> np.ndarray:
+        """Compute MinHash signatures, one row per text."""
+        n_docs = len(texts)
+        result = np.full((n_docs, self.num_perm), self.PRIME, dtype=np.int64)
+        for start in range(0, n_docs, self.SIGNATURE_CHUNK):
+            chunk = list(texts[start:start + self.SIGNATURE_CHUNK])
+            token_hashes, doc_ids = self._tokenize(chunk)
+            if len(token_hashes) == 0:
+                continue
+            shingles, shingle_docs = self._shingle_hashes(token_hashes, doc_ids, len(chunk))
+            permuted = (shingles[:, None] * self._a + self._b) % self.PRIME
+            # Shingles are grouped by document, so reduceat yields per-document minima
+            present = np.unique(shingle_docs)
+            offsets = np.searchsorted(shingle_docs, present)
+            result[start + present] = np.minimum.reduceat(permuted, offsets, axis=0)
+        return result
+
+    def _band_keys(self, signatures: np.ndarray) -> np.ndarray:
+        """Hash every band of every signature to a single integer key."""
+        bands = signatures.reshape(len(signatures), self.bands, self.rows).astype(np.uint64)
+        return (bands * self._band_weights).sum(axis=2, dtype=np.uint64)
+
+    def _add(self, tweet_id, signature: np.ndarray, keys: np.ndarray) -> None:
+        if self._size == len(self._signatures):
+            grown = np.empty((max(1024, 2 * self._size), self.num_perm), dtype=np.int64)
+            grown[:self._size] = self._signatures[:self._size]
+            self._signatures = grown
+        self._signatures[self._size] = signature
+        for band, key in enumerate(keys.tolist()):
+            self._buckets[band].setdefault(key, []).append(self._size)
+        self.ids.append(tweet_id)
+        self._id_set.add(tweet_id)
+        self._size += 1
+
+    def find_duplicates(self, texts: Sequence[str], ids: Sequence = None,
+                        update: bool = True) -> np.ndarray:
+        """
+        Flag texts that nearly duplicate an indexed or earlier text in the batch.
+
+        Args:
+            texts: Batch of tweet texts
+            ids: Tweet ids; texts whose id is already indexed are never flagged
+            update: Add the non-duplicate texts to the index
+
+        Returns:
+            Boolean array, True for near duplicates
+        """
+        texts = list(texts)
+        if ids is None:
+            ids = [None] * len(texts)
+        signatures = self.signatures(texts)
+        keys = self._band_keys(signatures)
+        duplicates = np.zeros(len(texts), dtype=bool)
+        added = []
+
+        for i, tweet_id in enumerate(ids):
+            if tweet_id is not None and tweet_id in self._id_set:
+                continue
+            row_keys = keys[i]
+            candidates = set()
+            for band, key in enumerate(row_keys.tolist()):
+                candidates.update(self._buckets[band].get(key, ()))
+            if candidates:
+                candidate_rows = self._signatures[list(candidates)]
+                similarity = (candidate_rows == signatures[i]).mean(axis=1)
+                if similarity.max() >= self.threshold:
+                    duplicates[i] = True
+                    continue
+            self._add(tweet_id, signatures[i], row_keys)
+            added.append(row_keys)
+
+        if not update:
+            # Batch members were indexed temporarily to catch in-batch duplicates
+            for row_keys in reversed(added):
+                for band, key in enumerate(row_keys.tolist()):
+                    bucket = self._buckets[band][key]
+                    bucket.pop()
+                    if not bucket:
+                        del self._buckets[band][key]
+                self._id_set.discard(self.ids.pop())
+                self._size -= 1
+
+        return duplicates
+
+    def save(self, path: str) -> None:
+        """Write the signature index to a compressed ``.npz`` file."""
+        np.savez_compressed(
+            path,
+            ids=np.array(self.ids, dtype=object),
+            signatures=self._signatures[:self._size],
+            params=np.array([repr(sorted(self.params.items()))]),
+        )
+
+    @classmethod
+    def load(cls, path: str, **params) -> 'NearDuplicateDetector':
+        """
+        Load a saved index, rebuilding the LSH buckets from its signatures.
+
+        Raises:
+            ValueError: If the given parameters differ from the saved ones
+        """
+        data = np.load(path, allow_pickle=True)
+        detector = cls(**params)
+        if str(data['params'][0]) != repr(sorted(detector.params.items())):
+            raise ValueError("Saved near-duplicate index was built with different parameters")
+
+        signatures = data['signatures']
+        keys = detector._band_keys(signatures)
+        for tweet_id, signature, row_keys in zip(data['ids'].tolist(), signatures, keys):
+            detector._add(tweet_id, signature, row_keys)
+        return detector
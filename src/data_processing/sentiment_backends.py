@@ -0,0 +1,173 @@
+import string
+import hashlib
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+
+
+class SentimentBackend:
+    """Interface for sentiment scorers that work on batches of texts."""
+
+    name = None
+    version = None
+    # Whether scoring benefits from being spread over worker processes
+    parallel = True
+
+    def score_batch(self, texts: Sequence[str]) -> Sequence[float]:
+        """Return one polarity score in [-1, 1] per text."""
+        raise NotImplementedError
+
+
+class TextBlobBackend(SentimentBackend):
+    """Reference backend using TextBlob's English pattern analyzer."""
+
+    name = 'textblob'
+    version = 'textblob-0.17.1'
+
+    def score_batch(self, texts: Sequence[str]) -> List[float]:
+        from textblob import TextBlob
+        return [TextBlob(text).sentiment.polarity for text in texts]
+
+
+# Compact built-in polarity lexicon in the style of SentiWS, used when no
+# lexicon files are configured
+DEFAULT_GERMAN_LEXICON = {
+    'gut': 0.37, 'besser': 0.37, 'beste': 0.5, 'toll': 0.5, 'super': 0.5,
+    'stark': 0.2, 'erfolg': 0.5, 'erfolgreich': 0.5, 'freude': 0.65,
+    'freuen': 0.5, 'danke': 0.4, 'dank': 0.4, 'richtig': 0.2, 'wichtig': 0.2,
+    'klar': 0.1, 'sicher': 0.2, 'stabil': 0.2, 'fortschritt': 0.4,
+    'gemeinsam': 0.2, 'zukunft': 0.1, 'hoffnung': 0.4, 'unterstützen': 0.3,
+    'unterstützung': 0.3, 'zustimmung': 0.3, 'gewinnen': 0.4, 'sieg': 0.5,
+    'vertrauen': 0.4, 'gerecht': 0.4, 'fair': 0.4, 'positiv': 0.5,
+    'lösung': 0.3, 'einigung': 0.3, 'glücklich': 0.5, 'stolz': 0.3,
+    'schlecht': -0.77, 'schlimm': -0.5, 'falsch': -0.5, 'fehler': -0.4,
+    'versagen': -0.5, 'versagt': -0.5, 'skandal': -0.6, 'krise': -0.4,
+    'chaos': -0.5, 'katastrophe': -0.7, 'katastrophal': -0.7, 'angst': -0.5,
+    'gefahr': -0.4, 'gefährlich': -0.5, 'problem': -0.3, 'probleme': -0.3,
+    'kritik': -0.3, 'kritisiert': -0.3, 'kritisieren': -0.3, 'streit': -0.4,
+    'lüge': -0.6, 'lügen': -0.6, 'betrug': -0.6, 'korruption': -0.7,
+    'verlust': -0.4, 'verlieren': -0.4, 'niederlage': -0.5, 'wut': -0.5,
+    'enttäuscht': -0.5, 'enttäuschung': -0.5, 'unfair': -0.4,
+    'ungerecht': -0.5, 'negativ': -0.5, 'scheitern': -0.5, 'gescheitert': -0.5,
+    'schande': -0.6, 'peinlich': -0.4, 'hass': -0.7, 'hetze': -0.6,
+}
+
+DEFAULT_GERMAN_NEGATORS = (
+    'nicht', 'kein', 'keine', 'keinen', 'keinem', 'keiner', 'keines',
+    'nie', 'niemals', 'nichts', 'ohne', 'weder',
+)
+
+
+def load_sentiws(paths: Iterable[str]) -> Dict[str, float]:
+    """
+    Read SentiWS-formatted lexicon files into a word-to-weight mapping.
+
+    Each line looks like ``Wort|POS<TAB>weight<TAB>inflection,inflection``.
+    """
+    lexicon = {}
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                parts = line.rstrip('\n').split('\t')
+                if len(parts) < 2:
+                    continue
+                word = parts[0].split('|')[0]
+                weight = float(parts[1])
+                forms = [word] + (parts[2].split(',') if len(parts) > 2 and parts[2] else [])
+                for form in forms:
+                    lexicon[form.lower()] = weight
+    return lexicon
+
+
+class GermanLexiconBackend(SentimentBackend):
+    """
+    Vectorized German polarity lexicon scorer with simple negation handling.
+
+    Texts are split on whitespace and punctuation into one flat token array,
+    mapped onto the lexicon vocabulary and scored as a sparse term-document
+    product with the weight vector. A text's polarity is the mean weight of
+    its lexicon hits, with hits preceded by a negator inside
+    ``negation_window`` tokens flipped.
+    """
+
+    name = 'german_lexicon'
+    parallel = False
+
+    SEPARATOR_ID = -2
+    PUNCTUATION_TABLE = str.maketrans(
+        {c: ' ' for c in string.punctuation + '„“”‚‘’«»…–—'}
+    )
+
+    def __init__(self, lexicon: Dict[str, float] = None, lexicon_paths: Sequence[str] = None,
+                 negators: Sequence[str] = DEFAULT_GERMAN_NEGATORS, negation_window: int = 3):
+        if lexicon is None:
+            lexicon = load_sentiws(lexicon_paths) if lexicon_paths else DEFAULT_GERMAN_LEXICON
+        negators = [n for n in negators if n not in lexicon]
+
+        self.terms = list(lexicon) + negators
+        self.vocabulary = {term: i for i, term in enumerate(self.terms)}
+        self.vocabulary['\x00'] = self.SEPARATOR_ID
+        self.weights = np.array(list(lexicon.values()) + [0.0] * len(negators))
+        self.is_negator = np.zeros(len(self.terms), dtype=bool)
+        self.is_negator[len(lexicon):] = True
+        self.negation_window = negation_window
+
+        digest = hashlib.sha1(
+            repr((sorted(lexicon.items()), sorted(negators), negation_window)).encode('utf-8')
+        ).hexdigest()[:10]
+        self.version = f'german-lexicon-{digest}'
+
+    def score_batch(self, texts: Sequence[str]) -> np.ndarray:
+        n_docs = len(texts)
+        if n_docs == 0:
+            return np.empty(0, dtype=float)
+
+        # Tokenize the whole batch in one pass, a NUL token marks document ends
+        corpus = ' \x00 '.join(texts).lower().translate(self.PUNCTUATION_TABLE)
+        tokens = corpus.split()
+        term_ids = np.array([self.vocabulary.get(t, -1) for t in tokens], dtype=np.int64)
+
+        separators = term_ids == self.SEPARATOR_ID
+        doc_ids = np.cumsum(separators)[~separators]
+        term_ids = term_ids[~separators]
+        if len(term_ids) == 0:
+            return np.zeros(n_docs, dtype=float)
+
+        lengths = np.bincount(doc_ids, minlength=n_docs)
+        doc_starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        positions = np.arange(len(term_ids))
+
+        known = term_ids >= 0
+        safe_ids = np.where(known, term_ids, 0)
+        negator_flags = (known & self.is_negator[safe_ids]).astype(np.int64)
+        # Exclusive prefix sum: negators_before[i] counts negators in tokens[:i]
+        negators_before = np.concatenate(([0], np.cumsum(negator_flags)))
+
+        hit = known & (self.weights[safe_ids] != 0)
+        hit_pos = positions[hit]
+        window_start = np.maximum(hit_pos - self.negation_window, doc_starts[hit])
+        negated = (negators_before[hit_pos] - negators_before[window_start]) > 0
+
+        # Sparse term-document matrix times the weight vector
+        hit_weights = self.weights[term_ids[hit]] * np.where(negated, -1.0, 1.0)
+        hit_docs = doc_ids[hit]
+        totals = np.bincount(hit_docs, weights=hit_weights, minlength=n_docs)
+        counts = np.bincount(hit_docs, minlength=n_docs)
+
+        scores = totals / np.maximum(counts, 1)
+        return np.clip(scores, -1.0, 1.0)
+
+
+SENTIMENT_BACKENDS = {
+    TextBlobBackend.name: TextBlobBackend,
+    GermanLexiconBackend.name: GermanLexiconBackend,
+}
+
+
+def get_sentiment_backend(name: str = TextBlobBackend.name, **kwargs) -> SentimentBackend:
+    """Instantiate a sentiment backend by its registered name."""
+    if name not in SENTIMENT_BACKENDS:
+        raise ValueError(
+            f"Unknown sentiment backend '{name}', expected one of {sorted(SENTIMENT_BACKENDS)}"
+        )
+    return SENTIMENT_BACKENDS[name](**kwargs)
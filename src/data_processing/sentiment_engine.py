@@ -0,0 +1,58 @@
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+class ParallelSentimentScorer:
+    """Scores texts in deduplicated chunks spread over a process pool."""
+
+    DEFAULT_CHUNK_SIZE = 2000
+    # Below this many distinct texts, process startup costs more than it saves
+    MIN_PARALLEL_TEXTS = 5000
+
+    def __init__(self, score_chunk: Callable[[Sequence[str]], Sequence[float]],
+                 workers: int = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """
+        Args:
+            score_chunk: Picklable function mapping a list of texts to scores
+            workers: Number of worker processes, defaults to the CPU count
+            chunk_size: Number of distinct texts sent to a worker at once
+        """
+        self.logger = logging.getLogger(__name__)
+        self.score_chunk = score_chunk
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+
+    def score(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Score texts, returning results in input order.
+
+        Each distinct text is scored once and the scores are broadcast
+        back to all of its occurrences.
+        """
+        codes, uniques = pd.factorize(pd.Series(texts, dtype=object), use_na_sentinel=False)
+        if len(uniques) == 0:
+            return np.empty(0, dtype=float)
+
+        uniques = list(uniques)
+        chunks = [uniques[i:i + self.chunk_size]
+                  for i in range(0, len(uniques), self.chunk_size)]
+
+        if self.workers <= 1 or len(chunks) == 1 or len(uniques) < self.MIN_PARALLEL_TEXTS:
+            results = [self.score_chunk(chunk) for chunk in chunks]
+        else:
+            workers = min(self.workers, len(chunks))
+            self.logger.info(
+                f"Scoring {len(uniques)} distinct texts in {len(chunks)} chunks "
+                f"on {workers} processes"
+            )
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                # map preserves chunk order, so scores line up with uniques
+                results = list(executor.map(self.score_chunk, chunks))
+
+        unique_scores = np.concatenate([np.asarray(r, dtype=float) for r in results])
+        return unique_scores[codes]
@@ -0,0 +1,198 @@
+import os
+import threading
+import time
+import logging
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2 import pool
+
+from src.config.config_loader import get_database_config
+
+# Errors after which a connection is considered broken and must not be reused
+CONNECTION_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+
+class ConnectionPool:
+    """
+    Thread-safe PostgreSQL connection pool with health checks.
+
+    When all ``max_size`` connections are checked out, ``getconn`` waits up
+    to ``checkout_timeout`` seconds for one to be returned instead of
+    failing at once. Connections are only pinged before reuse when they sat
+    idle longer than ``idle_check_seconds``.
+    """
+
+    DEFAULT_MIN_SIZE = 1
+    DEFAULT_MAX_SIZE = 10
+    DEFAULT_CHECKOUT_TIMEOUT = 30
+    DEFAULT_IDLE_CHECK_SECONDS = 60
+    CHECKOUT_RETRIES = 3
+
+    def __init__(self, config=None, min_size=None, max_size=None, checkout_timeout=None,
+                 **connect_kwargs):
+        self.logger = logging.getLogger(__name__)
+        self.config = config or get_database_config()
+        self.min_size = min_size or self.config.get('pool_min_size', self.DEFAULT_MIN_SIZE)
+        self.max_size = max_size or self.config.get('pool_max_size', self.DEFAULT_MAX_SIZE)
+        self.checkout_timeout = checkout_timeout or self.config.get(
+            'pool_checkout_timeout', self.DEFAULT_CHECKOUT_TIMEOUT
+        )
+        self.idle_check_seconds = self.config.get(
+            'pool_idle_check_seconds', self.DEFAULT_IDLE_CHECK_SECONDS
+        )
+        self.connect_kwargs = connect_kwargs
+        self._pool = None
+        self._lock = threading.Lock()
+        # One permit per connection that may be checked out at a time
+        self._slots = threading.BoundedSemaphore(self.max_size)
+        # Monotonic time each idle connection was returned, by id
+        self._returned_at = {}
+
+    def _create_pool(self):
+        """Open the underlying psycopg2 pool."""
+        try:
+            self._pool = pool.ThreadedConnectionPool(
+                self.min_size,
+                self.max_size,
+                host=self.config['host'],
+                port=self.config['port'],
+                dbname=self.config['name'],
+                user=self.config['user'],
+                password=self.config['password'],
+                **self.connect_kwargs
+            )
+            self.logger.info(
+                f"Opened connection pool (min={self.min_size}, max={self.max_size})"
+            )
+        except Exception as e:
+            self.logger.error(f"Error creating connection pool: {str(e)}")
+            raise
+
+    def _is_healthy(self, conn):
+        """
+        Check that a pooled connection is open and can be reused.
+
+        Connections idle for longer than ``idle_check_seconds`` are pinged,
+        since the server or a firewall may have dropped them meanwhile.
+        """
+        if conn.closed:
+            return False
+        returned_at = self._returned_at.pop(id(conn), None)
+        try:
+            # Leave connections in an idle state, never inside a transaction
+            if conn.status != psycopg2.extensions.STATUS_READY:
+                conn.rollback()
+            if returned_at is None or time.monotonic() - returned_at > self.idle_check_seconds:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1")
+                conn.rollback()
+            return True
+        except CONNECTION_ERRORS:
+            return False
+
+    def getconn(self):
+        """
+        Check out a healthy connection, reconnecting if necessary.
+
+        Raises:
+            pool.PoolError: If no connection was returned within ``checkout_timeout``
+        """
+        if not self._slots.acquire(timeout=self.checkout_timeout):
+            raise pool.PoolError(
+                f"No database connection available after {self.checkout_timeout}s "
+                f"(pool_max_size={self.max_size})"
+            )
+        try:
+            with self._lock:
+                if self._pool is None or self._pool.closed:
+                    self._create_pool()
+
+            for attempt in range(self.CHECKOUT_RETRIES):
+                conn = self._pool.getconn()
+                if self._is_healthy(conn):
+                    return conn
+                self.logger.warning(
+                    f"Discarding broken pooled connection (attempt {attempt + 1})"
+                )
+                self._pool.putconn(conn, close=True)
+        except Exception:
+            self._slots.release()
+            raise
+
+        self._slots.release()
+        raise psycopg2.OperationalError("Could not obtain a healthy database connection")
+
+    def putconn(self, conn, close=False):
+        """Return a connection to the pool, closing it if it is broken."""
+        try:
+            if self._pool is None or self._pool.closed:
+                conn.close()
+                return
+            if not conn.closed and not close:
+                try:
+                    conn.rollback()
+                except CONNECTION_ERRORS:
+                    close = True
+            close = close or bool(conn.closed)
+            if not close:
+                self._returned_at[id(conn)] = time.monotonic()
+            self._pool.putconn(conn, close=close)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """
+        Context-managed checkout of a pooled connection.
+
+        The connection is returned to the pool on exit and discarded if
+        it failed with a connection-level error.
+        """
+        conn = self.getconn()
+        broken = False
+        try:
+            yield conn
+        except CONNECTION_ERRORS:
+            broken = True
+            raise
+        finally:
+            self.putconn(conn, close=broken)
+
+    def close(self):
+        """Close all connections held by the pool."""
+        with self._lock:
+            if self._pool is not None and not self._pool.closed:
+                self._pool.closeall()
+            self._pool = None
+            self._returned_at.clear()
+
+
+_shared_pool = None
+_shared_pool_pid = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    Return the process-wide connection pool, creating it on first use.
+
+    Forked child processes get a fresh pool, since connections cannot be
+    shared across processes.
+    """
+    global _shared_pool, _shared_pool_pid
+    with _shared_pool_lock:
+        if _shared_pool is None or _shared_pool_pid != os.getpid():
+            _shared_pool = ConnectionPool()
+            _shared_pool_pid = os.getpid()
+        return _shared_pool
+
+
+def close_pool():
+    """Close the process-wide connection pool."""
+    global _shared_pool, _shared_pool_pid
+    with _shared_pool_lock:
+        if _shared_pool is not None and _shared_pool_pid == os.getpid():
+            _shared_pool.close()
+        _shared_pool = None
+        _shared_pool_pid = None
@@ -1,83 +1,1407 @@
+import uuid
+from datetime import datetime, timedelta
 import psycopg2
-from psycopg2.extras import Json
-from src.config.config_loader import get_database_config
+import psycopg2.errors
+from psycopg2.extras import Json, RealDictCursor, execute_values
+from src.database.connection_pool import get_pool
+from src.monitoring import instrumentation
 import logging
 
 class DatabaseHandler:
     """Handles database operations for storing and retrieving tweets."""
 
-    def __init__(self):
+    DEFAULT_BATCH_SIZE = 1000
+    DEFAULT_STREAM_CHUNK_SIZE = 10000
+
+    # Columns that can be projected by stream_tweets. Engagement counts and
+    # collected_at come from the current engagement row (alias e).
+    TWEET_COLUMNS = {
+        'id': 't.id',
+        'text': 't.text',
+        'created_at': 't.created_at',
+        'collected_at': 'COALESCE(e.snapshot_at, t.collected_at)',
+        'account_name': 't.account_name',
+        'metrics': 't.metrics',
+        'lang': 't.lang',
+        'is_political_account': 't.is_political_account',
+        'retweet_count': 'COALESCE(e.retweet_count, t.retweet_count)',
+        'reply_count': 'COALESCE(e.reply_count, t.reply_count)',
+        'like_count': 'COALESCE(e.like_count, t.like_count)',
+        'quote_count': 'COALESCE(e.quote_count, t.quote_count)',
+        'sentiment': 's.score',
+        'scored_at': 's.scored_at',
+    }
+    METRIC_COLUMNS = ['retweet_count', 'reply_count', 'like_count', 'quote_count']
+    ENGAGEMENT_COLUMNS = {'collected_at', *METRIC_COLUMNS}
+
+    # Joins the current engagement counts of tweet t as e, a primary key lookup
+    CURRENT_ENGAGEMENT_JOIN = "LEFT JOIN tweet_engagement_current e ON e.tweet_id = t.id"
+
+    def __init__(self, pool=None):
         self.logger = logging.getLogger(__name__)
-        self.config = get_database_config()
+        self.pool = pool or get_pool()
+        self.config = self.pool.config
+        self.batch_size = self.config.get('batch_size', self.DEFAULT_BATCH_SIZE)
+        # Monthly partitions this handler has created or seen
+        self._known_partitions = set()
+        self.store_hooks = []
+        self.commit_hooks = []
+        self._database_id = None
         self.conn = None
         self.connect()
 
     def connect(self):
-        """Establish database connection with error handling."""
+        """Check out a connection from the shared pool, replacing a held one."""
         try:
-            self.conn = psycopg2.connect(
-                host=self.config['host'],
-                port=self.config['port'],
-                dbname=self.config['name'],
-                user=self.config['user'],
-                password=self.config['password']
-            )
+            if self.conn is not None:
+                self.pool.putconn(self.conn, close=bool(self.conn.closed))
+                self.conn = None
+            self.conn = self.pool.getconn()
             self.logger.info("Successfully connected to database")
         except Exception as e:
             self.logger.error(f"Error connecting to database: {str(e)}")
             raise
 
+    def ensure_connection(self):
+        """Reconnect if the held connection has been closed."""
+        if self.conn is None or self.conn.closed:
+            self.logger.warning("Database connection lost, reconnecting")
+            self.connect()
+
+    # Columns stored in the tweets table, in insert order. The engagement
+    # columns keep the counts seen when the tweet was first collected.
+    TWEET_TABLE_COLUMNS = [
+        'id', 'text', 'created_at', 'collected_at', 'account_name', 'metrics',
+        'lang', 'is_political_account', 'retweet_count', 'reply_count',
+        'like_count', 'quote_count',
+    ]
+
+    TWEETS_TABLE_SQL = """
+        CREATE TABLE IF NOT EXISTS tweets (
+            id BIGINT NOT NULL,
+            text TEXT NOT NULL,
+            created_at TIMESTAMP NOT NULL,
+            collected_at TIMESTAMP NOT NULL,
+            account_name VARCHAR(255),
+            metrics JSONB,
+            lang VARCHAR(10),
+            is_political_account BOOLEAN,
+            retweet_count INTEGER,
+            reply_count INTEGER,
+            like_count INTEGER,
+            quote_count INTEGER,
+            search_vector TSVECTOR
+                GENERATED ALWAYS AS (to_tsvector('german', text)) STORED,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at);
+
+        CREATE INDEX IF NOT EXISTS tweets_created_at_idx ON tweets(created_at);
+        CREATE INDEX IF NOT EXISTS tweets_account_name_idx ON tweets(account_name);
+    """
+
+    # Added separately so tables created before full-text search get it too;
+    # adding the generated column computes it for every existing row
+    SEARCH_INDEX_SQL = """
+        ALTER TABLE tweets ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+            GENERATED ALWAYS AS (to_tsvector('german', text)) STORED;
+
+        CREATE INDEX IF NOT EXISTS tweets_search_vector_idx
+            ON tweets USING GIN (search_vector);
+    """
+
     def init_tables(self):
         """Create necessary tables if they don't exist"""
+        self.migrate_to_partitioned()
         with self.conn.cursor() as cur:
+            # tweet_engagement_current used to be a view over the history
             cur.execute("""
-                CREATE TABLE IF NOT EXISTS tweets (
-                    id BIGINT PRIMARY KEY,
-                    text TEXT NOT NULL,
-                    created_at TIMESTAMP NOT NULL,
-                    collected_at TIMESTAMP NOT NULL,
-                    account_name VARCHAR(255),
-                    metrics JSONB,
-                    lang VARCHAR(10),
-                    is_political_account BOOLEAN
+                SELECT relkind FROM pg_class
+                WHERE oid = to_regclass('tweet_engagement_current')
+            """)
+            row = cur.fetchone()
+            if row is not None and row[0] == 'v':
+                cur.execute("DROP VIEW tweet_engagement_current")
+            cur.execute(self.TWEETS_TABLE_SQL + self.SEARCH_INDEX_SQL + """
+                CREATE TABLE IF NOT EXISTS tweet_sentiment (
+                    tweet_id BIGINT NOT NULL,
+                    model_version VARCHAR(64) NOT NULL,
+                    score DOUBLE PRECISION NOT NULL,
+                    scored_at TIMESTAMP NOT NULL DEFAULT now(),
+                    PRIMARY KEY (tweet_id, model_version)
+                );
+
+                CREATE INDEX IF NOT EXISTS tweet_sentiment_model_version_idx
+                    ON tweet_sentiment(model_version);
+
+                CREATE INDEX IF NOT EXISTS tweet_sentiment_scored_at_idx
+                    ON tweet_sentiment USING BRIN (scored_at);
+
+                -- Append-only, one row per tweet whenever its engagement changed.
+                -- Rows arrive in snapshot_at order, so a BRIN index is enough
+                -- for time range scans.
+                CREATE TABLE IF NOT EXISTS tweet_engagement_history (
+                    tweet_id BIGINT NOT NULL,
+                    snapshot_at TIMESTAMP NOT NULL,
+                    retweet_count INTEGER,
+                    reply_count INTEGER,
+                    like_count INTEGER,
+                    quote_count INTEGER,
+                    PRIMARY KEY (tweet_id, snapshot_at)
+                );
+
+                CREATE INDEX IF NOT EXISTS tweet_engagement_history_snapshot_at_idx
+                    ON tweet_engagement_history USING BRIN (snapshot_at);
+
+                -- Latest counts per tweet, upserted next to every history row.
+                -- Narrow and without indexes on the updated columns, so
+                -- updates stay HOT and never touch the tweets heap.
+                CREATE TABLE IF NOT EXISTS tweet_engagement_current (
+                    tweet_id BIGINT PRIMARY KEY,
+                    snapshot_at TIMESTAMP NOT NULL,
+                    retweet_count INTEGER,
+                    reply_count INTEGER,
+                    like_count INTEGER,
+                    quote_count INTEGER
+                ) WITH (fillfactor = 80);
+
+                CREATE TABLE IF NOT EXISTS tweet_rollup_hourly (
+                    bucket TIMESTAMP NOT NULL,
+                    account_name VARCHAR(255) NOT NULL DEFAULT '',
+                    is_political_account BOOLEAN NOT NULL DEFAULT FALSE,
+                    tweet_count INTEGER NOT NULL,
+                    retweet_sum BIGINT NOT NULL,
+                    reply_sum BIGINT NOT NULL,
+                    like_sum BIGINT NOT NULL,
+                    quote_sum BIGINT NOT NULL,
+                    PRIMARY KEY (bucket, account_name, is_political_account)
+                );
+
+                CREATE TABLE IF NOT EXISTS keyword_hourly_counts (
+                    bucket TIMESTAMP NOT NULL,
+                    keyword VARCHAR(255) NOT NULL,
+                    tweet_count INTEGER NOT NULL,
+                    PRIMARY KEY (bucket, keyword)
+                );
+
+                CREATE TABLE IF NOT EXISTS twitter_users (
+                    username VARCHAR(255) PRIMARY KEY,
+                    user_id BIGINT NOT NULL,
+                    resolved_at TIMESTAMP NOT NULL DEFAULT now()
+                );
+
+                -- Single row bumped by every write that changes analysis results,
+                -- so readers can detect changes without scanning the tables.
+                -- database_id tells caches of different databases apart,
+                -- archived_before is the end of the newest archived month.
+                CREATE TABLE IF NOT EXISTS data_version (
+                    singleton BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (singleton),
+                    version BIGINT NOT NULL
+                );
+                ALTER TABLE data_version ADD COLUMN IF NOT EXISTS database_id TEXT NOT NULL
+                    DEFAULT md5(random()::TEXT || clock_timestamp()::TEXT);
+                ALTER TABLE data_version ADD COLUMN IF NOT EXISTS archived_before TIMESTAMP;
+                INSERT INTO data_version (version) VALUES (0) ON CONFLICT DO NOTHING;
+
+                CREATE TABLE IF NOT EXISTS collection_checkpoints (
+                    source VARCHAR(255) PRIMARY KEY,
+                    since_id BIGINT,
+                    pending_newest_id BIGINT,
+                    next_token TEXT,
+                    updated_at TIMESTAMP NOT NULL DEFAULT now()
                 );
-                
-                CREATE INDEX IF NOT EXISTS tweets_created_at_idx ON tweets(created_at);
-                CREATE INDEX IF NOT EXISTS tweets_account_name_idx ON tweets(account_name);
             """)
             self.conn.commit()
 
-    def store_tweets(self, tweets, is_political_account=False):
-        """Store tweets in the database."""
+        self.backfill_metric_columns()
+        self.backfill_engagement_history()
+        self.backfill_current_engagement()
+
+    def migrate_to_partitioned(self):
+        """
+        Convert an unpartitioned tweets table into a monthly partitioned one.
+
+        The old table is renamed, its rows are copied into freshly created
+        monthly partitions and it is dropped, all in one transaction.
+        """
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass('tweets')")
+            row = cur.fetchone()
+            if row is None or row[0] != 'r':
+                self.conn.rollback()
+                return
+
+            self.logger.info("Migrating tweets table to monthly partitions")
+            cur.execute("""
+                ALTER TABLE tweets RENAME TO tweets_unpartitioned;
+                ALTER TABLE tweets_unpartitioned RENAME CONSTRAINT tweets_pkey
+                    TO tweets_unpartitioned_pkey;
+                ALTER INDEX IF EXISTS tweets_created_at_idx
+                    RENAME TO tweets_unpartitioned_created_at_idx;
+                ALTER INDEX IF EXISTS tweets_account_name_idx
+                    RENAME TO tweets_unpartitioned_account_name_idx;
+                ALTER TABLE tweets_unpartitioned
+                    ADD COLUMN IF NOT EXISTS retweet_count INTEGER,
+                    ADD COLUMN IF NOT EXISTS reply_count INTEGER,
+                    ADD COLUMN IF NOT EXISTS like_count INTEGER,
+                    ADD COLUMN IF NOT EXISTS quote_count INTEGER;
+            """)
+            cur.execute(self.TWEETS_TABLE_SQL)
+            cur.execute("""
+                SELECT DISTINCT date_trunc('month', created_at) FROM tweets_unpartitioned
+            """)
+            for (month,) in cur.fetchall():
+                self._create_partition(cur, month)
+
+            columns = ', '.join(self.TWEET_TABLE_COLUMNS)
+            cur.execute(f"""
+                INSERT INTO tweets ({columns})
+                SELECT {columns} FROM tweets_unpartitioned
+            """)
+            moved = cur.rowcount
+            cur.execute("DROP TABLE tweets_unpartitioned")
+        self.conn.commit()
+        self.logger.info(f"Moved {moved} tweets into monthly partitions")
+
+    @staticmethod
+    def partition_name(month):
+        """Name of the partition holding the month starting at ``month``."""
+        return f"tweets_p{month.year:04d}_{month.month:02d}"
+
+    def _create_partition(self, cur, month):
+        """Create the monthly partition starting at ``month`` if it is missing."""
+        name = self.partition_name(month)
+        upper = (month.replace(day=1) + timedelta(days=32)).replace(day=1)
+        cur.execute(f"""
+            CREATE TABLE IF NOT EXISTS {name} PARTITION OF tweets
+            FOR VALUES FROM (%s) TO (%s)
+        """, (month.strftime('%Y-%m-01'), upper.strftime('%Y-%m-01')))
+        self._known_partitions.add(name)
+
+    def ensure_partitions(self, created_ats):
+        """
+        Create any monthly partitions needed for the given timestamps.
+
+        Runs in its own short transaction, so partition DDL never holds
+        locks for the duration of a data batch. Months moved out by the
+        retention job are not recreated; timestamps before its recorded
+        ``archived_before`` are returned instead, for the caller to skip.
+
+        Returns:
+            Set of the given timestamps that fall into archived months
+        """
+        created_ats = list(created_ats)
+        archived = set()
+        with self.conn.cursor() as cur:
+            # Let the server truncate and compare, so months match the stored
+            # TIMESTAMP values
+            cur.execute("""
+                SELECT u.i, date_trunc('month', u.ts), u.ts < v.archived_before
+                FROM unnest(%s::TIMESTAMP[]) WITH ORDINALITY AS u(ts, i)
+                LEFT JOIN data_version v ON TRUE
+            """, (created_ats,))
+            months = set()
+            for index, month, is_archived in cur.fetchall():
+                if is_archived:
+                    archived.add(created_ats[index - 1])
+                elif month is not None:
+                    months.add(month)
+            months = {m for m in months if self.partition_name(m) not in self._known_partitions}
+            for month in sorted(months):
+                try:
+                    cur.execute("SAVEPOINT create_partition")
+                    self._create_partition(cur, month)
+                    cur.execute("RELEASE SAVEPOINT create_partition")
+                except psycopg2.errors.DuplicateTable:
+                    # Created concurrently by another writer
+                    cur.execute("ROLLBACK TO SAVEPOINT create_partition")
+                    self._known_partitions.add(self.partition_name(month))
+        self.conn.commit()
+        if months:
+            self.logger.info(f"Created partitions for {len(months)} new months")
+        return archived
+
+    def list_partitions(self):
+        """Return (name, month start) for every monthly tweets partition, oldest first."""
+        self.ensure_connection()
         with self.conn.cursor() as cur:
-            for tweet in tweets:
+            cur.execute("""
+                SELECT c.relname
+                FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = 'tweets'::regclass
+                ORDER BY c.relname
+            """)
+            names = [name for (name,) in cur.fetchall()]
+        self.conn.rollback()
+
+        partitions = []
+        for name in names:
+            try:
+                month = datetime.strptime(name, 'tweets_p%Y_%m')
+            except ValueError:
+                continue
+            partitions.append((name, month))
+        return partitions
+
+    def backfill_metric_columns(self, batch_size=None):
+        """Fill the typed engagement columns from metrics JSONB for older rows."""
+        batch_size = batch_size or self.batch_size * 10
+        total = 0
+        with self.conn.cursor() as cur:
+            while True:
+                cur.execute("""
+                    UPDATE tweets SET
+                        retweet_count = (metrics->>'retweet_count')::INTEGER,
+                        reply_count = (metrics->>'reply_count')::INTEGER,
+                        like_count = (metrics->>'like_count')::INTEGER,
+                        quote_count = (metrics->>'quote_count')::INTEGER
+                    WHERE id IN (
+                        SELECT id FROM tweets
+                        WHERE retweet_count IS NULL
+                          AND metrics->>'retweet_count' IS NOT NULL
+                        LIMIT %s
+                    )
+                """, (batch_size,))
+                updated = cur.rowcount
+                if updated:
+                    self.bump_data_version(cur)
+                self.conn.commit()
+                total += updated
+                if updated < batch_size:
+                    break
+        if total:
+            self.logger.info(f"Backfilled engagement columns for {total} tweets")
+        return total
+
+    def backfill_engagement_history(self):
+        """Record the stored engagement counts of tweets without any history rows."""
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                INSERT INTO tweet_engagement_history (
+                    tweet_id, snapshot_at, retweet_count, reply_count, like_count, quote_count
+                )
+                SELECT t.id, t.collected_at, t.retweet_count, t.reply_count,
+                       t.like_count, t.quote_count
+                FROM tweets t
+                WHERE num_nonnulls(t.retweet_count, t.reply_count,
+                                   t.like_count, t.quote_count) > 0
+                  AND NOT EXISTS (
+                      SELECT 1 FROM tweet_engagement_history h WHERE h.tweet_id = t.id
+                  )
+                ORDER BY t.collected_at
+                ON CONFLICT DO NOTHING
+            """)
+            inserted = cur.rowcount
+            if inserted:
+                self.bump_data_version(cur)
+        self.conn.commit()
+        if inserted:
+            self.logger.info(f"Backfilled engagement history for {inserted} tweets")
+        return inserted
+
+    def backfill_current_engagement(self):
+        """Fill tweet_engagement_current from the latest snapshot of tweets missing there."""
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                INSERT INTO tweet_engagement_current (
+                    tweet_id, snapshot_at, retweet_count, reply_count, like_count, quote_count
+                )
+                SELECT DISTINCT ON (h.tweet_id)
+                       h.tweet_id, h.snapshot_at, h.retweet_count, h.reply_count,
+                       h.like_count, h.quote_count
+                FROM tweet_engagement_history h
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM tweet_engagement_current c WHERE c.tweet_id = h.tweet_id
+                )
+                ORDER BY h.tweet_id, h.snapshot_at DESC
+                ON CONFLICT DO NOTHING
+            """)
+            inserted = cur.rowcount
+            if inserted:
+                self.bump_data_version(cur)
+        self.conn.commit()
+        if inserted:
+            self.logger.info(f"Backfilled current engagement counts for {inserted} tweets")
+        return inserted
+
+    @instrumentation.timed('db.store_tweets', rows=lambda result: result['stored'])
+    def store_tweets(self, tweets, is_political_account=False, batch_size=None):
+        """
+        Store tweets in the database using batched multi-row inserts.
+
+        Tweets are inserted once and never rewritten. Changed engagement
+        counts are appended to ``tweet_engagement_history`` and upserted
+        into the narrow ``tweet_engagement_current`` table instead. Each
+        batch is written with one ``execute_values`` statement per table
+        and committed on its own. If a batch fails, it is retried row by
+        row so that only the offending tweets are dropped.
+
+        Tweets created in a month the retention job has already archived
+        are skipped and logged, so re-collecting or backfilling them never
+        brings a dropped partition back. They are counted as ``archived``,
+        not as failures.
+
+        Args:
+            tweets: List of tweet dicts as produced by the collector
+            is_political_account: Whether the tweets come from tracked accounts
+            batch_size: Rows per batch, defaults to ``DEFAULT_BATCH_SIZE``
+
+        Returns:
+            Dictionary with the number of stored and archived rows and the
+            failed tweets
+        """
+        self.ensure_connection()
+        batch_size = batch_size or self.batch_size
+        result = {'stored': 0, 'archived': 0, 'failed': []}
+
+        try:
+            archived = self.ensure_partitions(
+                {tweet['created_at'] for tweet in tweets if tweet.get('created_at') is not None}
+            )
+        except Exception as e:
+            self.conn.rollback()
+            archived = set()
+            self.logger.error(f"Error creating tweet partitions: {str(e)}")
+
+        if archived:
+            kept = [tweet for tweet in tweets if tweet.get('created_at') not in archived]
+            result['archived'] = len(tweets) - len(kept)
+            self.logger.warning(
+                f"Skipped {result['archived']} tweets created in archived months, "
+                f"the oldest from {min(archived)}"
+            )
+            tweets = kept
+
+        for start in range(0, len(tweets), batch_size):
+            rows = []
+            # Later duplicates win, they carry the newest engagement counts
+            seen = {}
+            for tweet in tweets[start:start + batch_size]:
                 try:
-                    cur.execute("""
-                        INSERT INTO tweets (
-                            id, text, created_at, collected_at, 
-                            account_name, metrics, lang, is_political_account
-                        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                        ON CONFLICT (id) DO UPDATE SET
-                            metrics = EXCLUDED.metrics,
-                            collected_at = EXCLUDED.collected_at
-                    """, (
-                        tweet['id'],
-                        tweet['text'],
-                        tweet['created_at'],
-                        tweet['collected_at'],
-                        tweet.get('account', None),
-                        Json(tweet['metrics']),
-                        tweet.get('lang', 'de'),
-                        is_political_account
-                    ))
+                    row = self._tweet_row(tweet, is_political_account)
                 except Exception as e:
-                    self.logger.error(f"Error storing tweet {tweet['id']}: {str(e)}")
-                    self.conn.rollback()
+                    result['failed'].append({'id': tweet.get('id'), 'error': str(e)})
                     continue
+                if row[0] in seen:
+                    rows[seen[row[0]]] = row
+                else:
+                    seen[row[0]] = len(rows)
+                    rows.append(row)
+
+            if not rows:
+                continue
+
+            try:
+                with self.conn.cursor() as cur:
+                    inserted = self._insert_rows(cur, rows)
+                    self._record_engagement(cur, rows)
+                    self._refresh_rollups(cur, [row[0] for row in rows])
+                    self._run_store_hooks(cur, rows, inserted)
+                    self.bump_data_version(cur)
+                self.conn.commit()
+                result['stored'] += len(rows)
+                self._run_commit_hooks(rows, inserted)
+            except Exception as e:
+                self.conn.rollback()
+                self.logger.warning(
+                    f"Batch of {len(rows)} tweets failed, retrying row by row: {str(e)}"
+                )
+                stored, failed = self._store_rows_individually(rows)
+                result['stored'] += len(stored)
+                result['failed'].extend(failed)
+
+        for failure in result['failed']:
+            self.logger.error(f"Error storing tweet {failure['id']}: {failure['error']}")
+
+        return result
+
+    def bump_data_version(self, cur):
+        """Mark the stored data as changed within the caller's transaction."""
+        cur.execute("UPDATE data_version SET version = version + 1")
+
+    def get_data_version(self):
+        """
+        Return the change counter bumped by every committed write.
+
+        Reading it is a single-row lookup, unlike counting the tables.
+        """
+        self.ensure_connection()
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT version FROM data_version")
+            row = cur.fetchone()
+        self.conn.rollback()
+        return row[0] if row else None
+
+    def get_database_id(self):
+        """
+        Return the random identifier created with this database's tables.
+
+        Caches outside the database use it so that data of another database,
+        or of a schema selected through ``search_path``, is never reused.
+        """
+        if self._database_id is None:
+            self.ensure_connection()
+            with self.conn.cursor() as cur:
+                cur.execute("SELECT database_id FROM data_version")
+                row = cur.fetchone()
+            self.conn.rollback()
+            self._database_id = row[0] if row else None
+        return self._database_id
+
+    def _tweet_row(self, tweet, is_political_account):
+        """Convert a collector tweet dict into an insert tuple."""
+        return (
+            tweet['id'],
+            tweet['text'],
+            tweet['created_at'],
+            tweet['collected_at'],
+            tweet.get('account', None),
+            Json(tweet['metrics']),
+            tweet.get('lang', 'de'),
+            is_political_account,
+            *((tweet['metrics'] or {}).get(metric) for metric in self.METRIC_COLUMNS)
+        )
+
+    def add_store_hook(self, hook):
+        """
+        Register a callable run for newly inserted tweets.
+
+        The hook is called as ``hook(cur, tweets)`` inside the storing
+        transaction, with one dict per tweet that did not exist before;
+        updates of already stored tweets are not passed. A failing hook is
+        rolled back on its own and logged, the tweets are still stored.
+        """
+        self.store_hooks.append(hook)
+
+    def add_commit_hook(self, hook):
+        """
+        Register a callable run for newly inserted tweets once they are committed.
+
+        The hook is called as ``hook(tweets)`` with the same dicts as store
+        hooks, but only after the transaction committed, so in-memory state
+        never counts tweets that were rolled back or stored again on retry.
+        A failing hook is logged.
+        """
+        self.commit_hooks.append(hook)
+
+    def _row_dict(self, row):
+        """Convert an insert tuple back into a dict keyed by column name."""
+        tweet = dict(zip(self.TWEET_TABLE_COLUMNS, row))
+        tweet['metrics'] = tweet['metrics'].adapted if tweet['metrics'] is not None else None
+        return tweet
+
+    def _inserted_tweets(self, rows, inserted_ids):
+        inserted_ids = set(inserted_ids)
+        return [self._row_dict(row) for row in rows if row[0] in inserted_ids]
+
+    def _run_store_hooks(self, cur, rows, inserted_ids):
+        if not self.store_hooks or not inserted_ids:
+            return
+        tweets = self._inserted_tweets(rows, inserted_ids)
+        for hook in self.store_hooks:
+            try:
+                cur.execute("SAVEPOINT store_hook")
+                hook(cur, tweets)
+                cur.execute("RELEASE SAVEPOINT store_hook")
+            except Exception as e:
+                cur.execute("ROLLBACK TO SAVEPOINT store_hook")
+                self.logger.error(f"Store hook {getattr(hook, '__qualname__', hook)} failed: {str(e)}")
+
+    def _run_commit_hooks(self, rows, inserted_ids):
+        if not self.commit_hooks or not inserted_ids:
+            return
+        tweets = self._inserted_tweets(rows, inserted_ids)
+        for hook in self.commit_hooks:
+            try:
+                hook(tweets)
+            except Exception as e:
+                self.logger.error(f"Commit hook {getattr(hook, '__qualname__', hook)} failed: {str(e)}")
+
+    def _insert_rows(self, cur, rows):
+        """
+        Insert a list of tweet tuples with one multi-row statement.
+
+        Already stored tweets are left untouched.
+
+        Returns:
+            Ids of the rows that were inserted
+        """
+        result = execute_values(cur, """
+            INSERT INTO tweets (
+                id, text, created_at, collected_at,
+                account_name, metrics, lang, is_political_account,
+                retweet_count, reply_count, like_count, quote_count
+            ) VALUES %s
+            ON CONFLICT (id, created_at) DO NOTHING
+            RETURNING id
+        """, rows, page_size=len(rows), fetch=True)
+        return [tweet_id for (tweet_id,) in result]
+
+    def _record_engagement(self, cur, rows):
+        """
+        Record the engagement counts of every tweet whose counts changed.
+
+        A snapshot taken at the tweet's ``collected_at`` is appended to the
+        history and upserted into ``tweet_engagement_current``; the tweets
+        table is not written. Counts equal to the current ones are skipped,
+        so re-collecting quiet tweets writes nothing, and older collections
+        never overwrite newer current counts.
+        """
+        snapshots = [(row[0], row[3], *row[-len(self.METRIC_COLUMNS):]) for row in rows]
+        template = "(%s::BIGINT, %s::TIMESTAMP, %s::INTEGER, %s::INTEGER, %s::INTEGER, %s::INTEGER)"
+        execute_values(cur, """
+            INSERT INTO tweet_engagement_history (
+                tweet_id, snapshot_at, retweet_count, reply_count, like_count, quote_count
+            )
+            SELECT v.*
+            FROM (VALUES %s) AS v(tweet_id, snapshot_at, retweet_count, reply_count,
+                                  like_count, quote_count)
+            LEFT JOIN tweet_engagement_current c ON c.tweet_id = v.tweet_id
+            WHERE (v.retweet_count, v.reply_count, v.like_count, v.quote_count)
+                  IS DISTINCT FROM
+                  (c.retweet_count, c.reply_count, c.like_count, c.quote_count)
+            ON CONFLICT (tweet_id, snapshot_at) DO NOTHING
+        """, snapshots, template=template, page_size=len(snapshots))
+
+        # Rows are unique per tweet id, so no row is upserted twice
+        execute_values(cur, """
+            INSERT INTO tweet_engagement_current AS c (
+                tweet_id, snapshot_at, retweet_count, reply_count, like_count, quote_count
+            )
+            SELECT v.*
+            FROM (VALUES %s) AS v(tweet_id, snapshot_at, retweet_count, reply_count,
+                                  like_count, quote_count)
+            WHERE num_nonnulls(v.retweet_count, v.reply_count, v.like_count, v.quote_count) > 0
+            ON CONFLICT (tweet_id) DO UPDATE SET
+                snapshot_at = EXCLUDED.snapshot_at,
+                retweet_count = EXCLUDED.retweet_count,
+                reply_count = EXCLUDED.reply_count,
+                like_count = EXCLUDED.like_count,
+                quote_count = EXCLUDED.quote_count
+            WHERE EXCLUDED.snapshot_at > c.snapshot_at
+              AND (c.retweet_count, c.reply_count, c.like_count, c.quote_count)
+                  IS DISTINCT FROM
+                  (EXCLUDED.retweet_count, EXCLUDED.reply_count,
+                   EXCLUDED.like_count, EXCLUDED.quote_count)
+        """, snapshots, template=template, page_size=len(snapshots))
+
+    def _store_rows_individually(self, rows):
+        """Store rows one at a time, isolating failures with savepoints."""
+        stored, failed, inserted = [], [], []
+        try:
+            with self.conn.cursor() as cur:
+                for row in rows:
+                    try:
+                        cur.execute("SAVEPOINT store_row")
+                        new_ids = self._insert_rows(cur, [row])
+                        self._record_engagement(cur, [row])
+                        cur.execute("RELEASE SAVEPOINT store_row")
+                        inserted.extend(new_ids)
+                        stored.append(row[0])
+                    except Exception as e:
+                        cur.execute("ROLLBACK TO SAVEPOINT store_row")
+                        failed.append({'id': row[0], 'error': str(e)})
+                if stored:
+                    self._refresh_rollups(cur, stored)
+                    self._run_store_hooks(cur, rows, inserted)
+                    self.bump_data_version(cur)
             self.conn.commit()
+        except Exception as e:
+            # Leave the pooled connection usable and report the batch as lost
+            self.conn.rollback()
+            self.logger.error(f"Error storing tweets row by row: {str(e)}")
+            failed.extend({'id': tweet_id, 'error': str(e)} for tweet_id in stored)
+            return [], failed
+        self._run_commit_hooks(rows, inserted)
+        return stored, failed
+
+    # Recomputes the hourly rollup rows for every bucket touched by the given
+    # tweet ids, or for all buckets when ids is NULL
+    ROLLUP_REFRESH_SQL = """
+        INSERT INTO tweet_rollup_hourly (
+            bucket, account_name, is_political_account, tweet_count,
+            retweet_sum, reply_sum, like_sum, quote_sum
+        )
+        SELECT touched.bucket,
+               COALESCE(t.account_name, ''),
+               COALESCE(t.is_political_account, FALSE),
+               count(*),
+               COALESCE(sum(COALESCE(e.retweet_count, t.retweet_count)), 0),
+               COALESCE(sum(COALESCE(e.reply_count, t.reply_count)), 0),
+               COALESCE(sum(COALESCE(e.like_count, t.like_count)), 0),
+               COALESCE(sum(COALESCE(e.quote_count, t.quote_count)), 0)
+        FROM (
+            SELECT DISTINCT date_trunc('hour', created_at) AS bucket
+            FROM tweets
+            WHERE %(ids)s::BIGINT[] IS NULL OR id = ANY(%(ids)s::BIGINT[])
+        ) touched
+        JOIN tweets t
+          ON t.created_at >= touched.bucket
+         AND t.created_at < touched.bucket + INTERVAL '1 hour'
+        """ + CURRENT_ENGAGEMENT_JOIN + """
+        GROUP BY 1, 2, 3
+        ON CONFLICT (bucket, account_name, is_political_account) DO UPDATE SET
+            tweet_count = EXCLUDED.tweet_count,
+            retweet_sum = EXCLUDED.retweet_sum,
+            reply_sum = EXCLUDED.reply_sum,
+            like_sum = EXCLUDED.like_sum,
+            quote_sum = EXCLUDED.quote_sum
+    """
+
+    def _refresh_rollups(self, cur, tweet_ids):
+        """Recompute rollup buckets touched by the given tweets."""
+        cur.execute(self.ROLLUP_REFRESH_SQL, {'ids': list(tweet_ids)})
+
+    def rebuild_rollups(self):
+        """Recompute all rollup rows from the tweets table."""
+        self.ensure_connection()
+        with self.conn.cursor() as cur:
+            cur.execute(self.ROLLUP_REFRESH_SQL, {'ids': None})
+        self.conn.commit()
+
+    @instrumentation.timed('db.get_rollup', rows=len)
+    def get_rollup(self, granularity='day', by_account=False, start=None, end=None,
+                   accounts=None, is_political_account=None):
+        """
+        Read pre-aggregated tweet counts and engagement sums.
+
+        Args:
+            granularity: 'hour' or 'day'
+            by_account: Also group by account name
+            start: Only buckets at or after this time
+            end: Only buckets before this time
+            accounts: Only these account names
+            is_political_account: Only this political-account flag
+
+        Returns:
+            List of dicts with bucket, optional account_name, tweet_count and
+            retweet/reply/like/quote sums, ordered by bucket
+        """
+        if granularity not in ('hour', 'day'):
+            raise ValueError(f"Unsupported granularity: {granularity}")
+        self.ensure_connection()
+
+        conditions, params = [], [granularity]
+        if start is not None:
+            conditions.append("bucket >= %s")
+            params.append(start)
+        if end is not None:
+            conditions.append("bucket < %s")
+            params.append(end)
+        if accounts is not None:
+            conditions.append("account_name = ANY(%s)")
+            params.append(list(accounts))
+        if is_political_account is not None:
+            conditions.append("is_political_account = %s")
+            params.append(is_political_account)
+
+        select_columns = "date_trunc(%s, bucket) AS bucket" + (", account_name" if by_account else "")
+        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(f"""
+                SELECT {select_columns},
+                       sum(tweet_count)::BIGINT AS tweet_count,
+                       sum(retweet_sum)::BIGINT AS retweet_sum,
+                       sum(reply_sum)::BIGINT AS reply_sum,
+                       sum(like_sum)::BIGINT AS like_sum,
+                       sum(quote_sum)::BIGINT AS quote_sum
+                FROM tweet_rollup_hourly
+                {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+                GROUP BY {'1, 2' if by_account else '1'}
+                ORDER BY 1
+            """, params)
+            rows = [dict(row) for row in cur.fetchall()]
+        self.conn.rollback()
+        return rows
+
+    @instrumentation.timed('db.search_tweets', rows=len)
+    def search_tweets(self, query, start=None, end=None, accounts=None,
+                      is_political_account=None, limit=50, after=None):
+        """
+        Find tweets matching a German full-text query, best matches first.
+
+        The query uses web search syntax: ``Schuldenbremse Lindner`` needs
+        both words, ``"Olaf Scholz"`` a phrase, ``Ampel or Koalition`` either
+        word and ``-FDP`` excludes a word. Words are stemmed, so ``Rente``
+        also finds ``Renten``.
+
+        Results are paged by keyset: pass the ``rank`` and ``id`` of the last
+        row of a page as ``after`` to get the next one.
+
+        Args:
+            query: Search query
+            start: Only tweets created at or after this time
+            end: Only tweets created before this time
+            accounts: Only these account names
+            is_political_account: Only this political-account flag
+            limit: Maximum number of tweets returned
+            after: (rank, id) of the last tweet of the previous page
+
+        Returns:
+            List of dicts with the tweet columns, current engagement counts
+            and rank, ordered by rank and id, both descending
+        """
+        if not query or not query.strip():
+            raise ValueError("Search query must not be empty")
+        self.ensure_connection()
+
+        conditions, params = ["t.search_vector @@ q.query"], {
+            'query': query, 'limit': limit
+        }
+        if start is not None:
+            conditions.append("t.created_at >= %(start)s")
+            params['start'] = start
+        if end is not None:
+            conditions.append("t.created_at < %(end)s")
+            params['end'] = end
+        if accounts is not None:
+            conditions.append("t.account_name = ANY(%(accounts)s)")
+            params['accounts'] = list(accounts)
+        if is_political_account is not None:
+            conditions.append("t.is_political_account = %(is_political_account)s")
+            params['is_political_account'] = is_political_account
+        page_condition = ""
+        if after is not None:
+            # Compare as REAL, the type of the rank, so the boundary row is excluded exactly
+            page_condition = "WHERE (r.rank, r.id) < (%(after_rank)s::REAL, %(after_id)s)"
+            params['after_rank'], params['after_id'] = after
+
+        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(f"""
+                SELECT t.id, t.text, t.created_at, t.account_name, t.is_political_account,
+                       {', '.join(f"{self.TWEET_COLUMNS[m]} AS {m}" for m in self.METRIC_COLUMNS)},
+                       t.rank
+                FROM (
+                    SELECT r.* FROM (
+                        SELECT t.id, t.text, t.created_at, t.account_name,
+                               t.is_political_account, t.retweet_count, t.reply_count,
+                               t.like_count, t.quote_count,
+                               ts_rank_cd(t.search_vector, q.query) AS rank
+                        FROM tweets t,
+                             websearch_to_tsquery('german', %(query)s) AS q(query)
+                        WHERE {' AND '.join(conditions)}
+                    ) r
+                    {page_condition}
+                    ORDER BY r.rank DESC, r.id DESC
+                    LIMIT %(limit)s
+                ) t
+                {self.CURRENT_ENGAGEMENT_JOIN}
+                ORDER BY t.rank DESC, t.id DESC
+            """, params)
+            rows = [dict(row) for row in cur.fetchall()]
+        self.conn.rollback()
+        return rows
+
+    def get_engagement_history(self, tweet_id):
+        """Return the engagement snapshots of one tweet as dicts, oldest first."""
+        self.ensure_connection()
+        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("""
+                SELECT snapshot_at, retweet_count, reply_count, like_count, quote_count
+                FROM tweet_engagement_history
+                WHERE tweet_id = %s
+                ORDER BY snapshot_at
+            """, (tweet_id,))
+            rows = [dict(row) for row in cur.fetchall()]
+        self.conn.rollback()
+        return rows
+
+    @instrumentation.timed('db.get_engagement_velocity', rows=len)
+    def get_engagement_velocity(self, metric='like_count', start=None, end=None,
+                                accounts=None, limit=50):
+        """
+        Rank tweets by how fast they gathered engagement.
+
+        The latest counts come from tweet_engagement_current and the
+        snapshot before them from the history, both through primary keys,
+        so the query does not touch the tweets heap beyond the filtered rows.
+
+        Args:
+            metric: One of METRIC_COLUMNS
+            start: Only tweets created at or after this time
+            end: Only tweets created before this time
+            accounts: Only these account names
+            limit: Maximum number of tweets returned
+
+        Returns:
+            List of dicts with id, account_name, created_at, the latest
+            snapshot_at and value, ``per_hour`` since posting and
+            ``recent_per_hour`` between the last two snapshots (None after
+            a single snapshot), fastest first
+        """
+        if metric not in self.METRIC_COLUMNS:
+            raise ValueError(f"Unknown engagement metric: {metric}")
+        self.ensure_connection()
+
+        conditions, params = [], {'limit': limit}
+        if start is not None:
+            conditions.append("t.created_at >= %(start)s")
+            params['start'] = start
+        if end is not None:
+            conditions.append("t.created_at < %(end)s")
+            params['end'] = end
+        if accounts is not None:
+            conditions.append("t.account_name = ANY(%(accounts)s)")
+            params['accounts'] = list(accounts)
+
+        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(f"""
+                SELECT t.id, t.account_name, t.created_at, e.snapshot_at, e.value,
+                       e.value / GREATEST(
+                           extract(EPOCH FROM e.snapshot_at - t.created_at) / 3600, 1.0 / 60
+                       ) AS per_hour,
+                       (e.value - p.value) / NULLIF(
+                           extract(EPOCH FROM e.snapshot_at - p.snapshot_at) / 3600, 0
+                       ) AS recent_per_hour
+                FROM tweets t
+                JOIN (
+                    SELECT tweet_id, snapshot_at, {metric} AS value
+                    FROM tweet_engagement_current
+                ) e ON e.tweet_id = t.id
+                LEFT JOIN LATERAL (
+                    SELECT snapshot_at, {metric} AS value
+                    FROM tweet_engagement_history
+                    WHERE tweet_id = t.id AND snapshot_at < e.snapshot_at
+                    ORDER BY snapshot_at DESC
+                    LIMIT 1
+                ) p ON TRUE
+                WHERE e.value IS NOT NULL
+                {'AND ' + ' AND '.join(conditions) if conditions else ''}
+                ORDER BY per_hour DESC
+                LIMIT %(limit)s
+            """, params)
+            rows = [dict(row) for row in cur.fetchall()]
+        self.conn.rollback()
+        for row in rows:
+            row['per_hour'] = float(row['per_hour'])
+            if row['recent_per_hour'] is not None:
+                row['recent_per_hour'] = float(row['recent_per_hour'])
+        return rows
+
+    @instrumentation.timed('db.get_metric_histograms')
+    def get_metric_histograms(self, start=None, end=None):
+        """
+        Count tweets per power-of-two bin of every engagement metric.
+
+        Bin 0 holds zero values and bin ``k`` values in ``[2**(k-1), 2**k)``,
+        which keeps heavy-tailed counts readable with a handful of rows.
+
+        Args:
+            start: Only tweets created at or after this time
+            end: Only tweets created before this time
+
+        Returns:
+            Dict mapping each metric to a dict of bin -> tweet count
+        """
+        self.ensure_connection()
+        conditions, params = [], []
+        if start is not None:
+            conditions.append("t.created_at >= %s")
+            params.append(start)
+        if end is not None:
+            conditions.append("t.created_at < %s")
+            params.append(end)
+
+        values = ', '.join(f"('{m}', {self.TWEET_COLUMNS[m]})" for m in self.METRIC_COLUMNS)
+        with self.conn.cursor() as cur:
+            cur.execute(f"""
+                SELECT m.metric,
+                       CASE WHEN m.value <= 0 THEN 0
+                            ELSE floor(log(2, m.value::NUMERIC))::INTEGER + 1 END AS bin,
+                       count(*)
+                FROM tweets t
+                {self.CURRENT_ENGAGEMENT_JOIN}
+                CROSS JOIN LATERAL (VALUES {values}) AS m(metric, value)
+                WHERE m.value IS NOT NULL
+                {'AND ' + ' AND '.join(conditions) if conditions else ''}
+                GROUP BY 1, 2
+            """, params)
+            rows = cur.fetchall()
+        self.conn.rollback()
+
+        histograms = {metric: {} for metric in self.METRIC_COLUMNS}
+        for metric, bin_index, count in rows:
+            histograms[metric][bin_index] = count
+        return histograms
+
+    @instrumentation.timed('db.get_sentiment_histogram')
+    def get_sentiment_histogram(self, model_version, bins=40):
+        """
+        Count tweets per equal-width sentiment bin over [-1, 1].
+
+        Only scores of ``model_version`` are counted, tweets without one are
+        left out rather than filled with another scorer's score.
+
+        Returns:
+            List of ``bins`` counts, lowest scores first
+        """
+        self.ensure_connection()
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                SELECT LEAST(width_bucket(score, -1, 1, %(bins)s), %(bins)s) AS bin, count(*)
+                FROM tweet_sentiment
+                WHERE model_version = %(version)s
+                GROUP BY 1
+            """, {'bins': bins, 'version': model_version})
+            rows = cur.fetchall()
+        self.conn.rollback()
+
+        counts = [0] * bins
+        for bin_index, count in rows:
+            counts[min(max(bin_index, 1), bins) - 1] += count
+        return counts
+
+    def add_keyword_counts(self, cur, matches):
+        """
+        Add keyword matches to the hourly keyword counters.
+
+        Args:
+            cur: Cursor of the caller's transaction
+            matches: (created_at, keyword) pairs, one per tweet and keyword
+        """
+        if not matches:
+            return
+        execute_values(cur, """
+            INSERT INTO keyword_hourly_counts (bucket, keyword, tweet_count)
+            SELECT date_trunc('hour', v.created_at::TIMESTAMP), v.keyword, count(*)
+            FROM (VALUES %s) AS v(created_at, keyword)
+            GROUP BY 1, 2
+            ON CONFLICT (bucket, keyword) DO UPDATE SET
+                tweet_count = keyword_hourly_counts.tweet_count + EXCLUDED.tweet_count
+        """, matches, page_size=len(matches))
+
+    def clear_keyword_counts(self, cur):
+        """Remove all hourly keyword counters inside the caller's transaction."""
+        cur.execute("TRUNCATE keyword_hourly_counts")
+
+    @instrumentation.timed('db.get_keyword_window_counts', rows=len)
+    def get_keyword_window_counts(self, window_hours, baseline_hours, now=None):
+        """
+        Sum keyword counts over a recent window and the baseline before it.
+
+        The window covers the ``window_hours`` hours up to and including the
+        hour of ``now`` (the database's local time if omitted), the baseline
+        the ``baseline_hours`` hours before that.
+
+        Returns:
+            List of (keyword, window count, baseline count) tuples
+        """
+        self.ensure_connection()
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                WITH bounds AS (
+                    SELECT date_trunc('hour', COALESCE(%(now)s::TIMESTAMP, localtimestamp))
+                           + interval '1 hour' AS window_end
+                ), windows AS (
+                    SELECT window_end,
+                           window_end - %(window)s * interval '1 hour' AS window_start,
+                           window_end - (%(window)s + %(baseline)s) * interval '1 hour'
+                               AS baseline_start
+                    FROM bounds
+                )
+                SELECT k.keyword,
+                       coalesce(sum(k.tweet_count) FILTER (WHERE k.bucket >= w.window_start), 0),
+                       coalesce(sum(k.tweet_count) FILTER (WHERE k.bucket < w.window_start), 0)
+                FROM keyword_hourly_counts k, windows w
+                WHERE k.bucket >= w.baseline_start AND k.bucket < w.window_end
+                GROUP BY k.keyword
+            """, {'now': now, 'window': window_hours, 'baseline': baseline_hours})
+            rows = cur.fetchall()
+        self.conn.rollback()
+        return rows
+
+    @instrumentation.timed('db.store_sentiment_scores')
+    def store_sentiment_scores(self, scores, model_version):
+        """
+        Persist sentiment scores for a scorer version in bulk.
+
+        Args:
+            scores: Iterable of (tweet_id, score) pairs
+            model_version: Version tag of the scorer that produced them
+        """
+        self.ensure_connection()
+        rows = [(int(tweet_id), float(score), model_version) for tweet_id, score in scores]
+        if not rows:
+            return 0
+        try:
+            with self.conn.cursor() as cur:
+                execute_values(cur, """
+                    INSERT INTO tweet_sentiment (tweet_id, score, model_version)
+                    VALUES %s
+                    ON CONFLICT (tweet_id, model_version) DO UPDATE SET
+                        score = EXCLUDED.score,
+                        scored_at = now()
+                """, rows, page_size=self.batch_size)
+                self.bump_data_version(cur)
+            self.conn.commit()
+            return len(rows)
+        except Exception as e:
+            self.conn.rollback()
+            self.logger.error(f"Error storing sentiment scores: {str(e)}")
+            raise
+
+    def get_unscored_tweets(self, model_version, limit=1000, after_id=None):
+        """
+        Return (id, text) of tweets without a score for the given version.
+
+        Rows come in id order. Pass the last id of a page as ``after_id`` to
+        continue after it, so paging through the table scans it only once.
+        """
+        self.ensure_connection()
+        condition, params = "", [model_version]
+        if after_id is not None:
+            condition = "AND t.id > %s"
+            params.append(after_id)
+        params.append(limit)
+        with self.conn.cursor() as cur:
+            cur.execute(f"""
+                SELECT t.id, t.text
+                FROM tweets t
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM tweet_sentiment s
+                    WHERE s.tweet_id = t.id AND s.model_version = %s
+                )
+                {condition}
+                ORDER BY t.id
+                LIMIT %s
+            """, params)
+            rows = cur.fetchall()
+        self.conn.rollback()
+        return rows
+
+    def has_stale_sentiment(self, model_version):
+        """Check whether any tweet lacks a score of the given scorer version."""
+        self.ensure_connection()
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                SELECT EXISTS (
+                    SELECT 1 FROM tweets t
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM tweet_sentiment s
+                        WHERE s.tweet_id = t.id AND s.model_version = %s
+                    )
+                )
+            """, (model_version,))
+            stale = cur.fetchone()[0]
+        self.conn.rollback()
+        return stale
+
+    def delete_stale_sentiment(self, model_version, superseded=None, unused_since=None):
+        """
+        Remove scores of scorer versions that are no longer in use.
+
+        Several processes may use different backends against one database,
+        so other versions are only deleted when named explicitly or when no
+        score of theirs was written since ``unused_since``.
+
+        Args:
+            model_version: Version of the caller, never deleted
+            superseded: Versions to delete regardless of their age
+            unused_since: Also delete versions not written to since this time
+
+        Returns:
+            Number of deleted scores
+        """
+        superseded = [v for v in (superseded or []) if v != model_version]
+        if not superseded and unused_since is None:
+            return 0
+        self.ensure_connection()
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                DELETE FROM tweet_sentiment
+                WHERE model_version = ANY(%(superseded)s)
+                   OR model_version IN (
+                       SELECT model_version FROM tweet_sentiment
+                       WHERE %(unused_since)s::TIMESTAMP IS NOT NULL
+                         AND model_version <> %(current)s
+                       GROUP BY model_version
+                       HAVING max(scored_at) < %(unused_since)s::TIMESTAMP
+                   )
+            """, {'superseded': superseded, 'unused_since': unused_since,
+                  'current': model_version})
+            deleted = cur.rowcount
+            if deleted:
+                self.bump_data_version(cur)
+        self.conn.commit()
+        return deleted
+
+    def stream_tweets(self, columns=None, start=None, end=None, accounts=None,
+                      is_political_account=None, sentiment_version=None,
+                      chunk_size=None, collected_after=None, scored_after=None,
+                      distinct_text=False):
+        """
+        Stream tweets in fixed-size chunks through a server-side cursor.
+
+        The query runs on its own pooled connection, so the handler's
+        connection stays free for writes while the stream is consumed.
+
+        Args:
+            columns: Names from TWEET_COLUMNS to select, defaults to all
+            start: Only tweets created at or after this time
+            end: Only tweets created before this time
+            accounts: Only tweets from these account names
+            is_political_account: Only tweets with this political-account flag
+            sentiment_version: Scorer version of the sentiment column, tweets
+                without a score of this version get None
+            chunk_size: Rows per yielded chunk
+            collected_after: Only tweets collected, or with engagement
+                counts changed, after this time
+            scored_after: Only tweets with a sentiment score written after
+                this time; combined with ``collected_after`` either one matches
+            distinct_text: Keep only the newest tweet of every exact text
+
+        Yields:
+            Lists of row tuples in the order of ``columns``
+        """
+        columns = list(columns or self.TWEET_COLUMNS)
+        unknown = set(columns) - set(self.TWEET_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown tweet columns: {sorted(unknown)}")
+        chunk_size = chunk_size or self.DEFAULT_STREAM_CHUNK_SIZE
+
+        conditions, params = [], []
+        if start is not None:
+            conditions.append("t.created_at >= %s")
+            params.append(start)
+        if end is not None:
+            conditions.append("t.created_at < %s")
+            params.append(end)
+        if accounts is not None:
+            conditions.append("t.account_name = ANY(%s)")
+            params.append(list(accounts))
+        if is_political_account is not None:
+            conditions.append("t.is_political_account = %s")
+            params.append(is_political_account)
+        changed = []
+        if collected_after is not None:
+            # Re-collected tweets count once their engagement changed, found via the BRIN index
+            changed.append("""t.collected_at > %s OR t.id IN (
+                SELECT tweet_id FROM tweet_engagement_history WHERE snapshot_at > %s
+            )""")
+            params.extend([collected_after, collected_after])
+        if scored_after is not None:
+            changed.append("""t.id IN (
+                SELECT tweet_id FROM tweet_sentiment WHERE scored_at > %s AND model_version = %s
+            )""")
+            params.extend([scored_after, sentiment_version])
+        if changed:
+            conditions.append(f"({' OR '.join(changed)})")
+
+        sentiment_join = ""
+        if {'sentiment', 'scored_at'}.intersection(columns) or scored_after is not None:
+            if sentiment_version is None:
+                raise ValueError("A sentiment_version is needed to read sentiment")
+        if {'sentiment', 'scored_at'}.intersection(columns):
+            # Only scores of the requested version, never another scorer's
+            sentiment_join = """
+                LEFT JOIN tweet_sentiment s
+                  ON s.tweet_id = t.id AND s.model_version = %s
+            """
+            params.insert(0, sentiment_version)
+
+        engagement_join = ""
+        if self.ENGAGEMENT_COLUMNS.intersection(columns):
+            engagement_join = self.CURRENT_ENGAGEMENT_JOIN
+
+        query = f"""
+            SELECT {', '.join(self.TWEET_COLUMNS[c] for c in columns)}
+            FROM tweets t
+            {sentiment_join}
+            {engagement_join}
+            {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+            ORDER BY t.created_at DESC
+        """
+        if distinct_text:
+            # Deduplicate in one pass over the table, then restore the stream order
+            query = f"""
+                SELECT {', '.join(columns)} FROM (
+                    SELECT DISTINCT ON (t.text)
+                           {', '.join(f"{self.TWEET_COLUMNS[c]} AS {c}" for c in columns)},
+                           t.created_at AS stream_order
+                    FROM tweets t
+                    {sentiment_join}
+                    {engagement_join}
+                    {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+                    ORDER BY t.text, t.created_at DESC
+                ) d
+                ORDER BY d.stream_order DESC
+            """
+
+        with self.pool.connection() as conn:
+            with conn.cursor(name=f"tweet_stream_{uuid.uuid4().hex}") as cur:
+                cur.itersize = chunk_size
+                cur.execute(query, params)
+                while True:
+                    with instrumentation.span('db.stream_tweets') as span:
+                        rows = cur.fetchmany(chunk_size)
+                        span.rows = len(rows)
+                    if not rows:
+                        break
+                    yield rows
+
+    def get_user_ids(self, usernames):
+        """Return cached Twitter user ids for the given usernames."""
+        self.ensure_connection()
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                SELECT username, user_id FROM twitter_users
+                WHERE lower(username) = ANY(%s)
+            """, ([u.lower() for u in usernames],))
+            rows = cur.fetchall()
+        self.conn.rollback()
+        return {username: user_id for username, user_id in rows}
+
+    def store_user_ids(self, user_ids):
+        """Persist a username-to-id mapping."""
+        self.ensure_connection()
+        if not user_ids:
+            return
+        with self.conn.cursor() as cur:
+            execute_values(cur, """
+                INSERT INTO twitter_users (username, user_id) VALUES %s
+                ON CONFLICT (username) DO UPDATE SET
+                    user_id = EXCLUDED.user_id,
+                    resolved_at = now()
+            """, list(user_ids.items()))
+        self.conn.commit()
+
+    def get_checkpoints(self, sources):
+        """Return stored collection checkpoints keyed by source."""
+        self.ensure_connection()
+        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("""
+                SELECT source, since_id, pending_newest_id, next_token
+                FROM collection_checkpoints
+                WHERE source = ANY(%s)
+            """, (list(sources),))
+            rows = cur.fetchall()
+        self.conn.rollback()
+        return {row.pop('source'): dict(row) for row in rows}
+
+    def save_checkpoints(self, checkpoints):
+        """Upsert collection checkpoints given as a source-to-checkpoint dict."""
+        self.ensure_connection()
+        rows = [
+            (source, cp.get('since_id'), cp.get('pending_newest_id'), cp.get('next_token'))
+            for source, cp in checkpoints.items()
+        ]
+        if not rows:
+            return
+        with self.conn.cursor() as cur:
+            execute_values(cur, """
+                INSERT INTO collection_checkpoints (
+                    source, since_id, pending_newest_id, next_token
+                ) VALUES %s
+                ON CONFLICT (source) DO UPDATE SET
+                    since_id = EXCLUDED.since_id,
+                    pending_newest_id = EXCLUDED.pending_newest_id,
+                    next_token = EXCLUDED.next_token,
+                    updated_at = now()
+            """, rows)
+        self.conn.commit()
 
     def get_recent_tweets(self, limit=100):
         """Retrieve recent tweets from database"""
+        self.ensure_connection()
         with self.conn.cursor() as cur:
             cur.execute("""
                 SELECT id, text, created_at, account_name, metrics
@@ -88,9 +1412,10 @@ class DatabaseHandler:
             return cur.fetchall()
 
     def close(self):
-        """Safely close database connection."""
-        if self.conn:
-            self.conn.close()
+        """Return the connection to the shared pool."""
+        if self.conn is not None:
+            self.pool.putconn(self.conn, close=bool(self.conn.closed))
+            self.conn = None
 
     def __enter__(self):
         return self
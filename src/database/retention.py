@@ -0,0 +1,165 @@
+import os
+import gzip
+import logging
+import argparse
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from src.database.db_handler import DatabaseHandler
+
+
+class PartitionArchiver:
+    """
+    Moves old monthly tweet partitions out of the database.
+
+    Every partition older than the retention window is detached from the
+    tweets table, exported to a gzip compressed CSV file and dropped together
+    with its sentiment scores. Hourly rollups are kept, so volume charts
+    still cover the archived months. The end of the newest archived month
+    is recorded as ``data_version.archived_before``; store_tweets skips
+    tweets older than that instead of recreating their partition.
+    """
+
+    DEFAULT_RETENTION_MONTHS = 12
+    DEFAULT_ARCHIVE_DIR = 'archive'
+
+    def __init__(self, db: DatabaseHandler = None, retention_months: int = None,
+                 archive_dir: str = None):
+        """
+        Args:
+            db: Handler to use, a pooled one is opened if omitted
+            retention_months: Number of recent months to keep in the database
+            archive_dir: Directory receiving the exported partitions
+        """
+        self.logger = logging.getLogger(__name__)
+        self._own_db = db is None
+        self.db = db or DatabaseHandler()
+        config = self.db.config
+        self.retention_months = (retention_months or config.get('retention_months')
+                                 or self.DEFAULT_RETENTION_MONTHS)
+        self.archive_dir = archive_dir or config.get('archive_dir') or self.DEFAULT_ARCHIVE_DIR
+
+    def cutoff(self, now: datetime = None) -> datetime:
+        """First day of the oldest month that is kept."""
+        now = now or datetime.now()
+        index = now.year * 12 + now.month - 1 - (self.retention_months - 1)
+        return datetime(index // 12, index % 12 + 1, 1)
+
+    def expired_partitions(self, now: datetime = None) -> List[str]:
+        """Names of the partitions that lie entirely before the cutoff."""
+        cutoff = self.cutoff(now)
+        return [name for name, month in self.db.list_partitions() if month < cutoff]
+
+    def archive_partition(self, name: str) -> Dict:
+        """
+        Export one partition to ``<archive_dir>/<name>.csv.gz`` and drop it.
+
+        The partition is detached, exported and dropped in one transaction,
+        so a failed export leaves it attached and untouched.
+
+        Returns:
+            Dictionary with the partition name, archive path and row count
+        """
+        os.makedirs(self.archive_dir, exist_ok=True)
+        path = os.path.join(self.archive_dir, f"{name}.csv.gz")
+        tmp_path = f"{path}.tmp"
+        self.db.ensure_connection()
+        conn = self.db.conn
+        try:
+            with conn.cursor() as cur:
+                cur.execute(f"ALTER TABLE tweets DETACH PARTITION {name}")
+                with gzip.open(tmp_path, 'wt', encoding='utf-8', newline='') as f:
+                    # The search vector is derived from the text, no need to archive
+                    # it; engagement columns get the current counts
+                    columns = ', '.join(
+                        DatabaseHandler.TWEET_COLUMNS[c]
+                        if c in DatabaseHandler.ENGAGEMENT_COLUMNS else f"t.{c}"
+                        for c in DatabaseHandler.TWEET_TABLE_COLUMNS
+                    )
+                    cur.copy_expert(
+                        f"COPY (SELECT {columns} FROM {name} t "
+                        f"{DatabaseHandler.CURRENT_ENGAGEMENT_JOIN} ORDER BY t.created_at) "
+                        f"TO STDOUT WITH (FORMAT csv, HEADER true)", f
+                    )
+                cur.execute(f"SELECT count(*) FROM {name}")
+                rows = cur.fetchone()[0]
+                cur.execute(f"""
+                    DELETE FROM tweet_sentiment s
+                    USING {name} t
+                    WHERE s.tweet_id = t.id
+                """)
+                cur.execute(f"""
+                    DELETE FROM tweet_engagement_history h
+                    USING {name} t
+                    WHERE h.tweet_id = t.id
+                """)
+                cur.execute(f"""
+                    DELETE FROM tweet_engagement_current c
+                    USING {name} t
+                    WHERE c.tweet_id = t.id
+                """)
+                cur.execute(f"DROP TABLE {name}")
+                month = datetime.strptime(name, 'tweets_p%Y_%m')
+                cur.execute("""
+                    UPDATE data_version
+                    SET archived_before = GREATEST(archived_before, %s)
+                """, ((month + timedelta(days=32)).replace(day=1),))
+                self.db.bump_data_version(cur)
+            os.replace(tmp_path, path)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            self.logger.error(f"Error archiving partition {name}: {str(e)}")
+            raise
+
+        self.db._known_partitions.discard(name)
+        self.logger.info(f"Archived {rows} tweets from {name} to {path}")
+        return {'partition': name, 'path': path, 'rows': rows}
+
+    def run(self, now: datetime = None, dry_run: bool = False) -> List[Dict]:
+        """
+        Archive every expired partition, oldest first.
+
+        Args:
+            now: Reference time for the retention window
+            dry_run: Only report the partitions that would be archived
+
+        Returns:
+            One dictionary per archived partition
+        """
+        expired = self.expired_partitions(now)
+        if dry_run:
+            return [{'partition': name, 'path': None, 'rows': None} for name in expired]
+        return [self.archive_partition(name) for name in expired]
+
+    def close(self) -> None:
+        if self._own_db:
+            self.db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive old monthly tweet partitions")
+    parser.add_argument('--retention-months', type=int, default=None,
+                        help="Number of recent months to keep in the database")
+    parser.add_argument('--archive-dir', default=None,
+                        help="Directory receiving the compressed partition exports")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Only list the partitions that would be archived")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    archiver = PartitionArchiver(retention_months=args.retention_months,
+                                 archive_dir=args.archive_dir)
+    try:
+        for result in archiver.run(dry_run=args.dry_run):
+            print(f"{result['partition']}: {result['rows']} rows -> {result['path']}")
+    except Exception as e:
+        print(f"Error archiving partitions: {str(e)}")
+    finally:
+        archiver.close()
+
+
+if __name__ == "__main__":
+    main()
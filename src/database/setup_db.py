@@ -4,6 +4,7 @@ def setup_database():
     try:
         with DatabaseHandler() as db:
             db.init_tables()
+            db.rebuild_rollups()
             print("Database tables created successfully")
     except Exception as e:
         print(f"Error setting up database: {str(e)}")
@@ -0,0 +1,254 @@
+import os
+import json
+import time
+import logging
+import resource
+import threading
+import functools
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from src.config.config_loader import load_config
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = 'social_media_analyzer'
+
+
+class SpanStats:
+    """Aggregated measurements of every run of one named span."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+        self.max_rss_bytes = 0
+
+    def as_dict(self) -> Dict:
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'seconds': round(self.seconds, 6),
+            'max_seconds': round(self.max_seconds, 6),
+            'rows': self.rows,
+            'rows_per_second': round(self.rows / self.seconds, 1) if self.seconds else None,
+            'max_rss_bytes': self.max_rss_bytes,
+        }
+
+
+class Span:
+    """A running measurement, set ``rows`` to report the rows it processed."""
+
+    def __init__(self, recorder: 'Recorder', name: str, rows: int = None):
+        self.recorder = recorder
+        self.name = name
+        self.rows = rows
+
+    def __enter__(self) -> 'Span':
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
+        self.recorder.record(self.name, time.perf_counter() - self._started,
+                             self.rows, failed=exc_type is not None)
+        return False
+
+
+class _NoopSpan:
+    """Stand-in returned while instrumentation is off, accepts and drops ``rows``."""
+
+    rows = None
+
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
+        return False
+
+    def __setattr__(self, name, value) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Recorder:
+    """Thread-safe collector of span timings and counters for one run."""
+
+    def __init__(self, report_path: str = None, prometheus_path: str = None):
+        self.report_path = report_path
+        self.prometheus_path = prometheus_path
+        self.started_at = datetime.now()
+        self.spans = {}
+        # (name, label tuple) -> value
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float, rows: int = None, failed: bool = False) -> None:
+        # ru_maxrss is reported in kilobytes on Linux
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        with self._lock:
+            stats = self.spans.get(name)
+            if stats is None:
+                stats = self.spans[name] = SpanStats(name)
+            stats.calls += 1
+            stats.errors += int(failed)
+            stats.seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.rows += rows or 0
+            stats.max_rss_bytes = max(stats.max_rss_bytes, max_rss)
+
+    def increment(self, name: str, value: float = 1, **labels) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def report(self) -> Dict:
+        """Run report with per-span statistics and counters."""
+        with self._lock:
+            return {
+                'started_at': self.started_at.isoformat(),
+                'finished_at': datetime.now().isoformat(),
+                'max_rss_bytes': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+                'spans': {name: stats.as_dict() for name, stats in sorted(self.spans.items())},
+                'counters': [
+                    {'name': name, 'labels': dict(labels), 'value': round(value, 4)}
+                    for (name, labels), value in sorted(self.counters.items())
+                ],
+            }
+
+    def prometheus(self) -> str:
+        """Render spans and counters in the Prometheus text exposition format."""
+        report = self.report()
+        span_metrics = [
+            ('span_seconds_total', 'counter', 'Wall time spent in the span', 'seconds'),
+            ('span_calls_total', 'counter', 'Number of span runs', 'calls'),
+            ('span_errors_total', 'counter', 'Number of span runs that raised', 'errors'),
+            ('span_rows_total', 'counter', 'Rows processed inside the span', 'rows'),
+            ('span_max_seconds', 'gauge', 'Longest single span run', 'max_seconds'),
+            ('span_max_rss_bytes', 'gauge',
+             'Process peak resident memory when the span ended', 'max_rss_bytes'),
+        ]
+        lines = []
+        for metric, kind, help_text, key in span_metrics:
+            lines.append(f"# HELP {METRIC_PREFIX}_{metric} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{metric} {kind}")
+            for name, stats in report['spans'].items():
+                lines.append(f'{METRIC_PREFIX}_{metric}{{span="{name}"}} {stats[key]}')
+
+        counter_names = sorted({c['name'] for c in report['counters']})
+        for name in counter_names:
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} counter")
+            for counter in report['counters']:
+                if counter['name'] != name:
+                    continue
+                labels = ','.join(f'{k}="{v}"' for k, v in counter['labels'].items())
+                lines.append(f"{METRIC_PREFIX}_{name}{{{labels}}} {counter['value']}")
+        return '\n'.join(lines) + '\n'
+
+    def write(self) -> None:
+        """Write the JSON report and Prometheus file to their configured paths."""
+        if self.report_path:
+            _write_atomic(self.report_path, json.dumps(self.report(), indent=2))
+        if self.prometheus_path:
+            _write_atomic(self.prometheus_path, self.prometheus())
+
+
+def _write_atomic(path: str, content: str) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+# The active recorder, None while instrumentation is off
+_recorder: Optional[Recorder] = None
+
+
+def enable(report_path: str = None, prometheus_path: str = None) -> Recorder:
+    """Start recording spans for this process, replacing any active recorder."""
+    global _recorder
+    _recorder = Recorder(report_path, prometheus_path)
+    return _recorder
+
+
+def enable_from_config() -> Optional[Recorder]:
+    """Enable instrumentation if the ``instrumentation`` config section asks for it."""
+    config = load_config().get('instrumentation', {})
+    if not config.get('enabled', False):
+        return None
+    return enable(config.get('report_path'), config.get('prometheus_path'))
+
+
+def disable() -> None:
+    global _recorder
+    _recorder = None
+
+
+def finish() -> Optional[Dict]:
+    """
+    Write the outputs of the active recorder and stop recording.
+
+    Returns:
+        The run report, None if instrumentation was off
+    """
+    recorder = _recorder
+    if recorder is None:
+        return None
+    disable()
+    try:
+        recorder.write()
+    except OSError as e:
+        logger.error(f"Error writing instrumentation report: {str(e)}")
+    return recorder.report()
+
+
+def span(name: str, rows: int = None):
+    """
+    Measure a block of code.
+
+    Usage::
+
+        with span('db.store_tweets') as s:
+            ...
+            s.rows = stored
+
+    Returns a shared no-op object while instrumentation is off.
+    """
+    recorder = _recorder
+    if recorder is None:
+        return _NOOP_SPAN
+    return Span(recorder, name, rows)
+
+
+def increment(name: str, value: float = 1, **labels) -> None:
+    """Add to a labelled counter, ignored while instrumentation is off."""
+    recorder = _recorder
+    if recorder is not None:
+        recorder.increment(name, value, **labels)
+
+
+def timed(name: str, rows: Callable = None):
+    """
+    Decorator measuring every call of a function as a span.
+
+    Args:
+        name: Span name
+        rows: Optional function mapping the return value to a row count
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            recorder = _recorder
+            if recorder is None:
+                return func(*args, **kwargs)
+            with Span(recorder, name) as s:
+                result = func(*args, **kwargs)
+                if rows is not None:
+                    s.rows = rows(result)
+                return result
+        return wrapper
+    return decorator
@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from src.config import config_loader
+
+
+@pytest.fixture
+def config_file(tmp_path, monkeypatch):
+    path = tmp_path / 'config.json'
+    path.write_text(json.dumps({
+        'database': {'host': 'localhost', 'port': 5432, 'password': 'secret',
+                     'pool_checkout_timeout': 30},
+        'analysis': {'compact_schema': True, 'sentiment_workers': None,
+                     'plots': {'formats': ['png']}},
+    }))
+    monkeypatch.setenv(config_loader.CONFIG_PATH_ENV, str(path))
+    config_loader.reload_config()
+    yield path
+    config_loader.reload_config()
+
+
+@pytest.mark.parametrize('password', ['null', 'true', '123', '{"a": 1}', 'p@ss'])
+def test_string_values_stay_strings(config_file, monkeypatch, password):
+    monkeypatch.setenv('SMA_DATABASE_PASSWORD', password)
+    config_loader.reload_config()
+    assert config_loader.get_database_config()['password'] == password
+
+
+def test_numbers_and_booleans_keep_their_type(config_file, monkeypatch):
+    monkeypatch.setenv('SMA_DATABASE_PORT', '6543')
+    monkeypatch.setenv('SMA_DATABASE_POOL_CHECKOUT_TIMEOUT', '2.5')
+    monkeypatch.setenv('SMA_ANALYSIS_COMPACT_SCHEMA', 'false')
+    monkeypatch.setenv('SMA_ANALYSIS_SENTIMENT_WORKERS', '4')
+    monkeypatch.setenv('SMA_ANALYSIS_PLOTS', '{"formats": ["svg"]}')
+    config_loader.reload_config()
+    database = config_loader.get_database_config()
+    analysis = config_loader.get_analysis_config()
+    assert database['port'] == 6543
+    assert database['pool_checkout_timeout'] == 2.5
+    assert analysis['compact_schema'] is False
+    assert analysis['sentiment_workers'] == 4
+    assert analysis['plots'] == {'formats': ['svg']}
+
+
+def test_invalid_boolean_is_rejected(config_file, monkeypatch):
+    monkeypatch.setenv('SMA_ANALYSIS_COMPACT_SCHEMA', 'maybe')
+    config_loader.reload_config()
+    with pytest.raises(ValueError, match='SMA_ANALYSIS_COMPACT_SCHEMA'):
+        config_loader.load_config()
+
+
+def test_callers_get_independent_copies(config_file):
+    config_loader.get_database_config()['host'] = 'changed'
+    assert config_loader.get_database_config()['host'] == 'localhost'
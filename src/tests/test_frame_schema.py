@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from src.data_processing.frame_schema import apply_compact_schema, memory_report
+
+
+def frame():
+    return pd.DataFrame({
+        'id': [1, 2, 3],
+        'account_name': ['spdde', 'cdu', 'spdde'],
+        'created_at': ['2024-01-01 10:00', '2024-01-02 11:00', '2024-01-03 12:00'],
+        'retweet_count': [200, 250, 3],
+        'like_count': [100, 250, 3_000_000_000],
+        'reply_count': [1.0, None, 2.0],
+        'sentiment': [0.1, 0.2, 1 / 3],
+    })
+
+
+def test_counts_are_signed_and_wide_enough_for_arithmetic():
+    df = apply_compact_schema(frame())
+    assert df['retweet_count'].dtype == np.int32
+    assert df['like_count'].dtype == np.int64
+    assert str(df['reply_count'].dtype) == 'Int32'
+    # Small counts must not wrap when added or subtracted
+    assert (df['retweet_count'] + df['retweet_count']).tolist() == [400, 500, 6]
+    assert (df['retweet_count'].iloc[2] - df['retweet_count'].iloc[0]) == -197
+
+
+def test_sentiment_keeps_full_precision():
+    original = frame()
+    df = apply_compact_schema(original)
+    assert df['sentiment'].dtype == np.float64
+    assert df['sentiment'].mean() == original['sentiment'].mean()
+
+
+def test_categories_and_timestamps():
+    df = apply_compact_schema(frame())
+    assert isinstance(df['account_name'].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_any_dtype(df['created_at'])
+
+
+def test_memory_report_has_total_row():
+    original = frame()
+    report = memory_report(original, apply_compact_schema(original))
+    assert report.loc['total', 'bytes_before'] == original.memory_usage(deep=True,
+                                                                         index=False).sum()
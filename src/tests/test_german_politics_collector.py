@@ -0,0 +1,187 @@
+from types import SimpleNamespace
+
+import pytest
+import tweepy
+
+from src.data_collection import german_politics_collector, rate_limiter
+from src.data_collection.german_politics_collector import GermanPoliticsCollector
+
+
+class FakeClock:
+    """Stands in for the time module, sleeping advances the clock."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return 1_700_000_000 + self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeResponse:
+    """HTTP response of a rejected request, as tweepy sees it."""
+
+    reason = 'Too Many Requests'
+    status_code = 429
+    text = ''
+
+    def __init__(self, headers):
+        self.headers = headers
+
+    def json(self):
+        return {}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, 'time', clock)
+    monkeypatch.setattr(german_politics_collector, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def collector(monkeypatch, clock):
+    monkeypatch.setattr(german_politics_collector, 'get_twitter_config', lambda: {
+        'bearer_token': 'token', 'api_key': 'key', 'api_secret': 'secret',
+        'access_token': 'access', 'access_token_secret': 'access-secret',
+    })
+    collector = GermanPoliticsCollector(max_pages=10)
+    assert collector.client.wait_on_rate_limit is False
+    return collector
+
+
+def rate_limited(reset_in, clock):
+    reset = str(int(clock.time() + reset_in))
+    return tweepy.TooManyRequests(FakeResponse({'x-rate-limit-reset': reset}))
+
+
+def test_request_waits_for_the_reported_reset_and_retries(collector, clock):
+    calls = []
+
+    def method(**kwargs):
+        calls.append(clock.now)
+        if len(calls) == 1:
+            raise rate_limited(120, clock)
+        return SimpleNamespace(data=[1, 2], meta={})
+
+    response = collector._request('search_recent_tweets', method, query='x')
+    assert response.data == [1, 2]
+    # Retried once the reset time (plus a second of slack) has passed
+    assert calls[1] >= 120
+    assert collector.rate_limiter.wait_seconds['search_recent_tweets'] >= 120
+
+
+def test_request_gives_up_after_repeated_429(collector, clock):
+    def method(**kwargs):
+        raise rate_limited(10, clock)
+
+    with pytest.raises(tweepy.TooManyRequests):
+        collector._request('get_users', method)
+    assert len(clock.sleeps) == GermanPoliticsCollector.MAX_RATE_LIMIT_RETRIES
+
+
+class FakeEndpoint:
+    """Search endpoint serving scripted pages, an exception instead of a page is raised."""
+
+    def __init__(self, *pages):
+        self.pages = list(pages)
+        self.calls = []
+
+    def __call__(self, **kwargs):
+        self.calls.append(kwargs)
+        page = self.pages.pop(0)
+        if isinstance(page, Exception):
+            raise page
+        return page
+
+
+def page(ids, next_token=None, newest_id=None):
+    meta = {}
+    if next_token:
+        meta['next_token'] = next_token
+    if newest_id:
+        meta['newest_id'] = str(newest_id)
+    tweets = [SimpleNamespace(id=i, text=f'tweet {i}', created_at=None, public_metrics={})
+              for i in ids]
+    return SimpleNamespace(data=tweets, meta=meta)
+
+
+def bad_request():
+    response = FakeResponse({})
+    response.reason, response.status_code = 'Bad Request', 400
+    return tweepy.BadRequest(response)
+
+
+def paginate(collector, endpoint, max_pages=10):
+    pages = collector._paginate(endpoint, 'search_recent_tweets', 'search', 'next_token',
+                                max_pages, query='x')
+    return [[tweet['id'] for tweet in tweets] for tweets in pages]
+
+
+def test_since_id_advances_only_after_the_last_page(collector):
+    collector._checkpoints['search'] = {'since_id': 5, 'pending_newest_id': None,
+                                        'next_token': None}
+    endpoint = FakeEndpoint(page([30, 20], 'b', newest_id=30), page([10]))
+
+    assert paginate(collector, endpoint, max_pages=1) == [[30, 20]]
+    assert endpoint.calls == [{'query': 'x', 'since_id': 5}]
+    # Older tweets are still unread, so since_id stays put
+    assert collector._pending_checkpoints['search'] == {
+        'since_id': 5, 'pending_newest_id': 30, 'next_token': 'b'
+    }
+
+    assert paginate(collector, endpoint) == [[10]]
+    assert endpoint.calls[1] == {'query': 'x', 'since_id': 5, 'next_token': 'b'}
+    assert collector._pending_checkpoints['search'] == {
+        'since_id': 30, 'pending_newest_id': None, 'next_token': None
+    }
+
+
+def test_resumes_from_a_committed_pagination_token(collector):
+    collector._checkpoints['search'] = {'since_id': 5, 'pending_newest_id': 30,
+                                        'next_token': 'b'}
+    # A resumed pass must not take its newest id from the later pages
+    endpoint = FakeEndpoint(page([10], 'c', newest_id=10), page([8]))
+
+    assert paginate(collector, endpoint) == [[10], [8]]
+    assert endpoint.calls[0] == {'query': 'x', 'since_id': 5, 'next_token': 'b'}
+    assert endpoint.calls[1]['next_token'] == 'c'
+    assert collector._pending_checkpoints['search'] == {
+        'since_id': 30, 'pending_newest_id': None, 'next_token': None
+    }
+
+
+def test_error_mid_pass_keeps_the_last_token(collector):
+    endpoint = FakeEndpoint(page([30, 20], 'b', newest_id=30), tweepy.TweepyException('down'))
+
+    assert paginate(collector, endpoint) == [[30, 20]]
+    assert collector._pending_checkpoints['search'] == {
+        'since_id': None, 'pending_newest_id': 30, 'next_token': 'b'
+    }
+
+
+def test_error_on_the_first_page_leaves_the_checkpoint_alone(collector):
+    collector._checkpoints['search'] = {'since_id': 5, 'pending_newest_id': None,
+                                        'next_token': None}
+
+    assert paginate(collector, FakeEndpoint(tweepy.TweepyException('down'))) == []
+    assert 'search' not in collector._pending_checkpoints
+
+
+def test_bad_request_resets_the_checkpoint(collector):
+    collector._checkpoints['search'] = {'since_id': 5, 'pending_newest_id': 30,
+                                        'next_token': 'expired'}
+    endpoint = FakeEndpoint(bad_request())
+
+    assert paginate(collector, endpoint) == []
+    assert collector._pending_checkpoints['search'] == {
+        'since_id': None, 'pending_newest_id': None, 'next_token': None
+    }
@@ -0,0 +1,86 @@
+from src.data_collection.ingestion_pipeline import IngestionPipeline
+
+
+class FakeDb:
+    """Records stored tweets and fails the ids it is told to."""
+
+    batch_size = 2
+
+    def __init__(self, failing_ids=()):
+        self.failing_ids = set(failing_ids)
+        self.stored = []
+
+    def store_tweets(self, tweets, is_political_account=False, batch_size=None):
+        result = {'stored': 0, 'failed': []}
+        for tweet in tweets:
+            if tweet['id'] in self.failing_ids:
+                result['failed'].append({'id': tweet['id'], 'error': 'boom'})
+            else:
+                self.stored.append((tweet['id'], is_political_account))
+                result['stored'] += 1
+        return result
+
+
+def pages(*ids_per_page):
+    return [[{'id': tweet_id} for tweet_id in ids] for ids in ids_per_page]
+
+
+def failing_pages():
+    yield [{'id': 1}]
+    raise RuntimeError("API down")
+
+
+def run_pipeline(db, sources):
+    pipeline = IngestionPipeline(db=db, queue_size=2, flush_interval=0.05)
+    flushed = []
+    for name, source_pages, flag in sources:
+        pipeline.add_source(name, source_pages, flag,
+                            on_flushed=lambda db, name=name: flushed.append(name))
+    return pipeline.run(), flushed
+
+
+def test_stores_every_page_and_advances_checkpoints():
+    db = FakeDb()
+    stats, flushed = run_pipeline(db, [
+        ('search', pages([1, 2], [3]), False),
+        ('accounts', pages([10], [11, 12]), True),
+    ])
+    assert sorted(db.stored) == [(1, False), (2, False), (3, False),
+                                 (10, True), (11, True), (12, True)]
+    assert sorted(flushed) == ['accounts', 'search']
+    assert stats['writer']['items'] == 6
+    assert stats['writer']['failed'] == 0
+
+
+def test_store_failure_holds_back_only_that_sources_checkpoint():
+    db = FakeDb(failing_ids={11})
+    stats, flushed = run_pipeline(db, [
+        ('search', pages([1, 2], [3]), False),
+        ('accounts', pages([10], [11, 12]), True),
+    ])
+    assert flushed == ['search']
+    assert stats['accounts']['failed'] == 1
+    assert stats['search']['failed'] == 0
+    assert stats['writer']['failed'] == 1
+    assert (12, True) in db.stored
+
+
+def test_failure_of_shared_tweet_is_charged_to_every_source():
+    db = FakeDb(failing_ids={5})
+    stats, flushed = run_pipeline(db, [
+        ('search', pages([5]), True),
+        ('accounts', pages([5, 6]), True),
+    ])
+    assert flushed == []
+    assert stats['search']['failed'] >= 1
+    assert stats['accounts']['failed'] >= 1
+
+
+def test_failed_producer_keeps_its_checkpoint_but_stores_its_tweets():
+    db = FakeDb()
+    stats, flushed = run_pipeline(db, [
+        ('search', failing_pages(), False),
+        ('accounts', pages([10]), True),
+    ])
+    assert flushed == ['accounts']
+    assert (1, False) in db.stored
@@ -0,0 +1,134 @@
+import json
+
+import pytest
+
+from src.monitoring import instrumentation
+
+
+class FakeClock:
+    """Stands in for the time module, ``tick`` advances perf_counter."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def perf_counter(self):
+        return self.now
+
+    def tick(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(instrumentation, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def recorder(tmp_path):
+    recorder = instrumentation.enable(str(tmp_path / 'report.json'),
+                                      str(tmp_path / 'metrics.prom'))
+    yield recorder
+    instrumentation.disable()
+
+
+def test_nested_spans_are_timed_separately(recorder, clock):
+    with instrumentation.span('outer') as outer:
+        clock.tick(1.0)
+        for _ in range(2):
+            with instrumentation.span('inner', rows=10):
+                clock.tick(0.25)
+        outer.rows = 20
+
+    spans = recorder.report()['spans']
+    assert spans['outer']['calls'] == 1
+    # The outer span includes the time of the spans inside it
+    assert spans['outer']['seconds'] == pytest.approx(1.5)
+    assert spans['outer']['rows_per_second'] == pytest.approx(20 / 1.5, abs=0.1)
+    assert spans['inner']['calls'] == 2
+    assert spans['inner']['seconds'] == pytest.approx(0.5)
+    assert spans['inner']['max_seconds'] == pytest.approx(0.25)
+    assert spans['inner']['rows'] == 20
+
+
+def test_failed_span_is_counted_and_reraised(recorder, clock):
+    with pytest.raises(RuntimeError):
+        with instrumentation.span('load'):
+            clock.tick(2.0)
+            raise RuntimeError("boom")
+    stats = recorder.report()['spans']['load']
+    assert (stats['calls'], stats['errors']) == (1, 1)
+    assert stats['seconds'] == pytest.approx(2.0)
+
+
+def test_timed_decorator_counts_rows(recorder, clock):
+    @instrumentation.timed('fetch', rows=len)
+    def fetch(n):
+        clock.tick(0.5)
+        return list(range(n))
+
+    assert fetch(3) == [0, 1, 2]
+    fetch(4)
+    stats = recorder.report()['spans']['fetch']
+    assert (stats['calls'], stats['rows']) == (2, 7)
+    assert stats['seconds'] == pytest.approx(1.0)
+
+
+def test_counters_add_up_per_label_set(recorder):
+    instrumentation.increment('tweets_stored_total', 3, source='search')
+    instrumentation.increment('tweets_stored_total', 2, source='search')
+    instrumentation.increment('tweets_stored_total', source='accounts')
+    assert recorder.report()['counters'] == [
+        {'name': 'tweets_stored_total', 'labels': {'source': 'accounts'}, 'value': 1},
+        {'name': 'tweets_stored_total', 'labels': {'source': 'search'}, 'value': 5},
+    ]
+
+
+def test_disabled_instrumentation_is_a_no_op(clock):
+    instrumentation.disable()
+    with instrumentation.span('ignored') as s:
+        s.rows = 5
+    assert s.rows is None
+    instrumentation.increment('ignored_total')
+
+    calls = []
+
+    @instrumentation.timed('ignored', rows=len)
+    def work():
+        calls.append(1)
+        return [1]
+
+    assert work() == [1] and calls == [1]
+    assert instrumentation.finish() is None
+
+
+def test_prometheus_text_format(recorder, clock):
+    with instrumentation.span('db.store_tweets', rows=4):
+        clock.tick(0.5)
+    instrumentation.increment('api_requests_total', endpoint='get_users')
+
+    lines = recorder.prometheus().splitlines()
+    prefix = instrumentation.METRIC_PREFIX
+    assert f'# TYPE {prefix}_span_seconds_total counter' in lines
+    assert f'# TYPE {prefix}_span_max_seconds gauge' in lines
+    assert f'{prefix}_span_seconds_total{{span="db.store_tweets"}} 0.5' in lines
+    assert f'{prefix}_span_rows_total{{span="db.store_tweets"}} 4' in lines
+    assert f'# TYPE {prefix}_api_requests_total counter' in lines
+    assert f'{prefix}_api_requests_total{{endpoint="get_users"}} 1' in lines
+    # Every sample line is "name{labels} value" with a numeric value
+    for line in lines:
+        if not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            assert name.startswith(prefix) and name.endswith('}')
+            float(value)
+
+
+def test_finish_writes_the_outputs_and_stops_recording(recorder, clock, tmp_path):
+    with instrumentation.span('run'):
+        clock.tick(1.0)
+    report = instrumentation.finish()
+    assert report['spans']['run']['calls'] == 1
+    assert json.loads((tmp_path / 'report.json').read_text())['spans']['run']['calls'] == 1
+    assert 'span="run"' in (tmp_path / 'metrics.prom').read_text()
+    assert instrumentation.span('run') is instrumentation._NOOP_SPAN
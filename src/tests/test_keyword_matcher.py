@@ -0,0 +1,51 @@
+import pytest
+
+from src.analysis.keyword_matcher import KeywordMatcher
+from src.analysis.trending import TrendingEngine
+
+
+@pytest.fixture
+def matcher():
+    return KeywordMatcher({
+        'SPD': ['SPD', '#SPD'],
+        'Bundestagswahl': ['Bundestagswahl', '#btw25', 'Wahl'],
+        'Scholz': ['Olaf Scholz', 'Scholz'],
+    })
+
+
+def test_matches_whole_words_case_insensitively(matcher):
+    assert matcher.match_topics('Die spd und #SPD-Fraktion') == ['SPD']
+    assert matcher.match_topics('Die SPDler feiern') == []
+    assert matcher.match_topics('Wahlkampf beginnt') == []
+
+
+def test_overlapping_aliases_and_suffix_matches(matcher):
+    # "Wahl" is a suffix of "Bundestagswahl" and only matches as a whole word
+    assert matcher.match_topics('Bundestagswahl 2025') == ['Bundestagswahl']
+    assert matcher.match_topics('Olaf Scholz zur #btw25') == ['Bundestagswahl', 'Scholz']
+
+
+def test_failure_links_find_keywords_after_partial_matches():
+    matcher = KeywordMatcher(['abcd', 'bc'])
+    assert matcher.match_topics('abc bc') == ['bc']
+    assert matcher.match_topics('x abcd') == ['abcd']
+
+
+def test_plain_keyword_list_and_empty_text():
+    matcher = KeywordMatcher(['Merz', 'Baerbock'])
+    assert matcher.topics == ['Baerbock', 'Merz']
+    assert matcher.match('') == set()
+    assert matcher.match_topics('MERZ!') == ['Merz']
+
+
+def test_umlauts_and_punctuation_boundaries():
+    matcher = KeywordMatcher({'Grüne': ['Grüne', 'Die Grünen']})
+    assert matcher.match_topics('„Grüne“ wollen mehr') == ['Grüne']
+    assert matcher.match_topics('Grünen-Chef') == []
+
+
+def test_trending_engine_matches_each_topic_once_per_tweet():
+    engine = TrendingEngine(keywords={'SPD': ['SPD', '#SPD']})
+    matches = engine.match([{'text': 'SPD #SPD SPD', 'created_at': 1},
+                            {'text': 'nichts', 'created_at': 2}])
+    assert matches == [(1, 'SPD')]
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from src.data_processing.near_duplicates import NearDuplicateDetector
+
+TWEET = "Die Bundesregierung hat heute den Haushalt für das kommende Jahr beschlossen, " \
+        "nach langen Verhandlungen in der Koalition"
+
+
+@pytest.fixture
+def detector():
+    return NearDuplicateDetector(threshold=0.8, num_perm=64)
+
+
+def test_retweets_and_url_variants_are_duplicates(detector):
+    flags = detector.find_duplicates([
+        TWEET,
+        f"RT @spdde: {TWEET}",
+        f"{TWEET} https://t.co/abc123",
+        "Ein völlig anderer Tweet über das Wetter in Berlin",
+    ], ids=[1, 2, 3, 4])
+    assert flags.tolist() == [False, True, True, False]
+    assert len(detector) == 2
+
+
+def test_signatures_are_deterministic_and_batch_independent(detector):
+    texts = [TWEET, "kurz", "", "Noch ein Tweet"]
+    batch = detector.signatures(texts)
+    single = np.vstack([detector.signatures([text]) for text in texts])
+    np.testing.assert_array_equal(batch, single)
+    np.testing.assert_array_equal(batch, NearDuplicateDetector(num_perm=64).signatures(texts))
+
+
+def test_indexed_ids_are_never_flagged(detector):
+    detector.find_duplicates([TWEET], ids=[1])
+    assert detector.find_duplicates([TWEET, TWEET], ids=[1, 2]).tolist() == [False, True]
+
+
+def test_dry_run_leaves_index_unchanged(detector):
+    detector.find_duplicates([TWEET], ids=[1])
+    flags = detector.find_duplicates(["Neuer Text hier", "Neuer Text hier"], ids=[2, 3],
+                                     update=False)
+    assert flags.tolist() == [False, True]
+    assert detector.ids == [1]
+    assert not detector.find_duplicates(["Neuer Text hier"], ids=[4], update=False)[0]
+
+
+def test_save_and_load_round_trip(detector, tmp_path):
+    detector.find_duplicates([TWEET, "Ein anderer Tweet"], ids=[1, 2])
+    path = str(tmp_path / 'index.npz')
+    detector.save(path)
+    loaded = NearDuplicateDetector.load(path, threshold=0.8, num_perm=64)
+    assert loaded.ids == [1, 2]
+    assert loaded.find_duplicates([f"RT @x: {TWEET}"], ids=[3]).tolist() == [True]
+    with pytest.raises(ValueError):
+        NearDuplicateDetector.load(path, threshold=0.5, num_perm=64)
+
+
+def test_num_perm_must_split_into_bands():
+    with pytest.raises(ValueError):
+        NearDuplicateDetector(num_perm=64, bands=5)
@@ -0,0 +1,35 @@
+import math
+
+import numpy as np
+import pytest
+
+from src.analysis.plot_renderer import log2_bin_edges, log2_histogram
+
+
+def sql_log2_bin(value):
+    """The bin DatabaseHandler.get_metric_histograms computes in SQL."""
+    return 0 if value <= 0 else math.floor(math.log2(value)) + 1
+
+
+@pytest.mark.parametrize('value, expected', [
+    (0, 0), (-1.0, 0), (1, 1), (2, 2), (3, 2), (4, 3), (7, 3), (8, 4), (2 ** 40, 41),
+])
+def test_log2_bins_match_sql(value, expected):
+    assert sql_log2_bin(value) == expected
+    assert log2_histogram([value]) == {expected: 1}
+
+
+def test_log2_histogram_counts_and_skips_missing():
+    values = [0, 1, 2, 3, 4, 5, -1.0, np.nan, 1000]
+    expected = {}
+    for value in values:
+        if not np.isnan(value):
+            expected[sql_log2_bin(value)] = expected.get(sql_log2_bin(value), 0) + 1
+    assert log2_histogram(values) == expected
+    assert log2_histogram([]) == {}
+
+
+def test_log2_bin_edges():
+    edges, counts = log2_bin_edges({0: 2, 1: 1, 3: 4})
+    assert edges.tolist() == [0, 1, 2, 4]
+    assert counts.tolist() == [2, 1, 0, 4]
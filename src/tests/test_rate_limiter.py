@@ -0,0 +1,101 @@
+import threading
+
+import pytest
+
+from src.data_collection import rate_limiter
+from src.data_collection.rate_limiter import RateLimitScheduler, TokenBucket
+
+
+class FakeClock:
+    """Stands in for the time module, sleeping advances the clock."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+        self._lock = threading.Lock()
+
+    def monotonic(self):
+        with self._lock:
+            return self.now
+
+    def sleep(self, seconds):
+        with self._lock:
+            self.sleeps.append(seconds)
+            self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, 'time', clock)
+    return clock
+
+
+def test_burst_up_to_capacity_without_waiting(clock):
+    bucket = TokenBucket(capacity=3, refill_per_second=1.0)
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert clock.sleeps == []
+
+
+def test_waits_for_refill_when_empty(clock):
+    bucket = TokenBucket(capacity=2, refill_per_second=0.5)
+    bucket.acquire(2)
+    assert bucket.acquire() == pytest.approx(2.0)
+    assert clock.now == pytest.approx(2.0)
+
+
+def test_refill_never_exceeds_capacity(clock):
+    bucket = TokenBucket(capacity=2, refill_per_second=1.0)
+    bucket.acquire(2)
+    clock.now += 100
+    assert bucket.acquire(2) == 0.0
+    assert bucket.acquire() == pytest.approx(1.0)
+
+
+def test_concurrent_acquires_never_overdraw(clock):
+    bucket = TokenBucket(capacity=5, refill_per_second=1.0)
+    threads = [threading.Thread(target=bucket.acquire) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # 5 from the initial burst, the remaining 15 need 15 seconds of refill
+    assert clock.now >= 15.0 - 1e-9
+
+
+def test_scheduler_shares_buckets_and_tracks_waits(clock):
+    scheduler = RateLimitScheduler({'get_users_tweets': (2, 10)})
+    assert scheduler.acquire('get_users_tweets') == 0.0
+    assert scheduler.acquire('get_users_tweets') == 0.0
+    assert scheduler.acquire('get_users_tweets') == pytest.approx(5.0)
+    assert scheduler.wait_seconds['get_users_tweets'] == pytest.approx(5.0)
+    assert scheduler.acquire('unknown_endpoint') == 0.0
+
+
+def test_pause_blocks_until_reset_then_restores_quota(clock):
+    bucket = TokenBucket(capacity=3, refill_per_second=0.01)
+    bucket.acquire()
+    bucket.pause(60)
+    assert bucket.acquire() == pytest.approx(60.0)
+    # The whole quota is back after the reset
+    assert [bucket.acquire() for _ in range(2)] == [0.0, 0.0]
+
+
+def test_defer_pauses_every_worker_of_the_endpoint(clock):
+    scheduler = RateLimitScheduler({'search_recent_tweets': (450, 900)})
+    scheduler.defer('search_recent_tweets', 30)
+    passed_at = []
+
+    def worker():
+        scheduler.acquire('search_recent_tweets')
+        passed_at.append(clock.monotonic())
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(passed_at) == 4 and min(passed_at) >= 30.0
+    scheduler.defer('unknown_endpoint')
+    scheduler.defer('search_recent_tweets')
+    assert scheduler.acquire('search_recent_tweets') == pytest.approx(900.0, abs=30.0)
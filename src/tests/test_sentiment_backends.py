@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from src.data_processing.sentiment_backends import (
+    GermanLexiconBackend, TextBlobBackend, get_sentiment_backend, load_sentiws
+)
+
+
+@pytest.fixture
+def backend():
+    return GermanLexiconBackend(lexicon={'gut': 0.5, 'schlecht': -0.8, 'krise': -0.4})
+
+
+def test_scores_mean_weight_of_lexicon_hits(backend):
+    scores = backend.score_batch(['Das ist gut.', 'Schlecht, eine Krise!', 'Heute ist Montag'])
+    np.testing.assert_allclose(scores, [0.5, -0.6, 0.0])
+
+
+def test_negator_within_window_flips_hit(backend):
+    scores = backend.score_batch(['nicht gut', 'nicht so richtig wirklich gut'])
+    # The second hit is four tokens after the negator, outside the default window
+    np.testing.assert_allclose(scores, [-0.5, 0.5])
+
+
+def test_negation_does_not_cross_documents(backend):
+    scores = backend.score_batch(['Das war es nicht', 'gut'])
+    np.testing.assert_allclose(scores, [0.0, 0.5])
+
+
+def test_batch_scores_match_single_scores(backend):
+    texts = ['gut gut schlecht', '', 'keine Krise', '„Gut“ – sagt er', 'nichts']
+    batch = backend.score_batch(texts)
+    single = [backend.score_batch([text])[0] for text in texts]
+    np.testing.assert_allclose(batch, single)
+
+
+def test_empty_batch(backend):
+    assert len(backend.score_batch([])) == 0
+
+
+def test_version_depends_on_lexicon():
+    a = GermanLexiconBackend(lexicon={'gut': 0.5})
+    b = GermanLexiconBackend(lexicon={'gut': 0.5})
+    c = GermanLexiconBackend(lexicon={'gut': 0.6})
+    assert a.version == b.version != c.version
+    assert a.version.startswith('german-lexicon-')
+
+
+def test_load_sentiws_includes_inflections(tmp_path):
+    path = tmp_path / 'SentiWS_Positive.txt'
+    path.write_text('Erfolg|NN\t0.5\tErfolge,Erfolgen\nGut|ADJX\t0.37\t\n', encoding='utf-8')
+    assert load_sentiws([str(path)]) == {
+        'erfolg': 0.5, 'erfolge': 0.5, 'erfolgen': 0.5, 'gut': 0.37
+    }
+
+
+def test_get_sentiment_backend():
+    assert isinstance(get_sentiment_backend('textblob'), TextBlobBackend)
+    with pytest.raises(ValueError):
+        get_sentiment_backend('unknown')
@@ -0,0 +1,57 @@
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_processing.sentiment_backends import GermanLexiconBackend
+from src.data_processing.sentiment_engine import ParallelSentimentScorer
+
+BACKEND = GermanLexiconBackend(lexicon={'gut': 0.5, 'schlecht': -0.8, 'krise': -0.4})
+
+
+def score_texts(texts):
+    """Module-level so worker processes can unpickle it; missing texts score as empty."""
+    return BACKEND.score_batch(['' if pd.isna(text) else text for text in texts])
+
+
+@pytest.fixture
+def texts():
+    vocabulary = ['gut', 'schlecht', 'Krise', 'nicht gut', 'keine Krise', 'Montag',
+                  'gut gut schlecht', 'sehr gut', 'schlecht und gut', 'Hallo']
+    rng = np.random.default_rng(0)
+    texts = [vocabulary[i] for i in rng.integers(0, len(vocabulary), 60)]
+    texts[5] = texts[17] = ''
+    texts[9] = np.nan
+    texts[30] = None
+    return texts
+
+
+def serial_scores(texts):
+    return np.array([score_texts([text])[0] for text in texts])
+
+
+def test_parallel_chunks_match_serial_scores(monkeypatch, caplog, texts):
+    monkeypatch.setattr(ParallelSentimentScorer, 'MIN_PARALLEL_TEXTS', 1)
+    scorer = ParallelSentimentScorer(score_texts, workers=2, chunk_size=3)
+    with caplog.at_level(logging.INFO, logger='src.data_processing.sentiment_engine'):
+        scores = scorer.score(texts)
+    assert 'on 2 processes' in caplog.text
+    np.testing.assert_allclose(scores, serial_scores(texts))
+
+
+def test_each_distinct_text_is_scored_once(texts):
+    scored = []
+
+    def score_chunk(chunk):
+        scored.extend(chunk)
+        return score_texts(chunk)
+
+    scores = ParallelSentimentScorer(score_chunk, workers=1, chunk_size=3).score(texts)
+    np.testing.assert_allclose(scores, serial_scores(texts))
+    # NaN and None are one missing value, '' stays a separate text
+    assert len(scored) == len(pd.unique(pd.Series(texts, dtype=object).fillna('<na>')))
+
+
+def test_empty_input():
+    assert len(ParallelSentimentScorer(score_texts, workers=2).score([])) == 0
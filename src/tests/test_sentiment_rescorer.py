@@ -0,0 +1,61 @@
+import pytest
+
+from src.analysis import sentiment_rescorer
+from src.analysis.sentiment_rescorer import SentimentRescorer
+from src.data_processing.data_transformer import DataTransformer
+
+
+class FakeDb:
+    """Keeps scores per version and pages unscored tweets like the database."""
+
+    def __init__(self, texts):
+        self.texts = texts
+        self.scores = {}
+        self.pages = []
+        self.deleted = []
+
+    def __call__(self, pool=None):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def get_unscored_tweets(self, model_version, limit=1000, after_id=None):
+        self.pages.append(after_id)
+        return [(tweet_id, text) for tweet_id, text in sorted(self.texts.items())
+                if (tweet_id, model_version) not in self.scores
+                and (after_id is None or tweet_id > after_id)][:limit]
+
+    def store_sentiment_scores(self, scores, model_version):
+        for tweet_id, score in scores:
+            self.scores[(tweet_id, model_version)] = score
+
+    def delete_stale_sentiment(self, model_version, superseded=None, unused_since=None):
+        self.deleted.append((model_version, superseded))
+        return 0
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db = FakeDb({tweet_id: f"text {tweet_id}" for tweet_id in range(1, 8)})
+    monkeypatch.setattr(sentiment_rescorer, 'DatabaseHandler', db)
+    return db
+
+
+def test_pages_by_id_and_scores_every_tweet_once(db):
+    rescorer = SentimentRescorer(DataTransformer(), batch_size=3, pause_seconds=0)
+    assert rescorer.run() == 7
+    version = rescorer.transformer.model_version
+    assert sorted(tweet_id for tweet_id, v in db.scores if v == version) == list(range(1, 8))
+    assert db.pages == [None, 3, 6, 7]
+    assert db.deleted == [(version, rescorer.superseded_versions)]
+
+
+def test_stop_leaves_remaining_tweets_for_the_next_run(db):
+    rescorer = SentimentRescorer(DataTransformer(), batch_size=3, pause_seconds=0)
+    rescorer._stop_event.set()
+    assert rescorer.run() == 0
+    assert db.scores == {}
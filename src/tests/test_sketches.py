@@ -0,0 +1,162 @@
+import json
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis.sketches import FixedHistogram, Moments, TDigest, TopK, TweetSummary
+
+
+def tweet_frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+    sentiment = np.round(rng.uniform(-1, 1, n), 1)
+    sentiment[rng.random(n) < 0.05] = np.nan
+    return pd.DataFrame({
+        'id': np.arange(n, dtype=np.int64),
+        'text': [f"tweet {i}" for i in range(n)],
+        'sentiment': sentiment,
+        'retweet_count': rng.poisson(3, n),
+        'reply_count': rng.poisson(1, n),
+        'like_count': rng.geometric(0.01, n),
+        'quote_count': rng.poisson(0.2, n),
+    })
+
+
+def chunked(frame, sizes):
+    start = 0
+    for size in sizes:
+        yield frame.iloc[start:start + size]
+        start += size
+
+
+def test_merged_chunks_match_one_pass():
+    frame = tweet_frame(5000)
+    whole = TweetSummary(k=5).update(frame)
+    parts = [TweetSummary(k=5).update(chunk) for chunk in chunked(frame, [1, 999, 2500, 1500])]
+    merged = TweetSummary.combine(reversed(parts), k=5)
+
+    assert merged.tweets == whole.tweets == 5000
+    assert (merged.positive, merged.negative, merged.neutral) == \
+        (whole.positive, whole.negative, whole.neutral)
+    for name in ['sentiment', *whole.engagement]:
+        a = whole.sentiment if name == 'sentiment' else whole.engagement[name]
+        b = merged.sentiment if name == 'sentiment' else merged.engagement[name]
+        assert b.moments.count == a.moments.count
+        assert b.moments.mean == pytest.approx(a.moments.mean, rel=1e-12)
+        assert b.moments.variance == pytest.approx(a.moments.variance, rel=1e-9)
+        assert (b.moments.min, b.moments.max) == (a.moments.min, a.moments.max)
+        assert b.top.items() == a.top.items()
+        assert b.bottom.items() == a.bottom.items()
+    np.testing.assert_array_equal(merged.sentiment.histogram.counts,
+                                  whole.sentiment.histogram.counts)
+    assert merged.engagement['like_count'].histogram.counts == \
+        whole.engagement['like_count'].histogram.counts
+
+
+def test_moments_match_pandas():
+    values = tweet_frame(1000)['sentiment']
+    moments = Moments()
+    for chunk in np.array_split(values.to_numpy(), 7):
+        moments.merge(Moments().update(chunk))
+    assert moments.count == values.count()
+    assert moments.mean == pytest.approx(values.mean())
+    assert moments.variance == pytest.approx(values.var())
+
+
+def test_histogram_edges_and_overflow():
+    histogram = FixedHistogram(-1.0, 1.0, 4).update([-2.0, -1.0, 0.0, 1.0, 1.5, np.nan])
+    assert histogram.counts.tolist() == [1, 0, 1, 1]
+    assert (histogram.underflow, histogram.overflow) == (1, 1)
+    with pytest.raises(ValueError):
+        histogram.merge(FixedHistogram(0.0, 1.0, 4))
+
+
+def sql_sentiment_bin(score, bins):
+    """0-based bin of DatabaseHandler.get_sentiment_histogram: width_bucket clamped to [1, bins]."""
+    if score < -1:
+        bucket = 0
+    elif score >= 1:
+        bucket = bins + 1
+    else:
+        bucket = math.floor((score + 1) * bins / 2) + 1
+    return min(max(min(bucket, bins), 1), bins) - 1
+
+
+@pytest.mark.parametrize('bins', [4, TweetSummary.SENTIMENT_BINS])
+def test_histogram_matches_sql_buckets(bins):
+    scores = [-1.5, -1.0, -0.5, 0.0, 0.5, 1.0, 1.5]
+    histogram = FixedHistogram(-1.0, 1.0, bins).update(scores)
+    # SQL clamps out of range scores into the outer bins instead of counting them apart
+    counts = histogram.counts.copy()
+    counts[0] += histogram.underflow
+    counts[-1] += histogram.overflow
+    expected = np.zeros(bins, dtype=np.int64)
+    for score in scores:
+        expected[sql_sentiment_bin(score, bins)] += 1
+    assert counts.tolist() == expected.tolist()
+
+
+@pytest.mark.parametrize('largest', [True, False])
+def test_top_k_ties_go_to_the_lower_id(largest):
+    values = [1.0, 5.0, 5.0, 5.0, 5.0, 1.0]
+    ids = [10, 40, 20, 50, 30, 60]
+    top = TopK(2, largest=largest).update(values, ids)
+    expected = [20, 30] if largest else [10, 60]
+    assert top.ids.tolist() == expected
+
+
+def test_top_k_ties_do_not_depend_on_chunking():
+    rng = np.random.default_rng(1)
+    values = rng.integers(0, 3, 200).astype(float)
+    ids = rng.permutation(200)
+    whole = TopK(7).update(values, ids)
+    for size in [1, 3, 50]:
+        merged = TopK(7)
+        for start in range(0, 200, size):
+            merged.merge(TopK(7).update(values[start:start + size], ids[start:start + size]))
+        assert merged.items() == whole.items()
+    assert whole.ids.tolist() == sorted(ids[values == 2])[:7]
+
+
+def test_top_k_keeps_one_entry_per_id():
+    top = TopK(3).update([4.0, 3.0], [1, 2])
+    top.merge(TopK(3).update([4.0, 1.0], [1, 3]))
+    assert top.ids.tolist() == [1, 2, 3]
+
+
+def test_digest_quantiles_within_error_bound():
+    values = np.random.default_rng(2).lognormal(0, 1, 20000)
+    digest = TDigest(compression=100)
+    for chunk in np.array_split(values, 20):
+        digest.merge(TDigest(compression=100).update(chunk))
+    assert digest.count == len(values)
+    assert (digest.min, digest.max) == (values.min(), values.max())
+    for q in [0.01, 0.25, 0.5, 0.75, 0.99]:
+        rank = (values <= digest.quantile(q)).mean()
+        assert abs(rank - q) < 2 / 100
+
+
+def test_empty_digest_and_summary():
+    assert TDigest().quantile(0.5) is None
+    with pytest.raises(ValueError):
+        TweetSummary().sentiment_summary()
+
+
+def test_json_round_trip():
+    summary = TweetSummary(k=3).update(tweet_frame(500))
+    restored = TweetSummary.from_dict(json.loads(json.dumps(summary.to_dict())))
+    assert restored.to_dict() == summary.to_dict()
+    assert restored.describe() == summary.describe()
+    assert restored.sentiment_summary() == summary.sentiment_summary()
+
+
+def test_sentiment_summary_matches_frame():
+    frame = tweet_frame(300)
+    summary = TweetSummary().update(frame).sentiment_summary()
+    sentiment = frame['sentiment']
+    assert summary['Average Sentiment'] == pytest.approx(sentiment.mean())
+    assert summary['Positive Tweets'] == (sentiment > 0).sum()
+    assert summary['Neutral Tweets'] == (sentiment == 0).sum()
+    assert summary['Most Positive Tweet'] == frame.loc[sentiment.idxmax(), 'text']
+    assert summary['Most Negative Tweet'] == frame.loc[sentiment.idxmin(), 'text']
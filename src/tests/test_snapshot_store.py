@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from src.analysis.snapshot_store import ParquetSnapshotStore
+
+NOW = datetime(2024, 3, 1, 12)
+
+
+class FakeDb:
+    """Streams tweets filtered like DatabaseHandler.stream_tweets."""
+
+    def __init__(self):
+        self.tweets = {}
+        self.calls = []
+
+    def add(self, tweet_id, sentiment=None, scored_at=None, collected_at=NOW):
+        self.tweets[tweet_id] = {
+            'id': tweet_id, 'text': f"tweet {tweet_id}", 'created_at': NOW - timedelta(days=1),
+            'collected_at': collected_at, 'account_name': 'spdde', 'lang': 'de',
+            'is_political_account': True, 'retweet_count': 1, 'reply_count': 0,
+            'like_count': 2, 'quote_count': 0, 'sentiment': sentiment, 'scored_at': scored_at,
+        }
+
+    def score(self, tweet_id, sentiment, scored_at):
+        self.tweets[tweet_id].update(sentiment=sentiment, scored_at=scored_at)
+
+    def stream_tweets(self, columns, sentiment_version=None, collected_after=None,
+                      scored_after=None):
+        self.calls.append((collected_after, scored_after))
+        rows = [tuple(t[c] for c in columns) for t in self.tweets.values()
+                if (collected_after is None and scored_after is None)
+                or (collected_after is not None and t['collected_at'] > collected_after)
+                or (scored_after is not None and t['scored_at'] is not None
+                    and t['scored_at'] > scored_after)]
+        if rows:
+            yield rows
+
+
+def sentiments(store):
+    df = store.load(columns=['id', 'sentiment'])
+    return {tweet_id: None if pd.isna(score) else score
+            for tweet_id, score in zip(df['id'], df['sentiment'])}
+
+
+def test_scores_written_after_export_reach_the_snapshot(tmp_path):
+    db = FakeDb()
+    db.add(1)
+    db.add(2, sentiment=0.1, scored_at=NOW)
+    store = ParquetSnapshotStore(root=str(tmp_path), db=db)
+    assert store.sync()['rows'] == 2
+    assert sentiments(store) == {1: None, 2: 0.1}
+
+    db.score(1, 0.5, NOW + timedelta(hours=1))
+    db.score(2, -0.2, NOW + timedelta(hours=1))
+    result = store.sync()
+    assert result['rows'] == 2
+    assert result['sentiment_watermark'] == (NOW + timedelta(hours=1)).isoformat()
+    assert sentiments(store) == {1: 0.5, 2: -0.2}
+
+    # Nothing changed beyond the overlap window: unchanged tweets are not exported again
+    db.calls.clear()
+    store.sync()
+    collected_after, scored_after = db.calls[0]
+    assert scored_after == NOW + timedelta(hours=1) - store.overlap
+
+
+def test_latest_written_copy_wins_after_compaction(tmp_path):
+    db = FakeDb()
+    db.add(1, sentiment=0.1, scored_at=NOW)
+    store = ParquetSnapshotStore(root=str(tmp_path), db=db)
+    store.sync()
+    db.score(1, 0.9, NOW + timedelta(hours=2))
+    store.sync()
+    assert store.compact() == 1
+    assert sentiments(store) == {1: 0.9}
@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from src.analysis.streaming_windows import OVERALL, StreamingAnalytics, WindowSeries
+
+START = datetime(2024, 1, 1)
+
+
+def closed_counts(completed):
+    return {bucket: tweets for bucket, tweets, _, _ in completed}
+
+
+def test_bucket_closes_only_after_lateness():
+    series = WindowSeries(buckets=10, bucket_seconds=60, lateness_buckets=2)
+    closed = {}
+    # Newest first: bucket 5 arrives before its older neighbours
+    for bucket in [5, 4, 4, 3, 6, 7, 5, 8]:
+        closed.update(closed_counts(series.add(bucket, False, 0.0, 0)))
+    assert closed == {3: 1, 4: 2, 5: 2}
+    assert series.late == 0
+    assert series.stats()['tweets'] == 8
+
+
+def test_tweet_after_close_counts_in_window_but_not_baseline():
+    series = WindowSeries(buckets=10, bucket_seconds=60, lateness_buckets=1)
+    for bucket in [1, 2, 3, 4]:
+        series.add(bucket, False, 0.0, 0)
+    baseline_updates = series.volume.count
+    assert series.add(1, False, 0.0, 0) == []
+    assert series.late == 1
+    assert series.volume.count == baseline_updates
+    assert series.stats()['tweets'] == 5
+
+
+def test_quiet_gap_closes_empty_buckets_and_evicts_old_ones():
+    series = WindowSeries(buckets=5, bucket_seconds=60, lateness_buckets=0)
+    series.add(0, True, 0.5, 3)
+    completed = series.advance(100)
+    assert completed[0] == (0, 1, 1, 0.5)
+    assert all(tweets == 0 for _, tweets, _, _ in completed[1:])
+    assert len(completed) <= 1 + series.buckets
+    assert series.stats()['tweets'] == 0
+
+
+def test_lateness_is_capped_by_the_ring():
+    assert WindowSeries(buckets=4, bucket_seconds=60, lateness_buckets=10).lateness_buckets == 3
+
+
+def poisson_week(rng, rate_per_minute=2.0, days=3):
+    n = rng.poisson(rate_per_minute * 60 * 24 * days)
+    return np.sort(rng.uniform(0, days * 86400, n))
+
+
+def deliver(analytics, seconds, newest_first, run_seconds=900, batch=10):
+    """Feed tweets the way the collector stores them: per run, in small batches."""
+    events = []
+    runs = int(seconds.max() // run_seconds) + 1
+    for run in range(runs):
+        chunk = seconds[(seconds >= run * run_seconds) & (seconds < (run + 1) * run_seconds)]
+        if newest_first:
+            chunk = chunk[::-1]
+        tweets = [{'created_at': START + timedelta(seconds=float(s)), 'text': '',
+                   'account_name': 'spdde'} for s in chunk]
+        for i in range(0, len(tweets), batch):
+            events += analytics.add_tweets(tweets[i:i + batch])
+    return events
+
+
+@pytest.fixture
+def analytics(tmp_path):
+    return StreamingAnalytics(checkpoint_path=str(tmp_path / 'state.json'), scorer=False,
+                              checkpoint_interval=1e9, allowed_lateness=900)
+
+
+@pytest.mark.parametrize('newest_first', [True, False])
+def test_steady_traffic_raises_no_spikes(analytics, newest_first):
+    events = deliver(analytics, poisson_week(np.random.default_rng(7)), newest_first)
+    assert [e for e in events if e['type'] == 'volume_spike'] == []
+    series = analytics.series['1h'][OVERALL]
+    assert series.late == 0
+    assert series.stats()['tweets'] == pytest.approx(120, rel=0.3)
+
+
+def test_burst_raises_a_spike(analytics):
+    seconds = poisson_week(np.random.default_rng(3), days=1)
+    burst = np.full(40, 12 * 3600 + 30.0)
+    events = deliver(analytics, np.sort(np.concatenate([seconds, burst])), newest_first=True)
+    spikes = [e for e in events if e['type'] == 'volume_spike' and e['window'] == '1h'
+              and e['account'] is None]
+    assert [e['bucket_start'] for e in spikes] == ['2024-01-01T12:00:00']
+
+
+def test_commit_hook_registration(analytics):
+    class FakeDb:
+        commit_hooks = []
+
+        def add_commit_hook(self, hook):
+            self.commit_hooks.append(hook)
+
+    db = FakeDb()
+    analytics.register(db)
+    db.commit_hooks[0]([{'created_at': START, 'text': '', 'account_name': 'cdu'}])
+    assert analytics.snapshot(window='1h')['1h']['overall']['tweets'] == 1
+
+
+def test_checkpoint_round_trip(analytics, tmp_path):
+    deliver(analytics, poisson_week(np.random.default_rng(5), days=1), newest_first=True)
+    analytics.save_checkpoint()
+    restored = StreamingAnalytics.from_checkpoint(str(tmp_path / 'state.json'), scorer=False,
+                                                  allowed_lateness=900)
+    assert restored.snapshot() == analytics.snapshot()
+    original = analytics.series['1h'][OVERALL]
+    copy = restored.series['1h'][OVERALL]
+    assert (copy.head, copy.closed) == (original.head, original.closed)
+    assert copy.volume.mean == original.volume.mean
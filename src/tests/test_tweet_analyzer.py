@@ -0,0 +1,152 @@
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from src.analysis.tweet_analyzer import TweetAnalyzer
+
+DAY = datetime(2024, 1, 1)
+
+
+class FakeDb:
+    """Serves tweets and daily rollups from a list of dicts."""
+
+    pool = None
+    chunk_size = 10000
+
+    def __init__(self, tweets, database_id='db-1'):
+        self.tweets = list(tweets)
+        self.database_id = database_id
+        self.streamed = 0
+        self.stored_scores = []
+
+    def get_database_id(self):
+        return self.database_id
+
+    def _select(self, start=None, end=None, accounts=None, is_political_account=None):
+        return [t for t in self.tweets
+                if (start is None or t['created_at'] >= start)
+                and (end is None or t['created_at'] < end)
+                and (accounts is None or t['account_name'] in accounts)
+                and (is_political_account is None
+                     or t['is_political_account'] == is_political_account)]
+
+    def get_rollup(self, granularity='day', by_account=False, **filters):
+        buckets = {}
+        for tweet in self._select(**filters):
+            bucket = tweet['created_at'].replace(hour=0, minute=0, second=0)
+            row = buckets.setdefault(bucket, {'bucket': bucket, 'tweet_count': 0,
+                                              'retweet_sum': 0, 'reply_sum': 0,
+                                              'like_sum': 0, 'quote_sum': 0})
+            row['tweet_count'] += 1
+            for metric in ('retweet', 'reply', 'like', 'quote'):
+                row[f'{metric}_sum'] += tweet[f'{metric}_count']
+        return [buckets[b] for b in sorted(buckets)]
+
+    def stream_tweets(self, columns, sentiment_version=None, chunk_size=None,
+                      distinct_text=False, **filters):
+        tweets = sorted(self._select(**filters), key=lambda t: t['created_at'], reverse=True)
+        if distinct_text:
+            newest = {}
+            for t in tweets:
+                newest.setdefault(t['text'], t)
+            tweets = [t for t in tweets if newest[t['text']] is t]
+        rows = [tuple(t.get(c) for c in columns) for t in tweets]
+        self.streamed += len(rows)
+        chunk_size = chunk_size or self.chunk_size
+        for i in range(0, len(rows), chunk_size):
+            yield rows[i:i + chunk_size]
+
+    def store_sentiment_scores(self, scores, model_version):
+        self.stored_scores.extend(scores)
+
+    def has_stale_sentiment(self, model_version):
+        return False
+
+
+def tweet(tweet_id, day, text, sentiment, likes=0):
+    return {'id': tweet_id, 'text': text, 'created_at': DAY + timedelta(days=day, hours=1),
+            'account_name': 'spdde', 'is_political_account': True, 'retweet_count': 0,
+            'reply_count': 0, 'like_count': likes, 'quote_count': 0, 'sentiment': sentiment}
+
+
+def analyzer(db, cache_dir=None):
+    result = TweetAnalyzer(db=db)
+    result.summary_cache_dir = cache_dir
+    result.transformer.near_duplicates = None
+    return result
+
+
+@pytest.fixture
+def tweets():
+    return [tweet(1, 0, 'gut', 0.5), tweet(2, 0, 'schlecht', -0.5),
+            tweet(3, 1, 'neutral', 0.0), tweet(4, 1, 'sehr gut', 0.8)]
+
+
+def test_settled_days_are_read_from_the_cache(tmp_path, tweets):
+    db = FakeDb(tweets)
+    first = analyzer(db, str(tmp_path)).summarize()
+    streamed = db.streamed
+    second = analyzer(db, str(tmp_path)).summarize()
+    assert db.streamed == streamed
+    assert second.to_dict() == first.to_dict()
+
+
+def test_cache_is_not_shared_between_databases(tmp_path, tweets):
+    analyzer(FakeDb(tweets), str(tmp_path)).summarize()
+    other = FakeDb(tweets[:1], database_id='db-2')
+    assert analyzer(other, str(tmp_path)).summarize().tweets == 1
+
+
+def test_tweets_stored_later_for_a_settled_day_are_picked_up(tmp_path, tweets):
+    db = FakeDb(tweets)
+    analyzer(db, str(tmp_path)).summarize()
+    db.tweets.append(tweet(5, 0, 'neu', 0.3))
+    assert analyzer(db, str(tmp_path)).summarize().tweets == 5
+    db.tweets[0]['like_count'] = 10
+    summary = analyzer(db, str(tmp_path)).summarize()
+    assert summary.engagement['like_count'].moments.max == 10
+
+
+class NoNearDuplicates:
+    def find_duplicates(self, texts, ids=None):
+        raise AssertionError("near-duplicate index must not be touched")
+
+
+def baseline_sentiment_summary(analyzer):
+    """The summary as computed from the full frame before it was streamed."""
+    df = analyzer.transformer.clean_tweets(pd.DataFrame(
+        [row for rows in analyzer.db.stream_tweets(['id', 'text', 'created_at', 'sentiment'])
+         for row in rows],
+        columns=['id', 'text', 'created_at', 'sentiment']
+    ))
+    df = analyzer.transformer.add_sentiment_analysis(df, only_missing=True)
+    sentiment = df['sentiment'].astype(float)
+    return {
+        'Average Sentiment': sentiment.mean(),
+        'Positive Tweets': (sentiment > 0).sum(),
+        'Negative Tweets': (sentiment < 0).sum(),
+        'Neutral Tweets': (sentiment == 0).sum(),
+        'Most Positive Tweet': df.loc[sentiment.idxmax()]['text'],
+        'Most Negative Tweet': df.loc[sentiment.idxmin()]['text']
+    }
+
+
+def test_sentiment_summary_matches_the_full_frame():
+    # Texts repeated across days, tied extremes and a tweet without a stored score
+    tweets = [tweet(1, 0, 'Die Rente', 0.2), tweet(2, 3, 'Die Rente', 0.2),
+              tweet(3, 1, 'Ampel', -0.5), tweet(4, 2, 'Koalition', -0.5),
+              tweet(5, 2, 'Wahl', 0.9), tweet(6, 4, 'Steuern', 0.9),
+              tweet(7, 4, 'Haushalt', 0.0), tweet(8, 5, 'Das ist gut', None)]
+    db = FakeDb(tweets)
+    # Extremes and duplicates fall into different chunks
+    db.chunk_size = 2
+    streamed = analyzer(db)
+    expected = baseline_sentiment_summary(analyzer(FakeDb(tweets)))
+    streamed.transformer.near_duplicates = NoNearDuplicates()
+    summary = streamed.get_sentiment_summary()
+    assert summary['Average Sentiment'] == pytest.approx(expected.pop('Average Sentiment'))
+    assert {k: summary[k] for k in expected} == expected
+    assert summary['Positive Tweets'] + summary['Negative Tweets'] + \
+        summary['Neutral Tweets'] == 7
+    assert [tweet_id for tweet_id, _ in db.stored_scores] == [8]